@@ -16,8 +16,9 @@ def get_system_crew(crewname, manage_agentops=False, introduce_only=False):
         import agentops
         agentops.init()
 
-    agent_pool = Agent.eager_load_all()
-    task_pool = Task.eager_load_all(agent_pool)
+    # Lazy pools only build the agents and tasks the selected crews reach
+    agent_pool = Agent.lazy_pool()
+    task_pool = Task.lazy_pool(agent_pool)
     if isinstance(crewname, str):
         crew = Crew(crewname, agent_pool=agent_pool, task_pool=task_pool, introduce_only=introduce_only)
         return crew
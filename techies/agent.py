@@ -1,8 +1,8 @@
 from techies.fixture_loader import load_fixture
-from techies.tools import get_all_tools, validate_tool
+from techies.tools import get_all_tools
 from crewai import Agent as _Agent
-import jsonschema
-from techies.config_schema import AGENT_SCHEMA
+from techies.utils import LazyPool
+from techies.validation import validate_agent
 
 
 
@@ -23,6 +23,25 @@ class Agent(_Agent):
 
         return agent_pool
 
+    @staticmethod
+    def lazy_pool(tools=None, **extra_kwargs):
+        """
+        Build an agent pool whose agents are only constructed when first looked up,
+        so a crew only pays for the agents (and tools) it references.
+        """
+        all_tools = get_all_tools() if tools is None else tools
+
+        def build(config_name):
+            return Agent(
+                config_name,
+                agent_pool=agent_pool,
+                tools_available=all_tools,
+                **extra_kwargs
+            )
+
+        agent_pool = LazyPool(load_fixture('agents').keys(), build)
+        return agent_pool
+
     @staticmethod
     def list_agents():
         """List available agents with their locations."""
@@ -31,7 +50,7 @@ class Agent(_Agent):
     def __init__(
         self, config_name, *, agent_pool=None, tools_available=None, **kwargs
     ):
-        agent_config = load_fixture('agents')[config_name]
+        agent_config = dict(load_fixture('agents')[config_name])
         agent_config['role'] = config_name
         agent_config['name'] = config_name.replace('_', ' ').title()
 
@@ -54,28 +73,4 @@ class Agent(_Agent):
         Validate the agent with the given name.
         Returns (True, None) on success, (False, 'failure-reason') on failure.
         """
-        # Check if agent exists
-        agent_configs = load_fixture('agents')
-        if name not in agent_configs:
-            return False, f"Agent '{name}' not found"
-        
-        # Validate schema
-        agent_config = agent_configs[name]
-        try:
-            jsonschema.validate(agent_config, schema=AGENT_SCHEMA)
-        except jsonschema.exceptions.ValidationError as e:
-            return False, f"Agent '{name}' schema validation failed: {e.message}"
-        
-        # If recursive, validate tools
-        if recursive and 'tools' in agent_config:
-            errors = []
-            for tool_name in agent_config['tools']:
-                ok, reason = validate_tool(tool_name, recursive=False)
-                if not ok:
-                    errors.append(f"Tool '{tool_name}': {reason}")
-            
-            if errors:
-                return False, f"Agent '{name}' uses invalid tools:\n" + "\n".join(errors)
-        
-        return True, None
-
+        return validate_agent(name, recursive=recursive)
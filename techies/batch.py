@@ -0,0 +1,175 @@
+"""
+Run one crew against many game specifications.
+
+Fixtures are loaded once in the parent process and worker processes are forked
+from it, each worker then imports crewai and loads the tools and callbacks
+once for all of its runs. crewai starts threads when imported, so it is kept
+out of the parent: forking a process with live threads can deadlock the
+children.
+
+Each run works in its own output directory, since tools read and write
+relative to the working directory, and its console output goes to run.log
+in that directory.
+"""
+import os
+import time
+import threading
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from techies.fixture_loader import load_fixture, FIXTURE_NAMES
+from techies.game_specs import specs
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one run of a batch."""
+    label: str
+    output_dir: str
+    ok: bool
+    seconds: float
+    error: Optional[str]
+
+
+def resolve_game_specs(items) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Turn predefined game spec names and spec files into (label, kickoff arguments).
+    Labels are unique, they name the output directory of each run.
+
+    Raises:
+        ValueError: If an item is neither a predefined game spec nor a file
+    """
+    resolved = []
+    seen = {}
+    for item in items:
+        if item in specs:
+            label, kwargs = item, {'game': item}
+        elif os.path.isfile(item):
+            # Absolute, as runs change into their own output directory
+            label, kwargs = Path(item).stem, {'gamefiles': os.path.abspath(item)}
+        else:
+            available_specs = ", ".join(specs.keys())
+            raise ValueError(f"Game spec '{item}' is neither a file nor a predefined game spec. Available game specs: {available_specs}")
+
+        seen[label] = seen.get(label, 0) + 1
+        if seen[label] > 1:
+            label = f"{label}-{seen[label]}"
+        resolved.append((label, kwargs))
+    return resolved
+
+
+def warm_up():
+    """Load the fixtures, so forked workers inherit them. Starts no thread."""
+    for fixture_name in FIXTURE_NAMES:
+        load_fixture(fixture_name)
+
+
+def _init_worker():
+    """Import crewai and load the tools and callbacks, once per worker process."""
+    from techies.tools import get_tool_specs
+    from techies.callbacks import get_all_callbacks
+    import techies.crew  # noqa: F401, imports crewai
+
+    get_tool_specs()
+    get_all_callbacks()
+
+
+def _start_method() -> str:
+    """fork while the process has a single thread, a fresh interpreter otherwise."""
+    methods = multiprocessing.get_all_start_methods()
+    if 'fork' in methods and threading.active_count() == 1:
+        return 'fork'
+    # e.g. crewai was already imported by the caller
+    return 'forkserver' if 'forkserver' in methods else 'spawn'
+
+
+def _kickoff(crewname, game=None, gamefiles=None):
+    # Same entry points as 'techies run'
+    from techies.cli.utils.dispatch import kickoff_hierarchy_crew, kickoff_html5_crew
+
+    if crewname == 'html5_crew':
+        kickoff_html5_crew(crewname, game=game, gamefiles=gamefiles)
+    else:
+        kickoff_hierarchy_crew(crewname, game=game, gamefiles=gamefiles)
+
+
+def _run_one(job) -> BatchResult:
+    crewname, label, kwargs, output_dir = job
+
+    start = time.perf_counter()
+    cwd = os.getcwd()
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        os.chdir(output_dir)
+        with open('run.log', 'w') as log, redirect_stdout(log), redirect_stderr(log):
+            _kickoff(crewname, **kwargs)
+        ok, error = True, None
+    except (Exception, SystemExit) as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+    finally:
+        os.chdir(cwd)
+
+    return BatchResult(label, output_dir, ok, time.perf_counter() - start, error)
+
+
+def run_batch(
+    crewname: str,
+    game_specs,
+    output_root: str = "batch",
+    parallelism: Optional[int] = None,
+    on_result: Optional[Callable[[BatchResult], None]] = None,
+) -> List[BatchResult]:
+    """
+    Run crewname once per game spec, up to parallelism runs at once.
+
+    Args:
+        crewname: Crew taking game_specifications as input, e.g. 'hierarchy_crew'
+        game_specs: Predefined game spec names or paths to spec files
+        output_root: Directory holding one output directory per run
+        parallelism: Number of worker processes, defaults to the CPU count
+        on_result: Called with each BatchResult as soon as its run finishes
+
+    Returns:
+        List[BatchResult]: one result per game spec, in the given order
+    """
+    if crewname not in load_fixture('crews'):
+        raise ValueError(f"Crew '{crewname}' not found")
+
+    jobs = [
+        (crewname, label, kwargs, os.path.abspath(os.path.join(output_root, label)))
+        for label, kwargs in resolve_game_specs(game_specs)
+    ]
+    if not jobs:
+        return []
+
+    parallelism = min(parallelism or os.cpu_count() or 1, len(jobs))
+    warm_up()
+
+    results = {}
+    if parallelism == 1:
+        _init_worker()
+        for job in jobs:
+            result = results[job[1]] = _run_one(job)
+            if on_result:
+                on_result(result)
+    else:
+        with multiprocessing.get_context(_start_method()).Pool(parallelism, initializer=_init_worker) as pool:
+            for result in pool.imap_unordered(_run_one, jobs):
+                results[result.label] = result
+                if on_result:
+                    on_result(result)
+
+    return [results[job[1]] for job in jobs]
+
+
+def format_summary(results: List[BatchResult]) -> str:
+    """Summary table of a batch, one line per run."""
+    lines = [f"{'spec':20s} {'status':8s} {'time':>9s}  output"]
+    for result in results:
+        status = "OK" if result.ok else "FAILED"
+        lines.append(f"{result.label:20s} {status:8s} {result.seconds:8.1f}s  {result.output_dir}")
+    failed = sum(not result.ok for result in results)
+    total = sum(result.seconds for result in results)
+    lines.append(f"{len(results)} run(s), {failed} failed, {total:.1f}s of run time")
+    return "\n".join(lines)
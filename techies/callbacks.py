@@ -1,4 +1,3 @@
-import copy
 import inspect
 import re
 from typing import Callable, Optional, Dict
@@ -31,15 +30,15 @@ def register_callback(callback_function: Callable[[str], str], callback_id: Opti
 
 def get_all_callbacks():
     """Get all registered callback functions."""
-    # Return a deep copy of the registered callbacks dictionary
-    return copy.deepcopy(_registered_callbacks) 
+    # Return a copy of the registered callbacks dictionary; functions are shared,
+    # deep copying them would return the very same objects anyway
+    return dict(_registered_callbacks)
 
 def validate_callback(callback_id, recursive=True):
     """
     Validate the callback with the given callback_id.
     Returns (True, None) on success, (False, 'failure-reason') on failure.
     """
-    callbacks = get_all_callbacks()
-    if callback_id in callbacks:
+    if callback_id in _registered_callbacks:
         return True, None
     return False, f"Callback '{callback_id}' not found" 
\ No newline at end of file
@@ -1,24 +1,24 @@
-from .run import run
-from .introduce import introduce
-from .list_commands import list_crews, list_agents, list_tasks, list_game_specs
-from .crew_ops import new_crew, dump_crew
-from .get_runtime_path import get_runtime_path
-from .list_tools import list_tools
-from .list_callbacks import list_callbacks
-from .check import check
-from .list import list_group
+# Commands are registered by import path and only imported when invoked, so
+# listing commands never pay for crewai and the tool registry.
+COMMANDS = {
+    'run': 'techies.cli.commands.run:run',
+    'introduce': 'techies.cli.commands.introduce:introduce',
+    'list_crews': 'techies.cli.commands.list_commands:list_crews',
+    'list_agents': 'techies.cli.commands.list_commands:list_agents',
+    'list_tasks': 'techies.cli.commands.list_commands:list_tasks',
+    'list_game_specs': 'techies.cli.commands.list_commands:list_game_specs',
+    'scaffold': 'techies.cli.commands.crew_ops:new_crew',
+    'dump': 'techies.cli.commands.crew_ops:dump_crew',
+    'get-runtime-path': 'techies.cli.commands.get_runtime_path:get_runtime_path',
+    'list_tools': 'techies.cli.commands.list_tools:list_tools',
+    'list_callbacks': 'techies.cli.commands.list_callbacks:list_callbacks',
+    'check': 'techies.cli.commands.check:check',
+    'list': 'techies.cli.commands.list:list_group',
+    'cache': 'techies.cli.commands.cache:cache',
+    'batch': 'techies.cli.commands.batch:batch',
+    'mechanics': 'techies.cli.commands.mechanics:mechanics',
+}
 
 def register_commands(cli):
-    cli.add_command(run)
-    cli.add_command(introduce)
-    cli.add_command(list_crews)
-    cli.add_command(list_agents)
-    cli.add_command(list_tasks)
-    cli.add_command(list_game_specs)
-    cli.add_command(new_crew)
-    cli.add_command(dump_crew)
-    cli.add_command(get_runtime_path)
-    cli.add_command(list_tools)
-    cli.add_command(list_callbacks)
-    cli.add_command(check)
-    cli.add_command(list_group)
+    for name, import_path in COMMANDS.items():
+        cli.add_lazy_command(name, import_path)
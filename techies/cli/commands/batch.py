@@ -0,0 +1,34 @@
+import click
+import sys
+from techies.game_specs import specs
+
+@click.command()
+@click.argument('crewname')
+@click.argument('game_specs', nargs=-1)
+@click.option('--all', 'all_specs', is_flag=True, help='Run every predefined game specification.')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=None, help='Number of runs in parallel (default: CPU count).')
+@click.option('--output-dir', '-o', default='batch', show_default=True, help='Directory holding one output directory per run.')
+def batch(crewname, game_specs, all_specs, jobs, output_dir):
+    """Run a crew once per game specification (predefined names or files)."""
+    # Imported here as running crews pulls in crewai
+    from techies.batch import run_batch, format_summary
+
+    game_specs = list(specs.keys()) if all_specs else list(game_specs)
+    if not game_specs:
+        click.echo("Error: pass game specifications or --all.")
+        sys.exit(1)
+
+    def report(result):
+        status = "OK" if result.ok else f"FAILED - {result.error}"
+        click.echo(f"Finished {result.label} in {result.seconds:.1f}s: {status}")
+
+    try:
+        results = run_batch(crewname, game_specs, output_root=output_dir, parallelism=jobs, on_result=report)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        sys.exit(1)
+
+    click.echo("[Batch summary]")
+    click.echo(format_summary(results))
+    if not all(result.ok for result in results):
+        sys.exit(1)
@@ -0,0 +1,26 @@
+import click
+from techies.fixture_loader import (
+    fixture_cache_dir,
+    rebuild_fixture_snapshots,
+    clear_fixture_snapshots
+)
+
+@click.group()
+def cache():
+    """Manage the compiled fixture cache."""
+    pass
+
+@cache.command()
+def rebuild():
+    """Rebuild fixture snapshots from the current runtime directories."""
+    for fixture_name, path in rebuild_fixture_snapshots().items():
+        if path is None:
+            click.echo(f"Skipped {fixture_name}: fixture cache is disabled (TECHIES_FIXTURE_CACHE=0)")
+        else:
+            click.echo(f"Rebuilt {fixture_name:10s} at {path}")
+
+@cache.command()
+def clear():
+    """Remove all fixture snapshots."""
+    removed = clear_fixture_snapshots()
+    click.echo(f"Removed {removed} fixture snapshot(s) from {fixture_cache_dir()}")
@@ -1,9 +1,6 @@
 import click
 import sys
-from techies.crew import Crew
-from techies.task import Task
-from techies.agent import Agent
-from techies.tools import validate_tool
+from techies.validation import validate_crew, validate_task, validate_agent, validate_all
 from techies.callbacks import validate_callback
 
 @click.group()
@@ -16,7 +13,7 @@ def check():
 @click.option('--recursive/--no-recursive', '-R/-r', default=True, help='Enable or disable recursive validation (default: enabled).')
 def crew(name, recursive):
     """Check a crew by name."""
-    ok, reason = Crew.validate(name, recursive=recursive)
+    ok, reason = validate_crew(name, recursive=recursive)
     if ok:
         click.echo(f"Checked crew '{name}' (recursive={recursive}): OK")
     else:
@@ -28,7 +25,7 @@ def crew(name, recursive):
 @click.option('--recursive/--no-recursive', '-R/-r', default=True, help='Enable or disable recursive validation (default: enabled).')
 def task(name, recursive):
     """Check a task by name."""
-    ok, reason = Task.validate(name, recursive=recursive)
+    ok, reason = validate_task(name, recursive=recursive)
     if ok:
         click.echo(f"Checked task '{name}' (recursive={recursive}): OK")
     else:
@@ -40,7 +37,7 @@ def task(name, recursive):
 @click.option('--recursive/--no-recursive', '-R/-r', default=True, help='Enable or disable recursive validation (default: enabled).')
 def agent(name, recursive):
     """Check an agent by name."""
-    ok, reason = Agent.validate(name, recursive=recursive)
+    ok, reason = validate_agent(name, recursive=recursive)
     if ok:
         click.echo(f"Checked agent '{name}' (recursive={recursive}): OK")
     else:
@@ -52,6 +49,8 @@ def agent(name, recursive):
 @click.option('--recursive/--no-recursive', '-R/-r', default=True, help='Enable or disable recursive validation (default: enabled).')
 def tool(name, recursive):
     """Check a tool by id."""
+    from techies.tools import validate_tool
+
     ok, reason = validate_tool(name, recursive=recursive)
     if ok:
         click.echo(f"Checked tool '{name}' (recursive={recursive}): OK")
@@ -69,4 +68,25 @@ def callback(name, recursive):
         click.echo(f"Checked callback '{name}' (recursive={recursive}): OK")
     else:
         click.echo(f"Checked callback '{name}' (recursive={recursive}): FAILED - {reason}")
+        sys.exit(1)
+
+@check.command(name='all')
+@click.option('--verbose', '-v', is_flag=True, help='Also list the configurations that passed.')
+def check_all(verbose):
+    """Check every crew, task and agent in a single pass."""
+    results = validate_all()
+
+    failed = 0
+    for kind, entries in results.items():
+        for name, (ok, reason) in entries.items():
+            if ok:
+                if verbose:
+                    click.echo(f"Checked {kind[:-1]} '{name}': OK")
+            else:
+                failed += 1
+                click.echo(f"Checked {kind[:-1]} '{name}': FAILED - {reason}")
+
+    counts = ", ".join(f"{len(entries)} {kind}" for kind, entries in results.items())
+    click.echo(f"Checked {counts}: {failed} failed")
+    if failed:
         sys.exit(1) 
\ No newline at end of file
@@ -3,7 +3,7 @@ import click
 
 from pathlib import Path
 from shutil import copytree
-from techies.crew import Crew
+from techies.fixture_loader import load_fixture
 
 _fixture_dir = os.path.normpath(__file__ + '/../../../fixtures')
 
@@ -19,7 +19,7 @@ def new_crew(crewname):
 @click.argument("crew_name")
 def dump_crew(crew_name):
     """Dump a crew's code."""
-    crew_locations = Crew.list_crews()
+    crew_locations = load_fixture('crews', result="locations")
     if crew_name not in crew_locations:
         click.echo(f"Crew {crew_name} not found.")
         return
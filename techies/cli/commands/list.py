@@ -1,10 +1,6 @@
 import click
-from techies.crew import Crew
-from techies.agent import Agent
-from techies.task import Task
+from techies.fixture_loader import load_fixture
 from techies.game_specs import specs
-from techies.tools import get_all_tools
-from techies.callbacks import get_all_callbacks
 
 @click.group(name="list")
 def list_group():
@@ -16,19 +12,19 @@ def list_group():
 def _list_crews():
     """List available crews (implementation)."""
     click.echo("[Available crews]")
-    for crew, path in Crew.list_crews().items():
+    for crew, path in load_fixture('crews', result="locations").items():
         click.echo(f"{crew:20s} at {path}")
 
 def _list_agents():
     """List available agents (implementation)."""
     click.echo("[Available agents]")
-    for agent, path in Agent.list_agents().items():
+    for agent, path in load_fixture('agents', result="locations").items():
         click.echo(f"{agent:20s} at {path}")
 
 def _list_tasks():
     """List available tasks (implementation)."""
     click.echo("[Available tasks]")
-    for task, path in Task.list_tasks().items():
+    for task, path in load_fixture('tasks', result="locations").items():
         click.echo(f"{task:20s} at {path}")
 
 def _list_game_specs():
@@ -38,7 +34,9 @@ def _list_game_specs():
 
 def _list_tools():
     """List all available tools (implementation)."""
-    tools_dict = get_all_tools()
+    from techies.tools import get_tool_specs
+
+    tools_dict = get_tool_specs()
     
     if not tools_dict:
         click.echo("No tools available.")
@@ -52,9 +50,9 @@ def _list_tools():
         click.echo(f"Name: {tool.name}")
         click.echo(f"Description: {tool.description}")
         
-        if hasattr(tool, 'args_schema') and tool.args_schema:
+        if tool.args_schema:
             click.echo("Arguments:")
-            for field_name, field in tool.args_schema.__fields__.items():
+            for field_name, field in tool.args_schema.model_fields.items():
                 field_desc = field.description or "No description"
                 click.echo(f"  - {field_name}: {field_desc}")
         
@@ -67,6 +65,8 @@ def _list_callbacks(ctx):
         click.echo("Warning: No callbacks are loaded. Use --allow-load-scripts flag to load custom callbacks.")
         return
     
+    from techies.callbacks import get_all_callbacks
+
     callbacks_dict = get_all_callbacks()
     
     if not callbacks_dict:
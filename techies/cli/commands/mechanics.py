@@ -0,0 +1,168 @@
+import click
+
+VECTOR_DTYPES = ('float32', 'float16', 'int8')
+
+@click.group()
+def mechanics():
+    """Manage embedded game mechanics databases."""
+    pass
+
+@mechanics.command()
+@click.argument('mechanics_json', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', default=None, help='Store directory (default: next to the JSON file).')
+@click.option('--batch-size', '-b', type=click.IntRange(min=1), default=None, help='Mechanics encoded per batch.')
+@click.option('--dtype', type=click.Choice(VECTOR_DTYPES), default=None, help='Storage of the vectors (default: float32, or TECHIES_MECHANICS_DTYPE).')
+def embed(mechanics_json, output, batch_size, dtype):
+    """Embed a mechanics.json file into a store, encoding only new or edited mechanics."""
+    import json
+    from techies.mechanics.embed import embed_mechanics
+    from techies.mechanics.index import load_index
+    from techies.mechanics.manifest import update_manifest
+    from techies.mechanics.store import open_store, store_path_for
+
+    with open(mechanics_json, 'r') as f:
+        mechanics_list = json.load(f)
+
+    result = embed_mechanics(mechanics_list, output or store_path_for(mechanics_json), batch_size=batch_size, dtype=dtype)
+    store = open_store(result.path)
+    load_index(store)
+    manifest = update_manifest(store, source=mechanics_json)
+    click.echo(f"Embedded {mechanics_json} to {result.path} ({result.encoded} encoded, {result.reused} reused), recorded in {manifest}")
+
+@mechanics.command()
+@click.argument('database', required=False)
+def which(database):
+    """Show the mechanics database searches use, optionally by name or path."""
+    from techies.mechanics.manifest import resolve_mechanics_db
+
+    try:
+        path = resolve_mechanics_db(database)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    if path is None:
+        raise click.ClickException("No mechanics database found")
+    click.echo(path)
+
+@mechanics.command()
+@click.argument('embedded_json', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', default=None, help='Store directory (default: next to the JSON file).')
+@click.option('--dtype', type=click.Choice(VECTOR_DTYPES), default=None, help='Storage of the vectors (default: float32, or TECHIES_MECHANICS_DTYPE).')
+def convert(embedded_json, output, dtype):
+    """Convert an '_embedded.json' file to a binary mechanics store."""
+    from techies.mechanics.store import convert_json
+
+    path = convert_json(embedded_json, output, dtype=dtype)
+    click.echo(f"Converted {embedded_json} to {path}")
+
+@mechanics.command()
+@click.argument('store', type=click.Path(exists=True))
+@click.argument('embedded_json', type=click.Path(dir_okay=False))
+def export(store, embedded_json):
+    """Export a mechanics store to the '_embedded.json' layout."""
+    from techies.mechanics.store import open_store, export_json
+
+    export_json(open_store(store), embedded_json)
+    click.echo(f"Exported {store} to {embedded_json}")
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'hnsw', 'ivf_pq', 'sq_fp16', 'sq8', 'pq')
+
+def _index_config(index_type, metric, params):
+    from techies.mechanics.index import index_config, parse_params
+
+    try:
+        return index_config(index_type, metric, **parse_params(params))
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+@mechanics.command()
+@click.argument('store', type=click.Path(exists=True, file_okay=False))
+@click.option('--type', '-t', 'index_type', type=click.Choice(INDEX_TYPES), default=None, help='Index type (default: TECHIES_MECHANICS_INDEX, or the one matching the store dtype, flat for float32).')
+@click.option('--metric', '-m', type=click.Choice(['l2', 'cosine']), default=None, help='Distance metric (default: l2, or TECHIES_MECHANICS_METRIC).')
+@click.option('--param', '-p', 'params', multiple=True, help='Index parameter as name=value, e.g. nlist=256, nprobe=16, M=32, efSearch=64, m=16, nbits=8.')
+@click.option('--force', '-f', is_flag=True, help='Rebuild even if the saved index is up to date.')
+def index(store, index_type, metric, params, force):
+    """Build and save the search index of a mechanics store."""
+    from techies.mechanics.store import open_store
+    from techies.mechanics.index import build_index, save_index, is_index_current, default_config
+
+    mechanics_store = open_store(store)
+    config = _index_config(index_type or default_config(mechanics_store).type, metric, params)
+    if not force and is_index_current(mechanics_store, config):
+        # Search parameters are only read from index.json, refresh them without rebuilding
+        if config.params:
+            from techies.mechanics.index import load_index
+            save_index(mechanics_store, load_index(mechanics_store, config), config)
+        click.echo(f"Index of {store} is up to date")
+        return
+
+    path = save_index(mechanics_store, build_index(mechanics_store, config), config)
+    click.echo(f"Saved {config.type} index of {len(mechanics_store)} mechanics to {path}")
+
+@mechanics.command()
+@click.argument('store', type=click.Path(exists=True))
+@click.option('--type', '-t', 'index_types', type=click.Choice(INDEX_TYPES), multiple=True, help='Index types to compare (default: all).')
+@click.option('--metric', '-m', type=click.Choice(['l2', 'cosine']), default='l2', help='Distance metric.')
+@click.option('--param', '-p', 'params', multiple=True, help='Index parameter as name=value, applied to the types accepting it.')
+@click.option('-k', default=10, type=click.IntRange(min=1), help='Neighbours compared for recall@k.')
+@click.option('--queries', '-q', default=100, type=click.IntRange(min=1), help='Number of sampled queries.')
+def report(store, index_types, metric, params, k, queries):
+    """Compare recall@k, query latency and size of index types against exact float32 search."""
+    from techies.mechanics.store import open_store
+    from techies.mechanics.index import compare_indexes, format_report, index_config, parse_params, BUILD_PARAMS, SEARCH_PARAMS
+
+    try:
+        params = parse_params(params)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    configs = []
+    for index_type in index_types or INDEX_TYPES:
+        known = BUILD_PARAMS[index_type] + SEARCH_PARAMS[index_type]
+        configs.append(index_config(index_type, metric, **{name: value for name, value in params.items() if name in known}))
+
+    click.echo(format_report(compare_indexes(open_store(store), configs, k=k, num_queries=queries), k=k))
+
+@mechanics.command()
+@click.option('--socket', '-s', 'socket_path', default=None, help='Unix socket to listen on (default: TECHIES_MECHANICS_SOCKET, or one per user in XDG_RUNTIME_DIR or the temp directory).')
+@click.option('--database', '-d', 'databases', multiple=True, help='Database to load upfront, as accepted by "mechanics which". Others load on first use.')
+def serve(socket_path, databases):
+    """Serve mechanics searches to every process of this host over a Unix socket."""
+    from techies.mechanics.manifest import resolve_mechanics_db
+    from techies.mechanics.server import serve as serve_forever
+
+    try:
+        paths = [resolve_mechanics_db(database) for database in databases]
+        serve_forever(socket_path, paths)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+
+@mechanics.command()
+@click.option('--size', '-n', 'sizes', type=click.IntRange(min=1), multiple=True, help='Synthetic corpus size, repeatable (default: 10000, 100000 and 1000000).')
+@click.option('--mode', 'modes', multiple=True, help='Vector dtype and index type as dtype:index, e.g. int8:sq8, repeatable (default: every index type).')
+@click.option('--no-bundled', is_flag=True, help='Skip the bundled platformer database.')
+@click.option('--queries', '-q', default=200, type=click.IntRange(min=1), help='Number of sampled queries.')
+@click.option('-k', default=10, type=click.IntRange(min=1), help='Neighbours retrieved and compared for recall@k.')
+@click.option('--metric', '-m', type=click.Choice(['l2', 'cosine']), default='l2', help='Distance metric.')
+@click.option('--encoder', '-e', 'model_name', default='stub', help="'stub' for the offline hashing encoder, or a locally cached SentenceTransformer model.")
+@click.option('--workdir', type=click.Path(file_okay=False), default=None, help='Where corpora stores are written (default: a temporary directory, removed afterwards).')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default=None, help='Write the results as JSON to this file.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the results as JSON instead of a table.')
+def bench(sizes, modes, no_bundled, queries, k, metric, model_name, workdir, output, as_json):
+    """Benchmark mechanics retrieval: load, encode and search latency, throughput, memory and recall."""
+    import json
+    from techies.mechanics.bench import run_benchmark, format_benchmark, parse_mode, DEFAULT_SIZES, DEFAULT_MODES
+
+    try:
+        modes = [parse_mode(mode) for mode in modes] or DEFAULT_MODES
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--mode')
+
+    results = run_benchmark(
+        sizes or DEFAULT_SIZES, modes, bundled=not no_bundled, num_queries=queries, k=k,
+        model_name=model_name, metric=metric, directory=workdir,
+        progress=lambda message: click.echo(message, err=True),
+    )
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+    click.echo(json.dumps(results, indent=2) if as_json else format_benchmark(results))
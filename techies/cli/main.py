@@ -1,9 +1,8 @@
 import click
 from techies.cli.commands import register_commands
-from techies.cli.utils.load_tools import load_custom_tools
-from techies.cli.utils.load_callbacks import load_custom_callbacks
+from techies.cli.utils.click_extensions import LazyGroup
 
-@click.group()
+@click.group(cls=LazyGroup)
 @click.option('--allow-load-scripts', is_flag=True, help='Load custom scripts (tools and callbacks) from runtime directories')
 @click.pass_context
 def cli(ctx, allow_load_scripts):
@@ -15,6 +14,10 @@ def cli(ctx, allow_load_scripts):
     ctx.obj['allow_load_scripts'] = allow_load_scripts
     
     if allow_load_scripts:
+        # Imported here as loading scripts pulls in crewai and pydantic
+        from techies.cli.utils.load_tools import load_custom_tools
+        from techies.cli.utils.load_callbacks import load_custom_callbacks
+
         num_tools = load_custom_tools()
         num_callbacks = load_custom_callbacks()
         click.echo(f"Loaded {num_tools} custom tool files and {num_callbacks} custom callback files")
@@ -20,4 +20,34 @@ class DefaultRunGroup(click.Group):
             kickoff_default_crew(cmd_name, extra_args=extra_args)
             
         #return click.Command(cmd_name, callback=fallback_cmd, help="Run a default crew.")
-        return fallback_cmd
\ No newline at end of file
+        return fallback_cmd
+
+class LazyGroup(click.Group):
+    """A click group whose subcommands are imported only when invoked.
+
+    Lazy subcommands are registered as "module.path:attribute" strings, so a
+    command's dependencies (e.g. crewai) are only imported when it runs.
+    """
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def add_lazy_command(self, name, import_path):
+        self.lazy_subcommands[name] = import_path
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._load_command(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name):
+        import importlib
+
+        module_name, attribute = self.lazy_subcommands[cmd_name].split(':')
+        command = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise ValueError(f"Lazy command '{cmd_name}' did not resolve to a click command: {command!r}")
+        return command
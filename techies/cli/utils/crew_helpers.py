@@ -1,14 +1,16 @@
-from techies.agent import Agent
-from techies.task import Task
-from techies.crew import Crew
-
 def get_system_crew(crewname, manage_agentops=False, introduce_only=False):
+    # Imported here so CLI modules can import this helper without loading crewai
+    from techies.agent import Agent
+    from techies.task import Task
+    from techies.crew import Crew
+
     if manage_agentops:
         import agentops
         agentops.init()
 
-    agent_pool = Agent.eager_load_all()
-    task_pool = Task.eager_load_all(agent_pool)
+    # Lazy pools only build the agents and tasks the selected crews reach
+    agent_pool = Agent.lazy_pool()
+    task_pool = Task.lazy_pool(agent_pool)
 
     if isinstance(crewname, str):
         return Crew(
@@ -59,7 +59,9 @@ CREW_SCHEMA = {
         },
         "cache": {"type": "boolean"},
         "memory": {"type": "boolean"},
-        "max_iter": {"type": "integer"}
+        "max_iter": {"type": "integer"},
+        "process": {"type": "string", "enum": ["sequential", "dag"]},
+        "max_concurrency": {"type": "integer", "minimum": 1}
     },
     "required": ["agents", "tasks"],
     "additionalProperties": False
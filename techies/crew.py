@@ -1,32 +1,39 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
 from techies.fixture_loader import load_fixture
 from crewai import Crew as _Crew
-import jsonschema
-from techies.config_schema import CREW_SCHEMA
-from functools import lru_cache
-from techies.agent import Agent
-from techies.task import Task
-from techies.utils import is_topology_ordered
+from crewai.tasks.conditional_task import ConditionalTask
+from techies.validation import validate_crew
+
+# Tasks running at once with process 'dag' when crews.yml does not set max_concurrency
+DEFAULT_MAX_CONCURRENCY = 4
 
 
 class Crew(_Crew):
     input_args: list[str] = []
+    dag_process: bool = False
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
     def __init__(self, config_name, *, agent_pool, task_pool, **kwargs):
         introduction_task_override = kwargs.get('introduce_only', False)
         del kwargs['introduce_only']
 
-        crew_config = load_fixture('crews')[config_name]
+        crew_config = dict(load_fixture('crews')[config_name])
 
         agents = []
         for agent_name in crew_config.get('agents'):
             agents.append(agent_pool.get(agent_name))
 
-        tasks = []
-        for task_name in crew_config.get('tasks'):
-            tasks.append(task_pool.get(task_name))
-
+        # Only look up the tasks that will run, pools may build them lazily
+        task_names = crew_config.get('tasks')
         if introduction_task_override:
             agents.append(agent_pool.get('introduction_host'))
-            tasks = [task_pool.get('introduce_crew_members')]
+            task_names = ['introduce_crew_members']
+
+        tasks = []
+        for task_name in task_names:
+            tasks.append(task_pool.get(task_name))
 
         crew_config['agents'] = agents
         crew_config['tasks'] = tasks
@@ -34,105 +41,141 @@ class Crew(_Crew):
         # Extract input_args from crew_config but don't set it yet
         input_args = crew_config.pop('input_args', [])
 
+        # 'dag' is not a crewai process, it runs on top of the sequential one
+        dag_process = crew_config.get('process') == 'dag'
+        if dag_process:
+            crew_config.pop('process')
+        max_concurrency = crew_config.pop('max_concurrency', DEFAULT_MAX_CONCURRENCY)
+
         crew_config.update(kwargs)
         super().__init__(**crew_config)
         
         # Set input_args after parent initialization to avoid Pydantic issues
         self.input_args = input_args
+        self.dag_process = dag_process
+        self.max_concurrency = max_concurrency
+        if dag_process:
+            self._check_dag_tasks(self.tasks)
 
-    @staticmethod
-    def list_crews():
-        return load_fixture('crews', result="locations")
+    def _run_sequential_process(self):
+        if self.dag_process:
+            return self._run_dag_process()
+        return super()._run_sequential_process()
 
-    @staticmethod
-    @lru_cache(maxsize=128)
-    def _validate_schema(name):
+    def _run_dag_process(self):
         """
-        Validate crew configuration against the schema.
-        
-        Args:
-            name: Name of the crew to validate
-            
-        Returns:
-            Tuple[bool, Optional[str]]: (success, error_message)
+        Run every task as soon as the tasks in its context have completed,
+        with at most max_concurrency tasks running at once.
+
+        Context is passed exactly as in the sequential process. Tasks sharing
+        an agent never run at the same time, as crewai agents keep per-task
+        state. Outputs are returned in the order the tasks are listed.
         """
-        # Check if crew exists
-        crew_configs = load_fixture('crews')
-        if name not in crew_configs:
-            return False, f"Crew '{name}' not found"
-        
-        # Validate schema
+        tasks = self.tasks
+        self._check_dag_tasks(tasks)
+        position = {id(task): index for index, task in enumerate(tasks)}
+        dependencies = [
+            sorted({position[id(dep)] for dep in (task.context or []) if id(dep) in position})
+            if isinstance(task.context, list) else []
+            for task in tasks
+        ]
+        dependents = [[] for _ in tasks]
+        for index, deps in enumerate(dependencies):
+            for dep in deps:
+                dependents[dep].append(index)
+
+        remaining = [len(deps) for deps in dependencies]
+        self._check_dag_schedulable(remaining, dependents)
+
+        agent_locks = {}
+        for task in tasks:
+            agent_locks.setdefault(id(task.agent), threading.Lock())
+
+        outputs = {}
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='techies-crew')
         try:
-            jsonschema.validate(crew_configs[name], schema=CREW_SCHEMA)
-            return True, None
-        except jsonschema.exceptions.ValidationError as e:
-            return False, f"Crew '{name}' schema validation failed: {e.message}"
+            running = {}
+            while ready or running:
+                for index in ready:
+                    task = tasks[index]
+                    future = executor.submit(
+                        self._execute_dag_task, task,
+                        [outputs[dep] for dep in dependencies[index]],
+                        agent_locks[id(task.agent)],
+                    )
+                    running[future] = index
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    task_output = future.result()
+                    outputs[index] = task_output
+                    self._process_task_result(tasks[index], task_output)
+                    self._store_execution_log(tasks[index], task_output, index)
+
+                    for dependent in dependents[index]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            ready.append(dependent)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return self._create_crew_output([outputs[index] for index in range(len(tasks))])
+
+    def _execute_dag_task(self, task, dependency_outputs, agent_lock):
+        agent = self._get_agent_to_use(task)
+        if agent is None:
+            raise ValueError(
+                f"No agent available for task: {task.description}. "
+                f"Ensure that either the task has an assigned agent "
+                f"or a manager agent is provided."
+            )
+
+        with agent_lock:
+            tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+            self._log_task_start(task, agent.role)
+            return task.execute_sync(
+                agent=agent,
+                context=self._get_context(task, dependency_outputs),
+                tools=tools,
+            )
 
     @staticmethod
-    @lru_cache(maxsize=128)
-    def _validate_agents(name):
+    def _check_dag_tasks(tasks):
         """
-        Validate all agents in the crew.
-        Assumes schema has already been validated.
-        
-        Args:
-            name: Name of the crew to validate
-            
-        Returns:
-            Tuple[bool, Optional[str]]: (success, error_message)
+        Raise ValueError for tasks the 'dag' process cannot run like crewai would:
+        conditional tasks and tasks with async_execution, which only the sequential
+        loop of crewai handles.
         """
-        # Get crew config
-        crew_config = load_fixture('crews')[name]
-        agent_names = crew_config.get('agents', [])
-        
-        # Validate each agent
-        errors = []
-        for agent_name in agent_names:
-            ok, reason = Agent.validate(agent_name, recursive=True)
-            if not ok:
-                errors.append(f"Agent '{agent_name}': {reason}")
-        
-        if errors:
-            return False, f"Crew '{name}' has invalid agents:\n" + "\n".join(errors)
-        
-        return True, None
-    
+        for task in tasks:
+            name = getattr(task, 'name', None) or task.description
+            if isinstance(task, ConditionalTask):
+                raise ValueError(f"Task '{name}' is a ConditionalTask, which process 'dag' does not support, use process 'sequential'")
+            if getattr(task, 'async_execution', False):
+                raise ValueError(f"Task '{name}' sets async_execution, which process 'dag' does not support, it runs independent tasks concurrently already")
+
     @staticmethod
-    @lru_cache(maxsize=128)
-    def _validate_tasks(name):
-        """
-        Validate all tasks in the crew, ensuring they are in topological order.
-        Assumes schema has already been validated.
-        
-        Args:
-            name: Name of the crew to validate
-            
-        Returns:
-            Tuple[bool, Optional[str]]: (success, error_message)
-        """
-        # Get crew config
-        crew_config = load_fixture('crews')[name]
-        task_names = crew_config.get('tasks', [])
-        
-        # Get task dependency graph
-        vertices, edges = Task.task_graph()
-        
-        # Check if tasks are in topological order
-        if not is_topology_ordered(edges, reversed(task_names)):
-            return False, f"Crew '{name}' tasks are not in valid topological order"
-        
-        # Validate each task
-        errors = []
-        for task_name in task_names:
-            ok, reason = Task.validate(task_name, recursive=True)
-            if not ok:
-                errors.append(f"Task '{task_name}': {reason}")
-        
-        if errors:
-            return False, f"Crew '{name}' has invalid tasks:\n" + "\n".join(errors)
-        
-        return True, None
-    
+    def _check_dag_schedulable(remaining, dependents):
+        """Raise ValueError before running anything if the task context forms a cycle."""
+        remaining = list(remaining)
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+        scheduled = 0
+        while ready:
+            index = ready.pop()
+            scheduled += 1
+            for dependent in dependents[index]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if scheduled < len(remaining):
+            raise ValueError("Cycle detected in task dependencies, the crew cannot run with process 'dag'")
+
+    @staticmethod
+    def list_crews():
+        return load_fixture('crews', result="locations")
+
     @staticmethod
     def validate(name, recursive=True):
         """
@@ -141,23 +184,4 @@ class Crew(_Crew):
         
         Returns (True, None) on success, (False, 'failure-reason') on failure.
         """
-        # Always validate the schema first
-        ok, reason = Crew._validate_schema(name)
-        if not ok:
-            return ok, reason
-            
-        # If not recursive, just return schema validation result
-        if not recursive:
-            return True, None
-            
-        # Validate agents
-        ok, reason = Crew._validate_agents(name)
-        if not ok:
-            return ok, reason
-            
-        # Validate tasks
-        ok, reason = Crew._validate_tasks(name)
-        if not ok:
-            return ok, reason
-            
-        return True, None
+        return validate_crew(name, recursive=recursive)
@@ -1,23 +1,252 @@
+import glob
+import hashlib
 import os
+import pickle
+import tempfile
+import threading
 import yaml
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 
 _fixture_dir = os.path.normpath(__file__ + '/../fixtures')
 
+# Fixture names read by the CLI; used when rebuilding snapshots ahead of time.
+FIXTURE_NAMES = ('agents', 'tasks', 'crews')
+
+# Bump whenever the snapshot payload layout changes.
+_SNAPSHOT_VERSION = 1
+
+# libyaml's C loader when PyYAML was built against it. Both are safe loaders and
+# keep YAML anchors and merge keys (<<: *task_common) working.
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Upper bound on threads used to read fixture files concurrently
+_MAX_PARSE_WORKERS = 8
+
+# Process-wide fixture registry.
+#   _fixture_file_lists: (fixture name, runtime config, cwd) -> (directory stamps, fixture files found)
+#   _parsed_files:   filename -> (stamp, parsed object) for every fixture file read so far
+#   _merged_fixtures: fixture name -> (stamps, objects view, locations view)
+# A stamp is (mtime_ns, size); a file is only parsed again when its stamp changes.
+# Directories are stamped with their mtime_ns, which changes when an entry is
+# added or removed, and only listed again when one of them changed.
+_fixture_file_lists = {}
+_parsed_files = {}
+_merged_fixtures = {}
+_registry_lock = threading.RLock()
+
 def load_fixture(fixture_name, result="objects"):
-    merged = {}
-    indexies = {}
+    """Load the merged fixture set for fixture_name across all runtime directories.
 
-    for runtimedir in runtimedirs():
+    Files are parsed once per process and re-read only when their mtime or size
+    changes. Across processes the merged set is reused from an on-disk snapshot
+    keyed by the content hash of the fixture files (see fixture_cache_dir).
+    Runtime directories are only listed again when one of them changed.
+
+    The returned mappings are read-only views shared by all callers, but only
+    at the top level: entries and the dicts and lists inside them are the
+    registry's own objects. Copy an entry (e.g. dict(load_fixture('agents')[name]))
+    before changing its keys, and never mutate the values nested in it.
+    """
+    try:
+        stamps = tuple((filename, _file_stamp(filename)) for filename in fixture_files(fixture_name))
+    except FileNotFoundError:
+        # A file found earlier was removed, look for the files again
+        with _registry_lock:
+            _fixture_file_lists.clear()
+        stamps = tuple((filename, _file_stamp(filename)) for filename in fixture_files(fixture_name))
+
+    with _registry_lock:
+        cached = _merged_fixtures.get(fixture_name)
+        if cached is None or cached[0] != stamps:
+            merged, indexies = _load_merged_fixture(fixture_name, [filename for filename, _ in stamps])
+            cached = (stamps, MappingProxyType(merged), MappingProxyType(indexies))
+            _merged_fixtures[fixture_name] = cached
+
+    if result == "objects":
+        return cached[1]
+    elif result == "locations":
+        return cached[2]
+
+def fixture_files(fixture_name):
+    """List the fixture files named fixture_name.yaml/.yml under runtimedirs.
+
+    The files found are reused, with one stat per runtime directory, until an
+    entry is added to or removed from one of the directories.
+    """
+    key = (fixture_name, runtime_config(), os.getcwd())
+    with _registry_lock:
+        cached = _fixture_file_lists.get(key)
+    if cached is not None and _dir_stamps(directory for directory, _ in cached[0]) == cached[0]:
+        return list(cached[1])
+
+    directories = runtimedirs()
+    dir_stamps = _dir_stamps(directories)
+    filenames = []
+    for runtimedir in directories:
         for extension in ['yaml', 'yml']:
             filename = os.path.join(runtimedir, f"{fixture_name}.{extension}")
             if os.path.isfile(filename):
-                populate_fixture_from_file(merged, filename, indexies)
+                filenames.append(filename)
+    with _registry_lock:
+        _fixture_file_lists[key] = (dir_stamps, tuple(filenames))
+    return filenames
 
-    if result == "objects":
-        return merged
-    elif result == "locations":
-        return indexies
+def _dir_stamps(directories):
+    stamps = []
+    for directory in directories:
+        try:
+            stamps.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            stamps.append((directory, None))
+    return tuple(stamps)
+
+def clear_fixture_cache():
+    """Drop every fixture file found, parsed and merged by the process-wide registry."""
+    with _registry_lock:
+        _fixture_file_lists.clear()
+        _parsed_files.clear()
+        _merged_fixtures.clear()
+
+def fixture_cache_dir():
+    """Directory holding compiled fixture snapshots.
+
+    Defaults to $XDG_CACHE_HOME/techies (~/.cache/techies) and can be moved with
+    TECHIES_CACHE_DIR. Setting TECHIES_FIXTURE_CACHE=0 disables snapshots.
+    Snapshots are pickles, they are only read from a directory owned by the
+    user with mode 0700, which is how it is created.
+    """
+    if 'TECHIES_CACHE_DIR' in os.environ:
+        return os.environ['TECHIES_CACHE_DIR']
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_home, 'techies')
+
+def rebuild_fixture_snapshots(fixture_names=FIXTURE_NAMES):
+    """Parse the fixture files again and rewrite their snapshots.
+
+    Returns:
+        dict: fixture name -> snapshot path (None when snapshots are disabled)
+    """
+    rebuilt = {}
+    with _registry_lock:
+        clear_fixture_cache()
+        for fixture_name in fixture_names:
+            filenames = fixture_files(fixture_name)
+            merged, indexies, conflicts = _merge_fixture_files(filenames)
+            rebuilt[fixture_name] = _write_snapshot(_snapshot_path(fixture_name, filenames), merged, indexies, conflicts)
+    return rebuilt
+
+def clear_fixture_snapshots():
+    """Remove every fixture snapshot from the cache directory.
+
+    Returns:
+        int: Number of snapshot files removed
+    """
+    removed = 0
+    for path in glob.glob(os.path.join(fixture_cache_dir(), 'fixtures-*.pickle')):
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+def _load_merged_fixture(fixture_name, filenames):
+    # Hashing the fixture files is the costly part, done once for the read and the write
+    path = _snapshot_path(fixture_name, filenames)
+    snapshot = _read_snapshot(path)
+    if snapshot is not None:
+        for message in snapshot['conflicts']:
+            warnings.warn(message)
+        return snapshot['objects'], snapshot['locations']
+
+    merged, indexies, conflicts = _merge_fixture_files(filenames)
+    _write_snapshot(path, merged, indexies, conflicts)
+    return merged, indexies
+
+def _merge_fixture_files(filenames):
+    merged = {}
+    indexies = {}
+    conflicts = []
+    # Parse concurrently, then merge strictly in runtimedirs() order
+    parse_fixture_files(filenames)
+    for filename in filenames:
+        conflicts.extend(populate_fixture_from_file(merged, filename, indexies))
+    return merged, indexies, conflicts
+
+def _snapshots_enabled():
+    return os.environ.get('TECHIES_FIXTURE_CACHE', '1') != '0'
+
+def _snapshot_path(fixture_name, filenames):
+    """Snapshot file of the current content of filenames, None when snapshots are disabled."""
+    if not _snapshots_enabled():
+        return None
+    digest = hashlib.sha256(f"{_SNAPSHOT_VERSION}:{fixture_name}".encode())
+    for filename in filenames:
+        digest.update(filename.encode('utf-8') + b'\0')
+        with open(filename, 'rb') as f:
+            digest.update(f.read())
+        digest.update(b'\0')
+    return os.path.join(fixture_cache_dir(), f"fixtures-{fixture_name}-{digest.hexdigest()}.pickle")
+
+def _is_private(stat, directory=False):
+    """Whether the user owns the file and nobody else can write it, or use it for a directory."""
+    if not hasattr(os, 'getuid'):
+        # No POSIX owners and modes, the cache directory lives in the user profile
+        return True
+    return stat.st_uid == os.getuid() and not stat.st_mode & (0o077 if directory else 0o022)
+
+def _read_snapshot(path):
+    if path is None:
+        return None
+    try:
+        # Unpickling runs code, only trust snapshots nobody else could have written
+        if not _is_private(os.stat(os.path.dirname(path)), directory=True):
+            return None
+        with open(path, 'rb') as f:
+            if not _is_private(os.fstat(f.fileno())):
+                return None
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != _SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+def _write_snapshot(path, merged, indexies, conflicts):
+    if path is None:
+        return None
+    snapshot = {
+        'version': _SNAPSHOT_VERSION,
+        'objects': merged,
+        'locations': indexies,
+        'conflicts': conflicts,
+    }
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        stat = os.stat(directory)
+        if not _is_private(stat, directory=True):
+            if not hasattr(os, 'getuid') or stat.st_uid != os.getuid():
+                warnings.warn(f"Not writing fixture snapshots to {directory}, it belongs to another user")
+                return None
+            # Created before snapshots required it, readers skip it otherwise
+            os.chmod(directory, 0o700)
+        # Write to a temporary file first so concurrent readers never see a partial snapshot
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # A read-only or missing cache directory must never break fixture loading
+        warnings.warn(f"Failed to write fixture snapshot {path}: {e}")
+        return None
+    return path
+
+def _file_stamp(filename):
+    stat = os.stat(filename)
+    return (stat.st_mtime_ns, stat.st_size)
 
 def runtime_config():
     # Only include current directory if .techiesbase is not present
@@ -29,34 +258,72 @@ def runtime_config():
     return os.environ.get('TECHIES_RUNTIME', runtimedir_default)
 
 def runtimedirs():
+    """List runtime directories in precedence order, lowest first.
+
+    Each path of runtime_config() is followed by its first level subdirectories
+    in sorted order, so definitions in later entries override earlier ones.
+    Duplicates keep their first position.
+    """
     runtimedirs = []
 
     # Add runtime and first level subdirectories
     for path in runtime_config().split(os.pathsep):
         runtimedirs.append(path)
-        for subpath in os.listdir(path):
+        for subpath in sorted(os.listdir(path)):
             # avoid hidden or "_" prefixed directories
             if subpath.startswith('.') or subpath.startswith('_'):
                 continue
             runtimedirs.append(os.path.join(path, subpath))
 
     realpaths = [os.path.realpath(d) for d in runtimedirs if os.path.isdir(d)]
-    return set(realpaths)
+    return list(dict.fromkeys(realpaths))
 
 def populate_fixture_from_file(merged, filename, indexies):
-    with open(filename, 'r', encoding='utf-8') as f:
-        obj = yaml.load(f, Loader=yaml.FullLoader)
-
-    for key in list(obj.keys()):
-        if key.startswith('_'):
-            obj.pop(key)
+    obj = {key: value for key, value in parse_fixture_file(filename).items()
+           if not key.startswith('_')}
 
+    messages = []
     conflicts = merged.keys() & obj.keys()
     for key in conflicts:
-        warnings.warn(f"Instance {key} is defined multiple times. \n\tCurrent key located at {filename}\n\tWhile it has been defined in {indexies[key]}")
+        messages.append(f"Instance {key} is defined multiple times. \n\tCurrent key located at {filename}\n\tWhile it has been defined in {indexies[key]}")
+        warnings.warn(messages[-1])
 
     merged.update(obj)
     indexies.update({key: filename for key in obj.keys()})
+    return messages
+
+def parse_fixture_file(filename):
+    """Parse a fixture file, reusing the registry entry if the file is unchanged."""
+    return parse_fixture_files([filename])[0]
+
+def parse_fixture_files(filenames):
+    """Parse fixture files, reading the ones missing from the registry concurrently.
+
+    Returns:
+        list: Parsed objects in the same order as filenames
+    """
+    stamps = [_file_stamp(filename) for filename in filenames]
+    with _registry_lock:
+        stale = [
+            (filename, stamp) for filename, stamp in zip(filenames, stamps)
+            if _parsed_files.get(filename, (None,))[0] != stamp
+        ]
+
+    if len(stale) > 1:
+        workers = min(len(stale), _MAX_PARSE_WORKERS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            objs = list(executor.map(_read_fixture_file, [filename for filename, _ in stale]))
+    else:
+        objs = [_read_fixture_file(filename) for filename, _ in stale]
+
+    with _registry_lock:
+        for (filename, stamp), obj in zip(stale, objs):
+            _parsed_files[filename] = (stamp, obj)
+        return [_parsed_files[filename][1] for filename in filenames]
+
+def _read_fixture_file(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
 
 def find_scripts(script_type):
     """Find all [type].py files and Python files in [type]/ folders under runtimedirs.
@@ -96,4 +363,7 @@ def find_callbacks():
     """Find all callbacks.py files and Python files in callbacks/ folders under runtimedirs.""" 
     return find_scripts("callbacks")
 
-__all__ = ['load_fixture', 'find_tools', 'find_callbacks']
+__all__ = [
+    'load_fixture', 'clear_fixture_cache', 'rebuild_fixture_snapshots', 'clear_fixture_snapshots',
+    'find_tools', 'find_callbacks'
+]
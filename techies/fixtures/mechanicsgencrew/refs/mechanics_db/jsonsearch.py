@@ -1,22 +1,18 @@
 import json
 import os
-import faiss
-import numpy as np
-from sentence_transformers import SentenceTransformer
+from techies.mechanics.encoder import get_query_cache
+from techies.mechanics.embed import embed_mechanics
+from techies.mechanics.index import load_index, requested_config
+from techies.mechanics.lexical import load_lexical_index
+from techies.mechanics.manifest import find_mechanics_json, update_manifest, resolve_mechanics_db, MANIFEST_FILE
+from techies.mechanics.search import search_mechanics, mechanic_results
+from techies.mechanics.server import connect
+from techies.mechanics.store import open_store, export_json, store_path_for, DEFAULT_MODEL
 
 #Create embeddings file
-def embed_json():
-    mechanics_suffix = 'mechanics.json'
-    current_directory = os.getcwd() 
-    filename = None
-    
-    for root, _, files in os.walk(current_directory):
-        for file in files:
-            if file.endswith(mechanics_suffix):
-                filename = os.path.join(root, file)
-                break
-        if filename:
-            break
+def embed_json(json_export=True, batch_size=None, filename=None, dtype=None):
+    # Latest file ending in mechanics.json in the working directory, unless given
+    filename = filename or find_mechanics_json()
     if filename:
         print(f"Mechanics file found: {filename}")
     else:
@@ -26,69 +22,71 @@ def embed_json():
     with open(filename, 'r') as infile:
         mechanics = json.load(infile)
 
-    # Initialize BERT-based model
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-
-    # Compute embedding for each mechanic and add it as a new field
-    for mechanic in mechanics:
-        text = f"{mechanic['Name']}. {mechanic['Description']}"
-        embedding = model.encode(text).tolist()  # Convert numpy array to list for JSON serialization
-        mechanic['embedding'] = embedding
-
-    base_name, ext = os.path.splitext(filename)
-    output_filename = f"{base_name}_embedded{ext}"
+    # Binary store read by the query tools, only new or edited mechanics are encoded.
+    # dtype (float16, int8) or TECHIES_MECHANICS_DTYPE shrinks the stored vectors
+    result = embed_mechanics(mechanics, store_path_for(filename), DEFAULT_MODEL, batch_size=batch_size, dtype=dtype)
+    store = open_store(result.path)
+    # The saved index is only rebuilt if some vector changed
+    load_index(store)
+    print(f"Embeddings saved to '{store.path}' ({result.encoded} encoded, {result.reused} reused).")
+    # Searches find the store through the manifest instead of walking the working directory
+    manifest = update_manifest(store, source=filename)
+    print(f"Mechanics store recorded in '{manifest}'.")
 
-    with open(output_filename, 'w') as outfile:
-        json.dump(mechanics, outfile, indent=2)
-
-    print(f"Embeddings created and saved to '{output_filename}'.")
+    if json_export:
+        base_name, ext = os.path.splitext(filename)
+        output_filename = export_json(store, f"{base_name}_embedded{ext}")
+        print(f"Embeddings exported to '{output_filename}'.")
     
     
 # Query mechanics
-def search_mechanics_dynamic(query, initial_top_k=10, threshold=1.5):
-    embed_suffix = '_embedded.json'
-    current_directory = os.getcwd() 
-    filename = None
-    mechanics = None
-    for root, _, files in os.walk(current_directory):
-        for file in files:
-            if file.endswith(embed_suffix):
-                filename = os.path.join(root, file)
-                break
-        if filename:
-            break
+def search_mechanics_dynamic(query, initial_top_k=10, threshold=1.5, index_type=None, metric=None, search_mode="range", retrieval="hybrid", mechanics_db=None):
+    # Explicit database, TECHIES_MECHANICS_DB or the manifest written by embed_json
+    filename = resolve_mechanics_db(mechanics_db)
     if not filename:
-        print("No file ending in _embedded.json found. Exiting...")
+        print(f"No mechanics database given, no {MANIFEST_FILE} and no mechanics store in the working directory. Exiting...")
         return
     
-    with open(filename, 'r') as infile:
-        mechanics = json.load(infile)
-    
-    embeddings = np.array([m['embedding'] for m in mechanics]).astype('float32')
+    mechanics = open_store(filename)
 
-    # Create a FAISS index (using L2 distance)
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)  # Add our vectors to the index
+    # Mechanics strictly closer than threshold, at most initial_top_k of them, closest first.
+    # "range" asks FAISS for exactly those, "top_k" retrieves initial_top_k candidates and filters.
+    # "hybrid" retrieval fuses them with BM25 matches of the query words, "lexical" only uses those.
+    config = requested_config(index_type, metric)
+    neighbours = None
 
-    # Initialize the same SentenceTransformer model for queries
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    
-    # Compute the query embedding using the same model
-    query_embedding = model.encode(query).astype('float32')
-    query_embedding = np.expand_dims(query_embedding, axis=0)
-    
-    # Retrieve a larger set of candidates initially
-    distances, indices = index.search(query_embedding, initial_top_k)
+    # A 'techies mechanics serve' daemon answers without loading the model and indexes here
+    client = connect()
+    if client is not None:
+        try:
+            neighbours = client.search(mechanics, [query], threshold, initial_top_k, search_mode, retrieval, config)[0]
+        except (OSError, RuntimeError) as e:
+            print(f"Mechanics daemon unavailable, searching in process: {e}")
+        finally:
+            client.close()
+
+    if neighbours is None:
+        # FAISS index (squared L2 distance, on normalized vectors for the cosine metric)
+        # saved with the store, rebuilt only when stale or of another type
+        index = load_index(mechanics, config)
+
+        # Query embedding from the same model the mechanics were embedded with, cached per process
+        query_embedding = None
+        if retrieval != "lexical":
+            query_embedding = get_query_cache(mechanics.model or DEFAULT_MODEL).encode(query)
+
+        neighbours = search_mechanics(
+            mechanics, index, load_lexical_index(mechanics), [query], query_embedding,
+            threshold, initial_top_k, search_mode, retrieval,
+        )[0]
     
-    # lower distance means more similar.
+    # lower distance means more similar. Every result is a new dict, the store is never modified.
     relevant_results = []
-    for dist, idx in zip(distances[0], indices[0]):
-        if dist < threshold:
-            normalized_similarity = max(0, (threshold - dist) / threshold)
-            mechanic = mechanics[idx]
-            mechanic['similarity_score'] = round(normalized_similarity, 4)
-            relevant_results.append(mechanic)
+    for result in mechanic_results(neighbours, threshold):
+        mechanic = mechanics.record(result.index)
+        if result.score is not None:
+            mechanic['similarity_score'] = result.score
+        relevant_results.append(mechanic)
     return relevant_results
 
 # def main():
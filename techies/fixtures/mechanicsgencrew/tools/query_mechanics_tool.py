@@ -1,103 +1,199 @@
-import json, glob
-import numpy as np
+import asyncio
+import functools
+import threading
 from pydantic import PrivateAttr
 import os
 from pydantic import BaseModel, Field
-from typing import Type, List, Any
-from sentence_transformers import SentenceTransformer
-import faiss
+from typing import Type, Any, Dict, List, Optional
+from techies.mechanics.encoder import get_query_cache, preload_encoder, is_encoder_loaded, QueryCache
+from techies.mechanics.index import load_index, requested_config, SEARCH_MODES
+from techies.mechanics.lexical import load_lexical_index, LexicalIndex
+from techies.mechanics.search import search_mechanics, mechanic_results, MechanicResult, RETRIEVAL_MODES
+from techies.mechanics.manifest import resolve_mechanics_db
+from techies.mechanics.server import connect, MechanicsClient
+from techies.mechanics.store import open_store, MechanicsStore, DEFAULT_MODEL
 
 class QueryMechanicsToolSchema(BaseModel):
-  query: str = Field(type=str, description="Search query for game mechanic.")
+  query: str = Field(default="", description="Search query for game mechanic.")
+  queries: Optional[List[str]] = Field(default=None, description="Several search queries, answered together with results grouped per query.")
     
 class QueryMechanicsTool(BaseTool):
   name: str = "Query Mechanics Tool"
   id: str = "query_mechanics"
   description: str = (
       "Searches a JSON file of game mechanics (with precomputed embeddings) for the closest "
-      "semantic match to the query. Returns matching mechanics that fall within a given threshold."
-      "Must have an embeddings file ending with '_embedded.json' in the current working directory."
+      "semantic match to the query. Returns matching mechanics that fall within a given threshold, "
+      "closest first: distances are squared L2 between embeddings (lower is closer) and the similarity "
+      "score is 1 - distance / threshold. Exact words of mechanic names and descriptions also match. "
+      "Pass several queries in 'queries' to search them together. "
+      "Searches the database recorded in mechanics_index.json by the embed_file callback, or the bundled platformer mechanics."
   )
   args_schema: Type[BaseModel] = QueryMechanicsToolSchema
 
   _embeddings_file: str = PrivateAttr()
   _initial_top_k: int = PrivateAttr()
+  _max_results: int = PrivateAttr()
+  _search_mode: str = PrivateAttr()
   _threshold: float = PrivateAttr()
-  _mechanics: List[Any] = PrivateAttr()
-  _embeddings: np.ndarray = PrivateAttr()
+  _mechanics: MechanicsStore = PrivateAttr()
   _dimension: int = PrivateAttr()
   _index: Any = PrivateAttr()
-  _model: Any = PrivateAttr()
+  _model_name: str = PrivateAttr()
+  _lexical: LexicalIndex = PrivateAttr()
+  _retrieval: str = PrivateAttr()
+  _encoder_loading: Any = PrivateAttr()
+  _query_cache: QueryCache = PrivateAttr()
+  _index_config: Any = PrivateAttr()
+  _client: Optional[MechanicsClient] = PrivateAttr()
+  _blocks: Dict[int, str] = PrivateAttr()
+  _lock: Any = PrivateAttr()
 
-  def __init__(self, initial_top_k: int = 15, threshold: float = 1.5, **kwargs):
+  def __init__(self, initial_top_k: int = 15, threshold: float = 1.5, query_cache_size: Optional[int] = None,
+               max_results: Optional[int] = None, search_mode: str = "range", retrieval: str = "hybrid",
+               index_type: Optional[str] = None, metric: Optional[str] = None, index_params: Optional[dict] = None,
+               mechanics_db: Optional[str] = None, use_daemon: bool = True, **kwargs):
       super().__init__(**kwargs)
       
-      embedded_files = glob.glob(os.path.join(os.getcwd(), "*_embedded.json"))
-      if embedded_files:
-          # Use the first matching file in the working directory
-          self._embeddings_file = os.path.normpath(embedded_files[0])
+      # mechanics_db, TECHIES_MECHANICS_DB or the manifest in the working directory or TECHIES_RUNTIME
+      embedded_file = resolve_mechanics_db(mechanics_db)
+      if embedded_file:
+          self._embeddings_file = os.path.normpath(embedded_file)
       else:
           # Fallback to the default path relative to __file__
+          print("No mechanics database found. Using default path for platformer mechanics.")
           self._embeddings_file = os.path.normpath(
-              print("No embedded files found in the current directory. Using default path for platformer mechanics."),
-              os.path.join(os.path.dirname(__file__), "../refs/mechanics_db/platformer_mechanics_embedded.json")
-          )      
-          
+              os.path.join(os.path.dirname(__file__), "../refs/mechanics_db/platformer_mechanics.mechdb")
+          )
+
+      # Mechanics strictly closer than threshold are returned, at most max_results of them.
+      # The "range" mode asks FAISS for exactly those, "top_k" searches the max_results nearest and filters.
+      if search_mode not in SEARCH_MODES:
+          raise ValueError(f"Unknown search mode '{search_mode}', expected one of {', '.join(SEARCH_MODES)}")
+      # "hybrid" fuses the vector and lexical (BM25) rankings, "vector" and "lexical" use one of them
+      if retrieval not in RETRIEVAL_MODES:
+          raise ValueError(f"Unknown retrieval mode '{retrieval}', expected one of {', '.join(RETRIEVAL_MODES)}")
+      self._retrieval = retrieval
       self._initial_top_k = initial_top_k
+      self._max_results = max_results or initial_top_k
+      self._search_mode = search_mode
       self._threshold = threshold
 
-      # Load the mechanics JSON with embeddings
+      # Open the mechanics store, vectors are memory-mapped and records decoded on demand
       try:
-          with open(self._embeddings_file, 'r') as infile:
-              self._mechanics = json.load(infile)
+          self._mechanics = open_store(self._embeddings_file)
       except Exception as e:
           raise ValueError(f"Failed to load mechanics from {self._embeddings_file}: {e}")
 
-      # Build a FAISS index from the precomputed embeddings
-      try:
-          self._embeddings = np.array([m['embedding'] for m in self._mechanics]).astype('float32')
-          self._dimension = self._embeddings.shape[1]
-          self._index = faiss.IndexFlatL2(self._dimension)
-          self._index.add(self._embeddings)
-      except Exception as e:
-          raise ValueError(f"Failed to build FAISS index: {e}")
+      self._dimension = self._mechanics.dimension
+      self._model_name = self._mechanics.model or DEFAULT_MODEL
+      self._index_config = requested_config(index_type, metric, **(index_params or {}))
 
-      # Initialize the SentenceTransformer for query encoding
-      try:
-          self._model = SentenceTransformer('all-MiniLM-L6-v2')
-      except Exception as e:
-          raise ValueError(f"Failed to initialize SentenceTransformer: {e}")
+      # A 'techies mechanics serve' daemon already holds the model and indexes, searches go
+      # there and nothing is loaded here unless it becomes unreachable
+      self._client = connect() if use_daemon else None
+      self._index = None
+      self._lock = threading.Lock()
+      # Rendered text of each mechanic returned so far, records are never modified
+      self._blocks = {}
+      if self._client is None:
+          self._load_local()
+
+      # Repeated queries are answered from the process-wide LRU cache of query embeddings
+      if query_cache_size is None:
+          self._query_cache = get_query_cache(self._model_name)
+      else:
+          self._query_cache = QueryCache(self._model_name, query_cache_size)
+
+  def _load_local(self):
+      # Threads falling back together load once
+      with self._lock:
+          if self._index is not None:
+              return
+          # Load the FAISS index saved with the store, it is only rebuilt when the vectors or the
+          # requested index type (flat, ivf_flat, hnsw, ivf_pq) and metric (l2, cosine) changed
+          try:
+              index = load_index(self._mechanics, self._index_config)
+          except Exception as e:
+              raise ValueError(f"Failed to build FAISS index: {e}")
+
+          # BM25 index saved with the store
+          self._lexical = load_lexical_index(self._mechanics)
+
+          # Shared SentenceTransformer for query encoding, loaded once per process in the background.
+          # Hybrid searches only use the lexical index until it is ready.
+          self._encoder_loading = preload_encoder(self._model_name) if self._retrieval != "lexical" else None
+          self._index = index
+
+  def _search(self, queries: List[str]) -> list:
+      # Read once, another thread may drop the client meanwhile
+      client = self._client
+      if client is not None:
+          try:
+              return client.search(
+                  self._mechanics, queries, self._threshold, self._max_results,
+                  self._search_mode, self._retrieval, self._index_config,
+              )
+          except (OSError, RuntimeError) as e:
+              print(f"Mechanics daemon unavailable, searching in process: {e}")
+              self._client = None
+              client.close()
+      self._load_local()
+
+      # All queries are encoded in one batch and searched with a single call. A model still
+      # loading (not failed) makes hybrid searches lexical, vector searches wait for it.
+      query_embeddings = None
+      if self._retrieval == "vector" or (
+          self._retrieval == "hybrid"
+          and (is_encoder_loaded(self._model_name) or not self._encoder_loading.is_alive())
+      ):
+          query_embeddings = self._query_cache.encode(queries)
+      return search_mechanics(
+          self._mechanics, self._index, self._lexical, queries, query_embeddings,
+          self._threshold, self._max_results, self._search_mode, self._retrieval,
+      )
 
   def _run(self, **kwargs) -> str:
-      query = kwargs.get("query", "")
-      if not query:
+      queries = [q for q in (kwargs.get("queries") or []) if q]
+      if kwargs.get("query"):
+          queries.insert(0, kwargs["query"])
+      if not queries:
           return "No query provided."
 
-      query_embedding = self._model.encode(query).astype('float32')
-      query_embedding = np.expand_dims(query_embedding, axis=0)
+      results = [mechanic_results(pairs, self._threshold) for pairs in self._search(queries)]
+      if len(queries) == 1:
+          return self._format_results(results[0])
 
-      distances, indices = self._index.search(query_embedding, self._initial_top_k)
+      response_lines = []
+      for i, (query, relevant_results) in enumerate(zip(queries, results), 1):
+          response_lines.append(f"=== Query {i}: {query} ===")
+          response_lines.append(self._format_results(relevant_results))
+      return "\n".join(response_lines)
 
-      relevant_results = []
-      for dist, idx in zip(distances[0], indices[0]):
-          if dist < self._threshold:
-              normalized_similarity = max(0, (self._threshold - dist) / self._threshold)
-              mechanic = self._mechanics[idx]
-              mechanic['similarity_score'] = round(normalized_similarity, 4)
-              relevant_results.append(mechanic)
+  def _block(self, idx: int) -> str:
+      block = self._blocks.get(idx)
+      if block is None:
+          # Concurrent renders of the same mechanic are identical, the last one is kept
+          mechanic = self._mechanics.record(idx)
+          block = self._blocks[idx] = "\n".join([
+              f"Name: {mechanic.get('Name', 'N/A')}",
+              f"Description: {mechanic.get('Description', 'N/A')}",
+              f"Implementation Details: {mechanic.get('Implementation Details', 'N/A')}",
+              f"Pseudocode: {mechanic.get('Pseudocode', 'N/A')}",
+          ])
+      return block
 
+  def _format_results(self, relevant_results: List[MechanicResult]) -> str:
       if not relevant_results:
           return "No relevant game mechanics found for your query."
 
       response_lines = []
       for i, result in enumerate(relevant_results, 1):
           response_lines.append(f"Result {i}:")
-          response_lines.append(f"Name: {result.get('Name', 'N/A')}")
-          response_lines.append(f"Description: {result.get('Description', 'N/A')}")
-          response_lines.append(f"Implementation Details: {result.get('Implementation Details', 'N/A')}")
-          response_lines.append(f"Pseudocode: {result.get('Pseudocode', 'N/A')}")
-          response_lines.append(f"Similarity Score: {result.get('similarity_score', 'N/A')}\n")
+          response_lines.append(self._block(result.index))
+          response_lines.append(f"Similarity Score: {'N/A' if result.score is None else result.score}\n")
       return "\n".join(response_lines)
 
   async def _arun(self, **kwargs) -> str:
-      return self._run(**kwargs)
+      # Encoding and searching block, run them on the default executor
+      loop = asyncio.get_running_loop()
+      return await loop.run_in_executor(None, functools.partial(self._run, **kwargs))
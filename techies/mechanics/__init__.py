@@ -0,0 +1,4 @@
+"""
+Storage and retrieval of game mechanics databases, shared by the
+mechanicsgencrew tools and callbacks.
+"""
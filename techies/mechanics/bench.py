@@ -0,0 +1,298 @@
+"""
+Benchmarks of the mechanics retrieval path.
+
+run_benchmark measures the bundled platformer database and synthetic corpora
+of any size. Each corpus is stored once per vector dtype, then every mode, a
+(dtype, index type) pair, is measured separately:
+
+- index build time, index load time from the store and index size
+- per query search latency percentiles and batch throughput
+- recall@k against exact search over the float32 vectors
+- peak RSS of the process once measured
+
+Model load time and per query encode latency are measured once per run. The
+stub encoder hashes words to vectors, so benchmarks run offline and without
+any model, give a model name to measure a locally cached SentenceTransformer.
+Results are plain dicts, meant to be saved as JSON and compared across releases.
+"""
+import functools
+import math
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from techies.mechanics import encoder as mechanics_encoder
+from techies.mechanics.embed import mechanic_text
+from techies.mechanics.index import INDEX_FILE, build_index, index_config, load_index, save_index, threshold_search
+from techies.mechanics.lexical import tokenize
+from techies.mechanics.store import STORE_SUFFIX, VECTOR_DTYPES, open_store, store_from_json, write_store
+
+BENCH_VERSION = 1
+
+STUB_ENCODER = 'stub'
+STUB_DIMENSION = 384
+
+BUNDLED_JSON = os.path.normpath(os.path.join(
+    os.path.dirname(__file__), '../fixtures/mechanicsgencrew/refs/mechanics_db/platformer_mechanics_embedded.json'
+))
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_MODES = (
+    ('float32', 'flat'),
+    ('float32', 'ivf_flat'),
+    ('float32', 'hnsw'),
+    ('float32', 'ivf_pq'),
+    ('float32', 'pq'),
+    ('float16', 'sq_fp16'),
+    ('int8', 'sq8'),
+)
+PERCENTILES = (50, 95, 99)
+
+# Words of the descriptions of synthetic mechanics
+WORDS = """
+jump dash slide climb wall ledge air double coyote time grace buffer wind
+spring bounce glide swing rope hook grapple crouch roll sprint stomp enemy
+coin key door switch platform moving falling crumbling ladder water swim
+checkpoint respawn health damage shield power up timer combo score camera
+""".split()
+
+
+def parse_mode(mode: str) -> Tuple[str, str]:
+    """
+    Parse 'dtype:index', e.g. 'int8:sq8'.
+
+    Raises:
+        ValueError: If the dtype or index type is unknown
+    """
+    dtype, sep, index_type = mode.partition(':')
+    if not sep or dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Expected dtype:index with a dtype among {', '.join(VECTOR_DTYPES)}, got '{mode}'")
+    index_config(index_type)
+    return dtype, index_type
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_vector(word: str, dimension: int) -> np.ndarray:
+    return np.random.default_rng(zlib.crc32(word.encode('utf-8'))).standard_normal(dimension).astype(np.float32)
+
+
+class StubEncoder:
+    """Offline stand-in for a SentenceTransformer, each text the normalized sum of random word vectors."""
+
+    def __init__(self, dimension: int = STUB_DIMENSION):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, batch_size: int = 32, convert_to_numpy: bool = True) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in tokenize(text) or [text]:
+                vectors[i] += _word_vector(word, self.dimension)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def synthetic_corpus(count: int, dimension: int = STUB_DIMENSION, seed: int = 0,
+                     chunk: int = 65536) -> Tuple[Callable[[], Iterable[Dict[str, Any]]], np.ndarray]:
+    """
+    count mechanics with unit vectors drawn around sqrt(count) centers,
+    like embeddings of related mechanics.
+
+    Returns:
+        Tuple: A function generating the records, and the vectors
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, int(math.sqrt(count))), dimension)).astype(np.float32)
+    vectors = np.empty((count, dimension), dtype=np.float32)
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        batch = centers[rng.integers(0, len(centers), size)] + 0.5 * rng.standard_normal((size, dimension), dtype=np.float32)
+        vectors[start:start + size] = batch / np.linalg.norm(batch, axis=1, keepdims=True)
+
+    def records():
+        for i in range(count):
+            words = [WORDS[(i * 7 + j * 13) % len(WORDS)] for j in range(6)]
+            yield {'Name': f"Mechanic {i}", 'Description': f"{' '.join(words).capitalize()}."}
+
+    return records, vectors
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentiles(samples_ms: Sequence[float]) -> Dict[str, float]:
+    values = np.percentile(np.asarray(samples_ms, dtype=np.float64), PERCENTILES) if len(samples_ms) else [0.0] * len(PERCENTILES)
+    return {f"p{p}": round(float(value), 4) for p, value in zip(PERCENTILES, values)}
+
+
+def _timed(function, *args) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def sample_queries(vectors: np.ndarray, count: int, seed: int = 0) -> np.ndarray:
+    """Stored vectors with some noise added, as compare_indexes uses."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    return np.ascontiguousarray(vectors[picks] + rng.normal(0, 0.05, size=(len(picks), vectors.shape[1])), dtype=np.float32)
+
+
+def bench_encoder(model_name: str, texts: Sequence[str]) -> Dict[str, Any]:
+    """Load time of model_name, or the stub encoder, and its latency encoding each text alone."""
+    if model_name == STUB_ENCODER:
+        encoder, load_ms = _timed(StubEncoder)
+    else:
+        # Only a model already in the local cache can be loaded
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+        encoder, load_ms = _timed(mechanics_encoder._load_encoder, model_name)
+
+    latencies = [_timed(encoder.encode, [text])[1] for text in texts]
+    _, batch_ms = _timed(encoder.encode, list(texts))
+    return {
+        'model': model_name,
+        'dimension': int(encoder.get_sentence_embedding_dimension()),
+        'load_ms': round(load_ms, 3),
+        'encode_ms': percentiles(latencies),
+        'batch_texts_per_second': round(len(texts) / max(batch_ms / 1000, 1e-9), 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def bench_corpus(name: str, records: Callable[[], Iterable[Dict[str, Any]]], vectors: np.ndarray, directory: str,
+                 modes: Sequence[Tuple[str, str]] = DEFAULT_MODES, num_queries: int = 200, k: int = 10,
+                 metric: str = 'l2', seed: int = 0) -> Dict[str, Any]:
+    """Measure every mode over one corpus, stored in directory."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    queries = sample_queries(vectors, num_queries, seed)
+    k = min(k, len(vectors))
+    exact = faiss.IndexFlatL2(vectors.shape[1]) if metric == 'l2' else faiss.IndexFlatIP(vectors.shape[1])
+    exact_vectors = vectors if metric == 'l2' else vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    exact.add(exact_vectors)
+    _, expected = exact.search(queries if metric == 'l2' else queries / np.linalg.norm(queries, axis=1, keepdims=True), k)
+    del exact, exact_vectors
+
+    report = {'name': name, 'count': len(vectors), 'dimension': int(vectors.shape[1]), 'stores': {}, 'modes': []}
+    stores = {}
+    for dtype in dict.fromkeys(dtype for dtype, _ in modes):
+        path = os.path.join(directory, f"{name}-{dtype}{STORE_SUFFIX}")
+        _, write_ms = _timed(lambda: write_store(path, records(), vectors, dtype=dtype))
+        stores[dtype] = open_store(path)
+        report['stores'][dtype] = {
+            'write_seconds': round(write_ms / 1000, 3),
+            'vectors_bytes': int(stores[dtype].codes.nbytes),
+        }
+
+    for dtype, index_type in modes:
+        store = stores[dtype]
+        config = index_config(index_type, metric)
+        index, build_ms = _timed(build_index, store, config)
+        save_index(store, index, config)
+        del index
+
+        # A fresh process would open the store and read the saved index
+        index, load_ms = _timed(lambda: load_index(open_store(store.path), config, save=False))
+        latencies = [_timed(threshold_search, index, query[None, :], math.inf, k, 'top_k')[1] for query in queries]
+        results, batch_ms = _timed(threshold_search, index, queries, math.inf, k, 'top_k')
+        hits = sum(len({i for i, _ in found} & set(row.tolist())) for found, row in zip(results, expected))
+
+        report['modes'].append({
+            'dtype': dtype,
+            'index': index_type,
+            'metric': metric,
+            'build_seconds': round(build_ms / 1000, 3),
+            'index_load_ms': round(load_ms, 3),
+            'index_bytes': os.path.getsize(os.path.join(store.path, INDEX_FILE)),
+            'search_ms': percentiles(latencies),
+            'batch_queries_per_second': round(len(queries) / max(batch_ms / 1000, 1e-9), 1),
+            'recall': round(hits / max(expected.size, 1), 4),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        })
+        del index
+    return report
+
+
+def run_benchmark(sizes: Sequence[int] = DEFAULT_SIZES, modes: Sequence[Tuple[str, str]] = DEFAULT_MODES,
+                  bundled: bool = True, num_queries: int = 200, k: int = 10, model_name: str = STUB_ENCODER,
+                  metric: str = 'l2', directory: Optional[str] = None, seed: int = 0,
+                  progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """
+    Benchmark the encoder, then the bundled database and a synthetic corpus of
+    each size. Stores are written to directory, a temporary directory by default.
+    """
+    progress = progress or (lambda message: None)
+    bundled_store = store_from_json(BUNDLED_JSON)
+    texts = [mechanic_text(record) for record in bundled_store.iter_records()][:num_queries]
+
+    progress(f"Encoder {model_name}")
+    results = {
+        'version': BENCH_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'faiss': getattr(faiss, '__version__', 'unknown'),
+            'cpus': os.cpu_count(),
+        },
+        'k': k,
+        'queries': num_queries,
+        'encoder': bench_encoder(model_name, texts),
+        'corpora': [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix='techies-bench-') as temporary:
+        directory = directory or temporary
+        os.makedirs(directory, exist_ok=True)
+        if bundled:
+            progress(f"Corpus platformer ({len(bundled_store)} mechanics)")
+            results['corpora'].append(bench_corpus(
+                'platformer', bundled_store.iter_records, bundled_store.vectors, directory,
+                modes, num_queries, k, metric, seed,
+            ))
+        for size in sizes:
+            progress(f"Corpus synthetic-{size}")
+            records, vectors = synthetic_corpus(size, results['encoder']['dimension'], seed)
+            results['corpora'].append(bench_corpus(
+                f"synthetic-{size}", records, vectors, directory, modes, num_queries, k, metric, seed,
+            ))
+            del vectors
+    return results
+
+
+def format_benchmark(results: Dict[str, Any]) -> str:
+    k = results['k']
+    encoder = results['encoder']
+    encode = encoder['encode_ms']
+    lines = [
+        f"encoder {encoder['model']}: load {encoder['load_ms']:.1f}ms, encode p50 {encode['p50']:.3f}ms "
+        f"p95 {encode['p95']:.3f}ms p99 {encode['p99']:.3f}ms",
+        "",
+        f"{'corpus':18s} {'dtype':8s} {'index':9s} {f'recall@{k}':>9s} {'p50':>9s} {'p95':>9s} {'p99':>9s} "
+        f"{'batch q/s':>10s} {'load':>10s} {'size':>10s} {'rss':>9s}",
+    ]
+    for corpus in results['corpora']:
+        for mode in corpus['modes']:
+            search = mode['search_ms']
+            lines.append(
+                f"{corpus['name']:18s} {mode['dtype']:8s} {mode['index']:9s} {mode['recall']:9.3f} "
+                f"{search['p50']:7.3f}ms {search['p95']:7.3f}ms {search['p99']:7.3f}ms "
+                f"{mode['batch_queries_per_second']:10.0f} {mode['index_load_ms']:8.2f}ms "
+                f"{mode['index_bytes'] / 1024 / 1024:8.2f}MB {mode['peak_rss_mb']:7.0f}MB"
+            )
+    return "\n".join(lines)
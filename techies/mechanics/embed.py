@@ -0,0 +1,103 @@
+"""
+Incremental embedding of mechanics into a store.
+
+Every mechanic is identified by a hash of the text it is embedded from and of
+the embedding model. When a store is rewritten, mechanics whose hash is
+already in the previous store reuse its vector, only new or edited mechanics
+are encoded, in batches. Set TECHIES_EMBED_BATCH_SIZE to change the default
+batch size.
+"""
+import hashlib
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from techies.mechanics.encoder import encode
+from techies.mechanics.store import (
+    DEFAULT_MODEL, VECTOR_DTYPE_ENV, MechanicsStore, is_store, open_store, write_store,
+)
+
+EMBED_BATCH_SIZE_ENV = 'TECHIES_EMBED_BATCH_SIZE'
+DEFAULT_BATCH_SIZE = 64
+
+
+class EmbedResult(NamedTuple):
+    """Outcome of embed_mechanics."""
+    path: str
+    encoded: int
+    reused: int
+
+
+def embed_batch_size() -> int:
+    value = os.environ.get(EMBED_BATCH_SIZE_ENV)
+    return int(value) if value else DEFAULT_BATCH_SIZE
+
+
+def mechanic_text(mechanic: Dict[str, Any]) -> str:
+    """Text a mechanic is embedded from."""
+    return f"{mechanic['Name']}. {mechanic['Description']}"
+
+
+def entry_hash(mechanic: Dict[str, Any], model_name: str = DEFAULT_MODEL) -> str:
+    return hashlib.sha256(f"{model_name}\0{mechanic_text(mechanic)}".encode('utf-8')).hexdigest()
+
+
+def _previous_store(path: str) -> Optional[MechanicsStore]:
+    """The store at path, None if there is no usable store."""
+    if not is_store(path):
+        return None
+    try:
+        return open_store(path)
+    except ValueError:
+        return None
+
+
+def _previous_vectors(store: Optional[MechanicsStore], model_name: str) -> Dict[str, np.ndarray]:
+    """Vectors of the previous store by entry hash, empty if they cannot be reused."""
+    if store is None or (store.model or DEFAULT_MODEL) != model_name:
+        return {}
+
+    hashes = store.entry_hashes
+    if hashes is None:
+        # Written without hashes, the stored records are what was embedded
+        hashes = [entry_hash(record, model_name) for record in store.iter_records()]
+    else:
+        hashes = [h.decode('ascii') for h in hashes]
+    vectors = store.vectors
+    return {h: vectors[i] for i, h in enumerate(hashes)}
+
+
+def embed_mechanics(mechanics: List[Dict[str, Any]], path: str, model_name: str = DEFAULT_MODEL,
+                    batch_size: Optional[int] = None, dtype: Optional[str] = None) -> EmbedResult:
+    """
+    Write mechanics with their embeddings as a store at path, encoding only
+    the mechanics the previous store at path does not already hold.
+    Vectors are stored as dtype, TECHIES_MECHANICS_DTYPE or the dtype of the
+    previous store, see techies.mechanics.store.VECTOR_DTYPES. Reused int8
+    vectors keep their codes as long as the new vectors fit the grid of the
+    previous store, they are only quantized again when it has to grow.
+    """
+    hashes = [entry_hash(mechanic, model_name) for mechanic in mechanics]
+    store = _previous_store(path)
+    previous = _previous_vectors(store, model_name)
+    dtype = dtype or os.environ.get(VECTOR_DTYPE_ENV) or (store.dtype if store is not None else None)
+
+    # Encode each new text once, even if several mechanics share it
+    texts = {h: mechanic_text(mechanic) for h, mechanic in zip(hashes, mechanics) if h not in previous}
+    if texts or not mechanics:
+        # An empty list still loads the model, for the dimension of the store
+        encoded = encode(list(texts.values()), model_name, batch_size=batch_size or embed_batch_size())
+        vectors_by_hash = {**previous, **dict(zip(texts, encoded))}
+    else:
+        encoded, vectors_by_hash = None, previous
+
+    if mechanics:
+        vectors = np.stack([vectors_by_hash[h] for h in hashes]).astype(np.float32, copy=False)
+    else:
+        vectors = encoded
+
+    # Records are always rewritten, fields other than Name and Description may have changed
+    scales = store.scales if previous and store.dtype == dtype else None
+    write_store(path, mechanics, vectors, hashes=hashes, dtype=dtype, scales=scales, model=model_name)
+    return EmbedResult(path, encoded=len(texts), reused=sum(h in previous for h in hashes))
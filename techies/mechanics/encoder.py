@@ -0,0 +1,242 @@
+"""
+Process-wide cache of sentence embedding models and query embeddings.
+
+Each model is loaded once per process, on first use, and shared by the
+mechanics tools, callbacks and ad-hoc searches. Set TECHIES_ENCODER_THREADS to
+pin the number of CPU threads used for encoding.
+
+Query embeddings are kept in an LRU cache per model, of
+TECHIES_QUERY_CACHE_SIZE entries. Set TECHIES_QUERY_CACHE_DIR to persist it
+across processes, it is saved every QUERY_CACHE_SAVE_EVERY new queries and
+when the process exits.
+"""
+import atexit
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from techies.mechanics.store import DEFAULT_MODEL, atomic_file
+
+ENCODER_THREADS_ENV = 'TECHIES_ENCODER_THREADS'
+QUERY_CACHE_SIZE_ENV = 'TECHIES_QUERY_CACHE_SIZE'
+QUERY_CACHE_DIR_ENV = 'TECHIES_QUERY_CACHE_DIR'
+DEFAULT_QUERY_CACHE_SIZE = 1024
+# New queries a persisted cache holds before it is saved, each save rewrites the whole file
+QUERY_CACHE_SAVE_EVERY = 64
+
+_encoders: Dict[str, object] = {}
+_encoders_lock = threading.Lock()
+_preloads: Dict[str, threading.Thread] = {}
+
+
+def encoder_threads() -> Optional[int]:
+    """CPU threads to pin encoders to, None to keep the library default."""
+    value = os.environ.get(ENCODER_THREADS_ENV)
+    return int(value) if value else None
+
+
+def _load_encoder(model_name: str):
+    threads = encoder_threads()
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def get_encoder(model_name: str = DEFAULT_MODEL):
+    """Return the SentenceTransformer for model_name, loading it on first use."""
+    encoder = _encoders.get(model_name)
+    if encoder is None:
+        with _encoders_lock:
+            encoder = _encoders.get(model_name)
+            if encoder is None:
+                encoder = _encoders[model_name] = _load_encoder(model_name)
+    return encoder
+
+
+def is_encoder_loaded(model_name: str = DEFAULT_MODEL) -> bool:
+    return model_name in _encoders
+
+
+def _preload(model_name: str):
+    try:
+        get_encoder(model_name)
+    except Exception:
+        # Raised again by the next get_encoder call, where a caller handles it
+        pass
+
+
+def preload_encoder(model_name: str = DEFAULT_MODEL) -> threading.Thread:
+    """Start loading model_name in a background thread, once per process. Returns the thread."""
+    with _encoders_lock:
+        thread = _preloads.get(model_name)
+        if thread is None:
+            thread = _preloads[model_name] = threading.Thread(
+                target=_preload, args=(model_name,), name=f"preload-{model_name}", daemon=True
+            )
+            thread.start()
+    return thread
+
+
+def clear_encoders():
+    """Drop all loaded models and query caches, the next use loads them again."""
+    with _encoders_lock:
+        _encoders.clear()
+        _query_caches.clear()
+        _preloads.clear()
+
+
+def encode(texts: Union[str, Iterable[str]], model_name: str = DEFAULT_MODEL, batch_size: int = 32) -> np.ndarray:
+    """
+    Encode one text or a list of texts.
+
+    Returns:
+        np.ndarray: float32 matrix with one row per text (a single row for a str)
+    """
+    if isinstance(texts, str):
+        texts = [texts]
+    texts = list(texts)
+    encoder = get_encoder(model_name)
+    if not texts:
+        return np.zeros((0, encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+    vectors = encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+
+class QueryCache:
+    """
+    LRU cache of query embeddings for one model.
+    With a path, the cache is loaded from it and saved back every save_every
+    new queries, and when the process exits.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, maxsize: int = DEFAULT_QUERY_CACHE_SIZE,
+                 path: Optional[str] = None, save_every: int = QUERY_CACHE_SAVE_EVERY):
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self.path = path
+        self.save_every = save_every
+        self._vectors: OrderedDict = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+            _persisted_caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    @staticmethod
+    def key(query: str) -> str:
+        # Queries differing only in spacing share an embedding
+        return re.sub(r'\s+', ' ', query).strip()
+
+    def encode(self, queries: Union[str, Iterable[str]]) -> np.ndarray:
+        """
+        Embeddings of one query or a list of queries, encoding the ones not
+        cached in a single batch.
+
+        Returns:
+            np.ndarray: float32 matrix with one row per query (a single row for a str)
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+        keys = [self.key(query) for query in queries]
+
+        with self._lock:
+            found = {key: self._vectors[key] for key in keys if key in self._vectors}
+            for key in found:
+                self._vectors.move_to_end(key)
+
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            vectors = encode(missing, self.model_name)
+            found.update(zip(missing, vectors))
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    self._vectors[key] = vector
+                    self._vectors.move_to_end(key)
+                while len(self._vectors) > self.maxsize:
+                    self._vectors.popitem(last=False)
+                self._unsaved += len(missing)
+                due = self.path and self._unsaved >= self.save_every
+            if due:
+                self.save()
+
+        if not keys:
+            return np.zeros((0, get_encoder(self.model_name).get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+    @property
+    def unsaved(self) -> int:
+        """New queries since the cache was last saved."""
+        return self._unsaved
+
+    def save(self):
+        with self._lock:
+            keys = list(self._vectors)
+            vectors = np.stack(list(self._vectors.values())) if keys else np.zeros((0, 0), dtype=np.float32)
+            self._unsaved = 0
+        directory, name = os.path.split(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with atomic_file(directory, name) as f:
+                np.savez(f, keys=np.array(keys, dtype=str), vectors=vectors, model=self.model_name)
+        except OSError:
+            # The cache is only an optimization
+            pass
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                if str(data['model']) != self.model_name:
+                    return
+                pairs = list(zip(data['keys'].tolist(), data['vectors']))
+        except (OSError, ValueError, KeyError):
+            return
+        for key, vector in pairs[-self.maxsize:]:
+            self._vectors[key] = vector
+
+
+_query_caches: Dict[str, QueryCache] = {}
+_persisted_caches: 'weakref.WeakSet[QueryCache]' = weakref.WeakSet()
+
+
+@atexit.register
+def _save_query_caches():
+    for cache in list(_persisted_caches):
+        if cache.unsaved:
+            cache.save()
+
+
+def query_cache_size() -> int:
+    value = os.environ.get(QUERY_CACHE_SIZE_ENV)
+    return int(value) if value else DEFAULT_QUERY_CACHE_SIZE
+
+
+def query_cache_path(model_name: str) -> Optional[str]:
+    """File persisting the query cache of model_name, None unless TECHIES_QUERY_CACHE_DIR is set."""
+    directory = os.environ.get(QUERY_CACHE_DIR_ENV)
+    if not directory:
+        return None
+    return os.path.join(directory, re.sub(r'[^\w.-]', '_', model_name) + '.npz')
+
+
+def get_query_cache(model_name: str = DEFAULT_MODEL) -> QueryCache:
+    """Return the query cache of model_name shared by this process."""
+    cache = _query_caches.get(model_name)
+    if cache is None:
+        with _encoders_lock:
+            cache = _query_caches.get(model_name)
+            if cache is None:
+                cache = _query_caches[model_name] = QueryCache(
+                    model_name, query_cache_size(), query_cache_path(model_name)
+                )
+    return cache
@@ -0,0 +1,390 @@
+"""
+FAISS indexes persisted inside a mechanics store.
+
+The index is saved as index.faiss next to the vectors, with index.json
+recording its type, metric and parameters and the hash of the vectors it was
+built from. Loading compares that hash with the one in the store's meta.json,
+so a valid index is read (memory mapped where FAISS supports it) without
+touching the vectors, and a stale or missing index is rebuilt.
+
+Index types:
+
+- flat: exact search, the default
+- ivf_flat: inverted lists over nlist clusters, nprobe of them searched per query
+- hnsw: graph of M neighbours per vector, efSearch candidates explored per query
+- ivf_pq: ivf_flat with vectors compressed to m codes of nbits bits
+- sq_fp16, sq8: exact search over vectors stored as float16, or one byte per dimension
+- pq: exact search over vectors compressed to m codes of nbits bits, for very large corpora
+
+Stores written with a float16 or int8 dtype get the matching sq_fp16 or sq8
+index when no type is asked for.
+
+Distances are always squared L2, lower is closer. The cosine metric
+normalizes vectors and queries first, the distance is then 2 - 2 * cosine.
+threshold_search keeps the neighbours strictly closer than a threshold.
+"""
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from techies.mechanics.store import MechanicsStore, atomic_file
+
+INDEX_FILE = 'index.faiss'
+INDEX_META_FILE = 'index.json'
+
+INDEX_TYPE_ENV = 'TECHIES_MECHANICS_INDEX'
+INDEX_METRIC_ENV = 'TECHIES_MECHANICS_METRIC'
+
+INDEX_TYPES = ('flat', 'ivf_flat', 'hnsw', 'ivf_pq', 'sq_fp16', 'sq8', 'pq')
+METRICS = ('l2', 'cosine')
+
+# Parameters changing the built index, and parameters only changing how it is searched
+BUILD_PARAMS = {
+    'flat': (), 'ivf_flat': ('nlist',), 'hnsw': ('M', 'efConstruction'), 'ivf_pq': ('nlist', 'm', 'nbits'),
+    'sq_fp16': (), 'sq8': (), 'pq': ('m', 'nbits'),
+}
+SEARCH_PARAMS = {
+    'flat': (), 'ivf_flat': ('nprobe',), 'hnsw': ('efSearch',), 'ivf_pq': ('nprobe',),
+    'sq_fp16': (), 'sq8': (), 'pq': (),
+}
+DEFAULT_PARAMS = {'nprobe': 8, 'M': 32, 'efConstruction': 40, 'efSearch': 64, 'm': 16, 'nbits': 8}
+
+# range: every neighbour within the threshold, top_k: the max_results nearest, then filtered
+SEARCH_MODES = ('range', 'top_k')
+
+# FAISS wants this many training vectors per cluster
+MIN_POINTS_PER_CENTROID = 39
+
+# Index type of stores whose vectors are saved with a smaller dtype
+DTYPE_INDEX_TYPES = {'float32': 'flat', 'float16': 'sq_fp16', 'int8': 'sq8'}
+
+
+class IndexConfig(NamedTuple):
+    """Type, metric and parameters of an index, missing parameters are derived from the store."""
+    type: str = 'flat'
+    metric: str = 'l2'
+    params: Optional[Dict[str, int]] = None
+
+
+def index_config(index_type: Optional[str] = None, metric: Optional[str] = None, **params) -> IndexConfig:
+    """
+    Build an IndexConfig, index_type and metric default to
+    TECHIES_MECHANICS_INDEX and TECHIES_MECHANICS_METRIC.
+
+    Raises:
+        ValueError: If the type, metric or a parameter is unknown
+    """
+    index_type = index_type or os.environ.get(INDEX_TYPE_ENV) or 'flat'
+    metric = metric or os.environ.get(INDEX_METRIC_ENV) or 'l2'
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {', '.join(INDEX_TYPES)}")
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {', '.join(METRICS)}")
+
+    known = BUILD_PARAMS[index_type] + SEARCH_PARAMS[index_type]
+    unknown = [name for name in params if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) {', '.join(unknown)} for a {index_type} index, expected {', '.join(known) or 'none'}")
+    return IndexConfig(index_type, metric, {name: int(value) for name, value in params.items()})
+
+
+def requested_config(index_type: Optional[str] = None, metric: Optional[str] = None, **params) -> Optional[IndexConfig]:
+    """
+    The config asked for by arguments or environment variables, None if
+    nothing was asked for, in which case load_index uses any saved index.
+    """
+    if index_type or metric or params or os.environ.get(INDEX_TYPE_ENV) or os.environ.get(INDEX_METRIC_ENV):
+        return index_config(index_type, metric, **params)
+    return None
+
+
+def default_config(store: MechanicsStore) -> IndexConfig:
+    """index_config() for store, the type following its dtype unless TECHIES_MECHANICS_INDEX is set."""
+    index_type = None if os.environ.get(INDEX_TYPE_ENV) else DTYPE_INDEX_TYPES.get(store.dtype)
+    return index_config(index_type)
+
+
+def parse_params(items) -> Dict[str, int]:
+    """Parse 'name=value' strings, e.g. from the command line."""
+    params = {}
+    for item in items:
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected name=value, got '{item}'")
+        params[name.strip()] = int(value)
+    return params
+
+
+def resolve_params(config: IndexConfig, count: int, dimension: int) -> Dict[str, int]:
+    """All parameters of config, defaults filled in and clamped to what count vectors can train."""
+    wanted = {**DEFAULT_PARAMS, **(config.params or {})}
+    params = {name: wanted.get(name) for name in BUILD_PARAMS[config.type] + SEARCH_PARAMS[config.type]}
+
+    if 'nlist' in params:
+        nlist = params['nlist'] or int(4 * math.sqrt(count))
+        params['nlist'] = max(1, min(nlist, count // MIN_POINTS_PER_CENTROID))
+        params['nprobe'] = max(1, min(params['nprobe'], params['nlist']))
+    if 'm' in params:
+        # Sub-quantizers must split the dimension evenly
+        params['m'] = max(m for m in range(1, min(params['m'], dimension) + 1) if dimension % m == 0)
+        # Each sub-quantizer trains 2 ** nbits centroids
+        params['nbits'] = max(1, min(params['nbits'], int(math.log2(max(count, 2)))))
+    return params
+
+
+def _new_index(config: IndexConfig, dimension: int, params: Dict[str, int]):
+    if config.type == 'flat':
+        index = faiss.IndexFlatL2(dimension)
+    elif config.type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, params['M'])
+        index.hnsw.efConstruction = params['efConstruction']
+    elif config.type == 'ivf_flat':
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dimension), dimension, params['nlist'])
+    elif config.type == 'ivf_pq':
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dimension), dimension, params['nlist'], params['m'], params['nbits'])
+    elif config.type == 'pq':
+        index = faiss.IndexPQ(dimension, params['m'], params['nbits'])
+    else:
+        quantizer = faiss.ScalarQuantizer.QT_fp16 if config.type == 'sq_fp16' else faiss.ScalarQuantizer.QT_8bit
+        index = faiss.IndexScalarQuantizer(dimension, quantizer)
+
+    if config.metric == 'cosine':
+        index = faiss.IndexPreTransform(faiss.NormalizationTransform(dimension, 2.0), index)
+    return index
+
+
+def set_search_params(index, index_type: str, params: Dict[str, int]):
+    """Apply the search time parameters (nprobe, efSearch) of params to index."""
+    if index.ntotal == 0:
+        # Nothing to tune, empty stores always get a flat index
+        return index
+    settings = ",".join(f"{name}={params[name]}" for name in SEARCH_PARAMS[index_type] if params.get(name))
+    if settings:
+        faiss.ParameterSpace().set_index_parameters(index, settings)
+    return index
+
+
+def build_index(store: MechanicsStore, config: Optional[IndexConfig] = None):
+    """Build an index over the vectors of store, an exact L2 index by default."""
+    config = config or IndexConfig()
+    if not len(store):
+        # Nothing to train clusters or codes on
+        config = config._replace(type='flat')
+    params = resolve_params(config, len(store), store.dimension)
+    index = _new_index(config, store.dimension, params)
+    if len(store):
+        vectors = np.ascontiguousarray(store.vectors, dtype=np.float32)
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+    return set_search_params(index, config.type, params)
+
+
+def index_meta(store: MechanicsStore, config: Optional[IndexConfig] = None) -> Dict[str, Any]:
+    """What a saved index must have been built from to be reused for store."""
+    config = config or IndexConfig()
+    return {
+        'type': config.type,
+        'metric': config.metric,
+        'params': resolve_params(config, len(store), store.dimension),
+        'count': len(store),
+        'dimension': store.dimension,
+        'vectors_sha256': store.content_hash,
+    }
+
+
+def saved_config(meta: Dict[str, Any]) -> IndexConfig:
+    # Indexes saved before index types existed are exact L2 indexes
+    return IndexConfig(meta.get('type', 'flat'), meta.get('metric', 'l2'), meta.get('params') or {})
+
+
+def _build_key(meta: Dict[str, Any]):
+    config = saved_config(meta)
+    build_params = tuple((name, config.params.get(name)) for name in BUILD_PARAMS.get(config.type, ()))
+    return (config.type, config.metric, build_params, meta.get('count'), meta.get('dimension'), meta.get('vectors_sha256'))
+
+
+def read_index_meta(store: MechanicsStore) -> Optional[Dict[str, Any]]:
+    if store.directory is None:
+        return None
+    try:
+        with open(os.path.join(store.directory, INDEX_META_FILE), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_index_current(store: MechanicsStore, config: Optional[IndexConfig] = None) -> bool:
+    """
+    Whether the index saved in store was built from its vectors, and from
+    config if given. Search parameters may differ, they are applied on load.
+    """
+    saved = read_index_meta(store)
+    if saved is None or saved.get('type', 'flat') not in INDEX_TYPES:
+        return False
+    if config is None:
+        config = saved_config(saved)
+    return _build_key(saved) == _build_key(index_meta(store, config))
+
+
+def save_index(store: MechanicsStore, index, config: Optional[IndexConfig] = None) -> str:
+    """Write index, built with config, into the store directory, returns the index path."""
+    if store.directory is None:
+        raise ValueError(f"Cannot save an index for '{store.path}', it is not a mechanics store directory")
+
+    with atomic_file(store.directory, INDEX_FILE) as f:
+        f.write(faiss.serialize_index(index).tobytes())
+
+    with atomic_file(store.directory, INDEX_META_FILE) as f:
+        f.write(json.dumps(index_meta(store, config), indent=2).encode('utf-8'))
+    return os.path.join(store.directory, INDEX_FILE)
+
+
+def _read_index(path: str):
+    # Zero-copy mmap of flat indexes needs a recent FAISS, older ones copy on read
+    flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', 0) or faiss.IO_FLAG_MMAP
+    try:
+        return faiss.read_index(path, flags)
+    except RuntimeError:
+        return faiss.read_index(path)
+
+
+def load_index(store: MechanicsStore, config: Optional[IndexConfig] = None, save: bool = True):
+    """
+    Load the index saved in store, rebuilding it when it is missing or was
+    built from other vectors or another config. Without config, the saved
+    index type and metric are kept, and a missing index is built with index_config().
+    A rebuilt index is saved back if save is True and the store directory is writable.
+    """
+    saved = read_index_meta(store)
+    if is_index_current(store, config):
+        config = config or saved_config(saved)
+        try:
+            index = _read_index(os.path.join(store.directory, INDEX_FILE))
+        except RuntimeError:
+            pass
+        else:
+            return set_search_params(index, config.type, index_meta(store, config)['params'])
+
+    if config is None:
+        if saved and saved.get('type', 'flat') in INDEX_TYPES:
+            # Parameters were fitted to the previous vectors, derive them again
+            config = IndexConfig(*saved_config(saved)[:2])
+        else:
+            config = default_config(store)
+    index = build_index(store, config)
+    if save and store.directory is not None:
+        try:
+            save_index(store, index, config)
+        except OSError:
+            # Read-only installs still work, they rebuild on every load
+            pass
+    return index
+
+
+def threshold_search(index, queries: np.ndarray, threshold: float, max_results: Optional[int] = None,
+                     mode: str = 'range') -> List[List[Tuple[int, float]]]:
+    """
+    Neighbours of each query with a distance below threshold, at most
+    max_results of them, ordered by distance then position in the store.
+
+    Returns:
+        List[List[Tuple[int, float]]]: (index, distance) pairs, one list per query row
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {', '.join(SEARCH_MODES)}")
+    queries = np.ascontiguousarray(queries, dtype=np.float32).reshape(-1, index.d)
+    if index.ntotal == 0:
+        return [[] for _ in queries]
+
+    if mode == 'range':
+        limits, distances, indices = index.range_search(queries, float(threshold))
+        rows = [
+            (indices[limits[i]:limits[i + 1]], distances[limits[i]:limits[i + 1]])
+            for i in range(len(queries))
+        ]
+    else:
+        distances, indices = index.search(queries, min(max_results or index.ntotal, index.ntotal))
+        rows = zip(indices, distances)
+
+    results = []
+    for row_indices, row_distances in rows:
+        # Approximate indexes pad missing neighbours with -1
+        pairs = sorted(
+            ((int(i), float(d)) for i, d in zip(row_indices, row_distances) if i >= 0 and d < threshold),
+            key=lambda pair: (pair[1], pair[0]),
+        )
+        results.append(pairs[:max_results] if max_results else pairs)
+    return results
+
+
+class IndexReport(NamedTuple):
+    """Recall, speed and size of one index config, compared to exact search over float32 vectors."""
+    config: IndexConfig
+    params: Dict[str, int]
+    build_seconds: float
+    query_ms: float
+    recall: float
+    size_bytes: int = 0
+    load_ms: float = 0.0
+
+
+def compare_indexes(store: MechanicsStore, configs: List[IndexConfig], k: int = 10,
+                    num_queries: int = 100, seed: int = 0) -> List[IndexReport]:
+    """
+    Measure recall@k, per query latency, serialized size and load time of
+    each config against an exact float32 index of the same metric. Queries
+    are stored vectors with some noise added.
+    """
+    rng = np.random.default_rng(seed)
+    vectors = np.ascontiguousarray(store.vectors, dtype=np.float32)
+    picks = rng.choice(len(store), size=min(num_queries, len(store)), replace=False)
+    queries = vectors[picks] + rng.normal(0, 0.05, size=(len(picks), store.dimension)).astype(np.float32)
+    k = min(k, len(store))
+
+    exact = {}
+    reports = []
+    for config in configs:
+        if config.metric not in exact:
+            _, exact[config.metric] = build_index(store, IndexConfig('flat', config.metric)).search(queries, k)
+
+        start = time.perf_counter()
+        index = build_index(store, config)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query[None, :], k)
+        query_ms = (time.perf_counter() - start) * 1000 / max(len(queries), 1)
+
+        _, found = index.search(queries, k)
+        hits = sum(len(set(row) & set(expected)) for row, expected in zip(found, exact[config.metric]))
+        recall = hits / max(found.size, 1)
+
+        serialized = faiss.serialize_index(index)
+        start = time.perf_counter()
+        faiss.deserialize_index(serialized)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        reports.append(IndexReport(
+            config, resolve_params(config, len(store), store.dimension), build_seconds, query_ms, recall,
+            size_bytes=len(serialized), load_ms=load_ms,
+        ))
+    return reports
+
+
+def format_report(reports: List[IndexReport], k: int = 10) -> str:
+    lines = [f"{'index':10s} {'metric':7s} {f'recall@{k}':>9s} {'query':>9s} {'build':>8s} {'size':>9s} {'load':>9s}  params"]
+    for report in reports:
+        params = ", ".join(f"{name}={value}" for name, value in report.params.items())
+        lines.append(
+            f"{report.config.type:10s} {report.config.metric:7s} {report.recall:9.3f} "
+            f"{report.query_ms:7.3f}ms {report.build_seconds:7.2f}s {report.size_bytes / 1024:7.1f}KB "
+            f"{report.load_ms:7.3f}ms  {params}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,163 @@
+"""
+BM25 inverted index over the text of mechanics records.
+
+Matches exact terms such as mechanic names ("Coyote Time", "Double Jump")
+that embeddings rank poorly, and answers queries without an embedding model.
+write_store saves the index as lexical.npz in the store, stores without one
+get it built in memory when opened.
+"""
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LEXICAL_FILE = 'lexical.npz'
+
+# Fields indexed, with how many times their terms count
+# (generated databases name the last one 'Implementation Considerations')
+LEXICAL_FIELDS = {'Name': 3, 'Description': 1, 'Implementation Details': 1, 'Implementation Considerations': 1}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Rank offset of reciprocal rank fusion, dampens the weight of the very first ranks
+RRF_K = 60
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Words of nearly every query and description, they would match every mechanic
+STOPWORDS = frozenset("""
+a an and are as at be but by can for from how i in into is it its of on or so
+that the their then there these this to was what when where which while who
+will with without you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def record_terms(record: Dict[str, Any]) -> Counter:
+    """Weighted term frequencies of a mechanic."""
+    terms = Counter()
+    for field, weight in LEXICAL_FIELDS.items():
+        value = record.get(field)
+        if isinstance(value, str):
+            for token in tokenize(value):
+                terms[token] += weight
+    return terms
+
+
+class LexicalIndex:
+    """
+    Postings of every term, in compressed sparse row layout: the documents of
+    term t are doc_ids[term_offsets[t]:term_offsets[t + 1]].
+    """
+
+    def __init__(self, terms: Sequence[str], term_offsets: np.ndarray, doc_ids: np.ndarray,
+                 term_freqs: np.ndarray, doc_lengths: np.ndarray):
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.term_offsets = term_offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.average_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, documents: Iterable[Counter]) -> 'LexicalIndex':
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+        for doc_id, terms in enumerate(documents):
+            doc_lengths.append(sum(terms.values()))
+            for term, freq in terms.items():
+                postings.setdefault(term, []).append((doc_id, freq))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term])
+        entries = [entry for term in terms for entry in postings[term]]
+        doc_ids = np.array([doc_id for doc_id, _ in entries], dtype=np.int32)
+        term_freqs = np.array([freq for _, freq in entries], dtype=np.float32)
+        return cls(terms, offsets, doc_ids, term_freqs, np.array(doc_lengths, dtype=np.float32))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'LexicalIndex':
+        return cls.build(record_terms(record) for record in records)
+
+    def save(self, f):
+        np.savez(
+            f,
+            # Newline separated utf-8, fixed width strings would pad every term to the longest
+            terms=np.frombuffer('\n'.join(self.terms).encode('utf-8'), dtype=np.uint8),
+            term_offsets=self.term_offsets,
+            doc_ids=self.doc_ids,
+            term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'LexicalIndex':
+        with np.load(path) as data:
+            text = data['terms'].tobytes().decode('utf-8')
+            terms = text.split('\n') if text else []
+            return cls(terms, data['term_offsets'], data['doc_ids'], data['term_freqs'], data['doc_lengths'])
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for query."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        if not len(self):
+            return scores
+        for term in set(tokenize(query)):
+            t = self.terms.get(term)
+            if t is None:
+                continue
+            start, end = self.term_offsets[t], self.term_offsets[t + 1]
+            doc_ids, freqs = self.doc_ids[start:end], self.term_freqs[start:end]
+            idf = math.log(1 + (len(self) - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_ids] / self.average_length)
+            scores[doc_ids] += idf * freqs * (BM25_K1 + 1) / (freqs + norm)
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(index, score) of documents matching a query term, best first then by position."""
+        scores = self.scores(query)
+        matches = np.flatnonzero(scores > 0)
+        # Stable sort on descending scores keeps ties in store order
+        matches = matches[np.argsort(-scores[matches], kind='stable')]
+        return [(int(i), float(scores[i])) for i in matches[:limit]]
+
+
+def load_lexical_index(store) -> LexicalIndex:
+    """The lexical index saved in store, or built from its records when there is none."""
+    if store.directory is not None:
+        try:
+            index = LexicalIndex.load(os.path.join(store.directory, LEXICAL_FILE))
+            if len(index) == len(store):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+    return LexicalIndex.from_records(store.iter_records())
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = RRF_K,
+                           weights: Optional[Sequence[float]] = None) -> List[Tuple[int, float]]:
+    """
+    Fuse rankings of indexes into one, each index scoring the sum of
+    weight / (k + rank) over the rankings holding it.
+
+    Returns:
+        List[Tuple[int, float]]: (index, fused score), best first then by first appearance
+    """
+    rankings = list(rankings)
+    fused: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights or [1.0] * len(rankings)):
+        for rank, index in enumerate(ranking, 1):
+            fused[index] = fused.get(index, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -0,0 +1,168 @@
+"""
+Manifest of the mechanics databases of a working directory.
+
+embed_json records every store it writes in mechanics_index.json, next to
+the store, with its model, dimension, count and vectors hash. The last one
+written is the default. Searches find their database without walking the
+file tree:
+
+1. the database given explicitly, or in TECHIES_MECHANICS_DB: a store, a
+   legacy '_embedded.json' file, a manifest or a directory holding one, or
+   the name of a database in the manifest
+2. the default database of the manifest in the working directory, then in
+   the TECHIES_RUNTIME directories, latest first
+3. the first store, then '_embedded.json' file, directly in the working directory
+
+Mechanics files to embed are likewise only looked for directly in the
+working directory, where the write_file tool puts them.
+"""
+import glob
+import json
+import os
+import warnings
+from typing import Any, Dict, List, Optional
+
+from techies.mechanics.store import (
+    MechanicsStore,
+    atomic_file,
+    is_store,
+    open_store,
+    STORE_SUFFIX,
+    EMBEDDED_JSON_SUFFIX,
+)
+
+MANIFEST_FILE = 'mechanics_index.json'
+MANIFEST_VERSION = 1
+MECHANICS_DB_ENV = 'TECHIES_MECHANICS_DB'
+MECHANICS_JSON_SUFFIX = 'mechanics.json'
+
+
+def manifest_dirs() -> List[str]:
+    """Directories searched for a manifest, in order."""
+    from techies.fixture_loader import runtime_config
+
+    directories = [os.getcwd()] + list(reversed(runtime_config().split(os.pathsep)))
+    return list(dict.fromkeys(os.path.realpath(d) for d in directories if d))
+
+
+def find_manifest() -> Optional[str]:
+    for directory in manifest_dirs():
+        path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    """
+    Raises:
+        ValueError: If path is not a manifest of a supported version
+    """
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read mechanics manifest '{path}': {e}")
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"'{path}' is not a version {MANIFEST_VERSION} mechanics manifest")
+    return manifest
+
+
+def database_name(store_path: str) -> str:
+    """Name of a store in the manifest, e.g. 'platformer_mechanics' for 'platformer_mechanics.mechdb'."""
+    return os.path.splitext(os.path.basename(os.path.normpath(store_path)))[0]
+
+
+def update_manifest(store: MechanicsStore, source: Optional[str] = None) -> str:
+    """
+    Record store in the manifest of its directory and make it the default.
+
+    Returns:
+        str: The manifest path
+    """
+    directory = os.path.dirname(os.path.abspath(store.path))
+    path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        manifest = read_manifest(path)
+    except ValueError:
+        manifest = {'version': MANIFEST_VERSION, 'databases': {}}
+
+    name = database_name(store.path)
+    entry = {
+        'path': os.path.relpath(os.path.abspath(store.path), directory),
+        'model': store.model,
+        'dimension': store.dimension,
+        'count': len(store),
+        'vectors_sha256': store.content_hash,
+    }
+    if source:
+        entry['source'] = os.path.relpath(os.path.abspath(source), directory)
+    manifest['databases'][name] = entry
+    manifest['default'] = name
+
+    with atomic_file(directory, MANIFEST_FILE) as f:
+        f.write(json.dumps(manifest, indent=2).encode('utf-8'))
+    return path
+
+
+def _manifest_entry(manifest_path: str, name: Optional[str] = None) -> str:
+    manifest = read_manifest(manifest_path)
+    name = name or manifest.get('default')
+    entry = manifest['databases'].get(name)
+    if entry is None:
+        available = ", ".join(manifest['databases']) or "none"
+        raise ValueError(f"Mechanics database '{name}' not found in '{manifest_path}'. Available: {available}")
+
+    path = os.path.join(os.path.dirname(manifest_path), entry['path'])
+    if is_store(path):
+        store = open_store(path)
+        if store.content_hash != entry.get('vectors_sha256'):
+            warnings.warn(f"Mechanics store '{path}' changed since '{manifest_path}' was written")
+    return path
+
+
+def resolve_mechanics_db(database: Optional[str] = None) -> Optional[str]:
+    """
+    Path of the mechanics database to search, see the module documentation.
+    None if nothing was found.
+
+    Raises:
+        ValueError: If database or TECHIES_MECHANICS_DB names a database that does not exist
+    """
+    database = database or os.environ.get(MECHANICS_DB_ENV)
+    if database:
+        if os.path.isdir(database):
+            if is_store(database):
+                return database
+            if os.path.isfile(os.path.join(database, MANIFEST_FILE)):
+                return _manifest_entry(os.path.join(database, MANIFEST_FILE))
+            raise ValueError(f"'{database}' is neither a mechanics store nor a directory with a {MANIFEST_FILE}")
+        if os.path.isfile(database):
+            if os.path.basename(database) == MANIFEST_FILE:
+                return _manifest_entry(database)
+            return database
+
+        manifest_path = find_manifest()
+        if manifest_path is None:
+            raise ValueError(f"Mechanics database '{database}' is not a path and no {MANIFEST_FILE} was found")
+        return _manifest_entry(manifest_path, database)
+
+    manifest_path = find_manifest()
+    if manifest_path is not None:
+        return _manifest_entry(manifest_path)
+
+    # Working directories from before manifests, only their top level is looked at
+    cwd = os.getcwd()
+    found = (
+        sorted(d for d in glob.glob(os.path.join(cwd, "*" + STORE_SUFFIX)) if is_store(d))
+        or sorted(glob.glob(os.path.join(cwd, "*" + EMBEDDED_JSON_SUFFIX)))
+    )
+    return found[0] if found else None
+
+
+def find_mechanics_json(directory: Optional[str] = None) -> Optional[str]:
+    """The most recently written file ending in 'mechanics.json' in directory, the working directory by default."""
+    found = glob.glob(os.path.join(directory or os.getcwd(), "*" + MECHANICS_JSON_SUFFIX))
+    if not found:
+        return None
+    return max(found, key=lambda path: (os.stat(path).st_mtime_ns, path))
@@ -0,0 +1,88 @@
+"""
+Mechanics retrieval combining the vector index and the lexical index.
+
+- vector: mechanics within the distance threshold of the query embedding
+- lexical: BM25 matches of the query terms, no embedding model needed
+- hybrid: both rankings fused with reciprocal rank fusion
+
+Results are (index, distance) pairs. Distances are squared L2 to the query
+embedding, in the space of the vector index, and None without one.
+mechanic_results turns them into MechanicResult views: records are never
+copied or annotated, callers read them from the store by index.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+from techies.mechanics.index import threshold_search
+from techies.mechanics.lexical import LexicalIndex, reciprocal_rank_fusion
+from techies.mechanics.store import MechanicsStore
+
+RETRIEVAL_MODES = ('hybrid', 'vector', 'lexical')
+
+
+class MechanicResult(NamedTuple):
+    """A mechanic found by a search: its index in the store, distance and similarity score."""
+    index: int
+    distance: Optional[float]
+    score: Optional[float]
+
+
+def similarity(distance: Optional[float], threshold: float) -> Optional[float]:
+    """Similarity score from 1 (same vector) to 0 (at the threshold), None without a distance."""
+    if distance is None:
+        return None
+    return round(max(0.0, (threshold - distance) / threshold), 4)
+
+
+def mechanic_results(pairs: Sequence[Tuple[int, Optional[float]]], threshold: float) -> List[MechanicResult]:
+    return [MechanicResult(index, distance, similarity(distance, threshold)) for index, distance in pairs]
+
+
+def _distances(store: MechanicsStore, index, query_vector: np.ndarray, indices: Sequence[int]) -> Dict[int, float]:
+    indices = sorted(indices)
+    vectors = store.vectors_at(indices)
+    query_vector = np.asarray(query_vector, dtype=np.float32)
+    # Cosine indexes normalize vectors and queries before measuring
+    if isinstance(index, faiss.IndexPreTransform):
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        query_vector = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+    return dict(zip(indices, ((vectors - query_vector) ** 2).sum(axis=1).tolist()))
+
+
+def search_mechanics(store: MechanicsStore, index, lexical: Optional[LexicalIndex], queries: Sequence[str],
+                     query_vectors: Optional[np.ndarray], threshold: float, max_results: int,
+                     search_mode: str = 'range', retrieval: str = 'hybrid') -> List[List[Tuple[int, Optional[float]]]]:
+    """
+    Search store for each query, query_vectors holding their embeddings.
+    Without query_vectors (e.g. the model is still loading) only the lexical index is used.
+
+    Returns:
+        List[List[Tuple[int, Optional[float]]]]: (index, distance) pairs, best first, one list per query
+    """
+    if retrieval not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode '{retrieval}', expected one of {', '.join(RETRIEVAL_MODES)}")
+    if query_vectors is None:
+        retrieval = 'lexical'
+    if retrieval != 'vector' and lexical is None:
+        raise ValueError(f"{retrieval.capitalize()} retrieval needs a lexical index")
+
+    if retrieval == 'vector':
+        return threshold_search(index, query_vectors, threshold, max_results, search_mode)
+    vector_results = [[] for _ in queries]
+    if retrieval == 'hybrid':
+        vector_results = threshold_search(index, query_vectors, threshold, max_results, search_mode)
+
+    results = []
+    for i, query in enumerate(queries):
+        lexical_ranking = [m for m, _ in lexical.search(query, max_results)]
+        vector_ranking = [m for m, _ in vector_results[i]]
+        ranking = [m for m, _ in reciprocal_rank_fusion([vector_ranking, lexical_ranking])][:max_results]
+
+        distances = dict(vector_results[i])
+        missing = [m for m in ranking if m not in distances]
+        if missing and query_vectors is not None:
+            distances.update(_distances(store, index, query_vectors[i], missing))
+        results.append([(m, distances.get(m)) for m in ranking])
+    return results
@@ -0,0 +1,377 @@
+"""
+Mechanics search daemon shared by the processes of a host.
+
+'techies mechanics serve' keeps one embedding model, and the FAISS and
+lexical indexes of every database asked for, loaded in one process listening
+on a Unix socket. QueryMechanicsTool and search_mechanics_dynamic send their
+queries there when the socket exists and search in process otherwise, so
+parallel crews share one copy of the model and indexes.
+
+Requests and responses are JSON objects, one per line. Queries arriving from
+several clients within a few milliseconds are encoded in one batch. Results
+are (index, distance) pairs, clients read the records from their own memory
+mapped store, after checking the daemon searched the same vectors.
+
+The socket lives in $XDG_RUNTIME_DIR, or in a 0700 directory of the user in
+the temp directory, and is created with mode 0600. Clients only talk to a
+socket owned by their user that nobody else can access.
+"""
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from techies.mechanics.encoder import get_query_cache
+from techies.mechanics.index import IndexConfig, load_index
+from techies.mechanics.lexical import load_lexical_index
+from techies.mechanics.search import search_mechanics
+from techies.mechanics.store import DEFAULT_MODEL, META_FILE, MechanicsStore, open_store
+
+SOCKET_ENV = 'TECHIES_MECHANICS_SOCKET'
+
+# How long the daemon waits for more queries to encode in the same batch
+BATCH_WINDOW = 0.005
+
+
+def default_socket_path() -> str:
+    """TECHIES_MECHANICS_SOCKET, else a socket in $XDG_RUNTIME_DIR or in a directory of the user in the temp directory."""
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'techies-mechanics.sock')
+    return os.path.join(_private_socket_dir(), 'mechanics.sock')
+
+
+def _private_socket_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), f"techies-{os.getuid()}")
+
+
+def _is_private_socket(socket_path: str) -> bool:
+    """Whether socket_path is a socket owned by the user, that nobody else can access."""
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def _make_socket_dir(socket_path: str):
+    """
+    Create the directory of socket_path, 0700 when it is the directory of the user in the temp directory.
+
+    Raises:
+        RuntimeError: If that directory belongs to another user or others can access it
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if directory != _private_socket_dir():
+        return
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"'{directory}' must be a directory of the current user with mode 0700")
+
+
+def _config_key(config: Optional[IndexConfig]):
+    if config is None:
+        return None
+    return (config.type, config.metric, tuple(sorted((config.params or {}).items())))
+
+
+class _EncodeBatcher:
+    """Encodes the queries of concurrent requests together, on one worker thread."""
+
+    def __init__(self, model_name: str, window: float = BATCH_WINDOW):
+        self.cache = get_query_cache(model_name)
+        self.window = window
+        self._requests = queue.Queue()
+        threading.Thread(target=self._work, name=f"encode-{model_name}", daemon=True).start()
+
+    def encode(self, queries: List[str]):
+        request = {'queries': queries, 'done': threading.Event()}
+        self._requests.put(request)
+        request['done'].wait()
+        if 'error' in request:
+            raise request['error']
+        return request['vectors']
+
+    def _work(self):
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = self.cache.encode([q for request in batch for q in request['queries']])
+            except Exception as e:
+                for request in batch:
+                    request['error'] = e
+            else:
+                start = 0
+                for request in batch:
+                    request['vectors'] = vectors[start:start + len(request['queries'])]
+                    start += len(request['queries'])
+            for request in batch:
+                request['done'].set()
+
+
+class _Database:
+    def __init__(self, path: str):
+        self.path = path
+        self.stamp = _stamp(path)
+        self.store = open_store(path)
+        self.indexes = {}
+        self.lexical = None
+        self.lock = threading.Lock()
+
+    def index(self, config: Optional[IndexConfig]):
+        key = _config_key(config)
+        with self.lock:
+            if key not in self.indexes:
+                self.indexes[key] = load_index(self.store, config)
+            return self.indexes[key]
+
+    def lexical_index(self):
+        with self.lock:
+            if self.lexical is None:
+                self.lexical = load_lexical_index(self.store)
+            return self.lexical
+
+
+def _stamp(path: str):
+    # meta.json is rewritten last whenever a store changes
+    target = os.path.join(path, META_FILE) if os.path.isdir(path) else path
+    stat = os.stat(target)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class MechanicsService:
+    """What the daemon serves, usable in process for tests."""
+
+    def __init__(self, batch_window: float = BATCH_WINDOW):
+        self.batch_window = batch_window
+        self._databases: Dict[str, _Database] = {}
+        self._batchers: Dict[str, _EncodeBatcher] = {}
+        self._lock = threading.Lock()
+
+    def database(self, path: str) -> _Database:
+        """The loaded database at path, reloaded if its files changed."""
+        path = os.path.realpath(path)
+        with self._lock:
+            database = self._databases.get(path)
+            if database is None or database.stamp != _stamp(path):
+                database = self._databases[path] = _Database(path)
+            return database
+
+    def encode(self, model_name: str, queries: List[str]):
+        with self._lock:
+            batcher = self._batchers.get(model_name)
+            if batcher is None:
+                batcher = self._batchers[model_name] = _EncodeBatcher(model_name, self.batch_window)
+        return batcher.encode(queries)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'databases': sorted(self._databases)}
+        if op != 'search':
+            raise ValueError(f"Unknown op '{op}'")
+
+        database = self.database(request['database'])
+        config = IndexConfig(*request['index']) if request.get('index') else None
+        retrieval = request.get('retrieval', 'hybrid')
+        queries = request['queries']
+
+        store = database.store
+        vectors = None
+        if retrieval != 'lexical':
+            vectors = self.encode(store.model or DEFAULT_MODEL, queries)
+        results = search_mechanics(
+            store,
+            database.index(config),
+            database.lexical_index() if retrieval != 'vector' else None,
+            queries,
+            vectors,
+            request['threshold'],
+            request['max_results'],
+            request.get('search_mode', 'range'),
+            retrieval,
+        )
+        return {
+            'ok': True,
+            'count': len(store),
+            'vectors_sha256': store.content_hash,
+            'results': results,
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.service.handle(json.loads(line))
+            except Exception as e:
+                response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class MechanicsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: Optional[MechanicsService] = None):
+        self.service = service or MechanicsService()
+        _make_socket_dir(socket_path)
+        if os.path.exists(socket_path):
+            if connect(socket_path) is not None:
+                raise RuntimeError(f"A mechanics daemon is already listening on '{socket_path}'")
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(socket_path)
+        # Created 0600, never accessible to others even for a moment
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+class MechanicsClient:
+    """Connection to a mechanics daemon, safe to share between threads."""
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._socket = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._socket, self._file = sock, sock.makefile('rwb')
+
+    def close(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = self._file = None
+
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Raises:
+            OSError: If the daemon cannot be reached
+            RuntimeError: If the daemon failed to answer the request
+        """
+        with self._lock:
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+                self._file.flush()
+                line = self._file.readline()
+            except OSError:
+                self.close()
+                raise
+            if not line:
+                self.close()
+                raise ConnectionError(f"Mechanics daemon on '{self.socket_path}' closed the connection")
+
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', 'Unknown daemon error'))
+        return response
+
+    def ping(self) -> Dict[str, Any]:
+        return self.request({'op': 'ping'})
+
+    def search(self, store: MechanicsStore, queries: Sequence[str], threshold: float, max_results: int,
+               search_mode: str = 'range', retrieval: str = 'hybrid',
+               config: Optional[IndexConfig] = None) -> List[List[Tuple[int, Optional[float]]]]:
+        """
+        Same as search_mechanics over store, run by the daemon.
+
+        Raises:
+            RuntimeError: Also if the daemon searched other vectors than those of store
+        """
+        response = self.request({
+            'op': 'search',
+            'database': os.path.abspath(store.path),
+            'queries': list(queries),
+            'threshold': threshold,
+            'max_results': max_results,
+            'search_mode': search_mode,
+            'retrieval': retrieval,
+            'index': list(config) if config else None,
+        })
+        if response['count'] != len(store) or response['vectors_sha256'] != store.content_hash:
+            raise RuntimeError(f"Mechanics daemon searched another version of '{store.path}'")
+        return [[(int(i), d) for i, d in results] for results in response['results']]
+
+
+def connect(socket_path: Optional[str] = None, timeout: float = 60.0) -> Optional[MechanicsClient]:
+    """
+    A client of the daemon listening on socket_path, None if there is none.
+    Sockets of other users, or that others can access, are ignored: whoever
+    created them would answer every query.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not _is_private_socket(socket_path):
+        return None
+    # A daemon that does not answer quickly is treated as absent
+    client = MechanicsClient(socket_path, min(timeout, 2.0))
+    try:
+        client.ping()
+    except (OSError, RuntimeError, ValueError):
+        client.close()
+        return None
+    client.timeout = timeout
+    client._socket.settimeout(timeout)
+    return client
+
+
+def serve(socket_path: Optional[str] = None, databases: Sequence[str] = (), model_name: str = DEFAULT_MODEL,
+          batch_window: float = BATCH_WINDOW):
+    """Run the daemon until interrupted, with databases and model_name loaded upfront."""
+    service = MechanicsService(batch_window)
+    for path in databases:
+        database = service.database(path)
+        database.index(None)
+        database.lexical_index()
+        model_name = database.store.model or model_name
+    service.encode(model_name, ["warm up"])
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, stop)
+
+    socket_path = socket_path or default_socket_path()
+    with MechanicsServer(socket_path, service) as server:
+        print(f"Serving mechanics search on '{socket_path}' (pid {os.getpid()})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
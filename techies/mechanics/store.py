@@ -0,0 +1,355 @@
+"""
+On-disk format of an embedded mechanics database.
+
+A store is a directory ending with '.mechdb' holding:
+
+- vectors.npy: matrix with one embedding per mechanic, memory-mapped read-only,
+  as float32, float16 or int8 codes (see VECTOR_DTYPES)
+- scales.npy: per dimension offset and step of int8 codes
+- records.jsonl: one mechanic per line, without its embedding
+- offsets.npy: int64 byte offsets of every line of records.jsonl, plus its end
+- hashes.npy: optional content hash of every mechanic, see techies.mechanics.embed
+- lexical.npz: BM25 inverted index of the records, see techies.mechanics.lexical
+- meta.json: format version, count, dimension, embedding model and the
+  sha256 of vectors.npy, written last
+
+Records are decoded on demand, so opening a store costs the same for ten or
+ten thousand mechanics. Legacy '_embedded.json' files can still be opened,
+they are converted in memory.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from techies.mechanics.lexical import LEXICAL_FILE, LexicalIndex, record_terms
+
+STORE_SUFFIX = '.mechdb'
+EMBEDDED_JSON_SUFFIX = '_embedded.json'
+STORE_VERSION = 1
+
+# Embedding model of the bundled databases
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+VECTORS_FILE = 'vectors.npy'
+RECORDS_FILE = 'records.jsonl'
+OFFSETS_FILE = 'offsets.npy'
+HASHES_FILE = 'hashes.npy'
+SCALES_FILE = 'scales.npy'
+META_FILE = 'meta.json'
+
+# Storage of the vectors: float16 halves them, int8 quarters them with one
+# offset and step per dimension, both well below the resolution of the embeddings
+VECTOR_DTYPES = ('float32', 'float16', 'int8')
+VECTOR_DTYPE_ENV = 'TECHIES_MECHANICS_DTYPE'
+
+
+def vector_dtype(dtype: Optional[str] = None) -> str:
+    """dtype, or TECHIES_MECHANICS_DTYPE, float32 by default."""
+    dtype = dtype or os.environ.get(VECTOR_DTYPE_ENV) or 'float32'
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unknown vector dtype '{dtype}', expected one of {', '.join(VECTOR_DTYPES)}")
+    return dtype
+
+
+def _fits(vectors: np.ndarray, scales: np.ndarray) -> bool:
+    """Whether every vector is within the grid of the int8 offsets and steps."""
+    if scales.shape != (2, vectors.shape[1]):
+        return False
+    low, step = scales
+    return bool(np.all(vectors >= low - step / 2) and np.all(vectors <= low + step * 255.5))
+
+
+def quantize(vectors: np.ndarray, dtype: str = 'float32',
+             scales: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Encode float32 vectors for storage as dtype.
+    For int8, scales of a previous quantization are kept if every vector fits
+    them, so vectors decoded from its codes get the very same codes again.
+
+    Returns:
+        Tuple[np.ndarray, Optional[np.ndarray]]: The codes, and for int8 the
+        (2, dimension) offsets and steps decoding them
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if dtype == 'float32':
+        return vectors, None
+    if dtype == 'float16':
+        return vectors.astype(np.float16), None
+
+    if scales is not None and _fits(vectors, scales):
+        low, step = np.asarray(scales, dtype=np.float32)
+    else:
+        low = vectors.min(axis=0) if len(vectors) else np.zeros(vectors.shape[1], dtype=np.float32)
+        high = vectors.max(axis=0) if len(vectors) else low
+        step = np.maximum((high - low) / 255, np.finfo(np.float32).tiny)
+    codes = np.clip(np.rint((vectors - low) / step) - 128, -128, 127).astype(np.int8)
+    return codes, np.stack([low, step]).astype(np.float32)
+
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """float32 vectors back from the codes of quantize."""
+    if scales is None:
+        return np.asarray(codes, dtype=np.float32)
+    return (np.asarray(codes, dtype=np.float32) + 128) * scales[1] + scales[0]
+
+
+class MechanicsStore:
+    """
+    Read-only view of an embedded mechanics database.
+    Use open_store to open one from disk.
+
+    codes are the vectors as stored, vectors and vectors_at decode them to float32.
+    """
+
+    def __init__(self, codes: np.ndarray, meta: Dict[str, Any], path: Optional[str] = None,
+                 records: Optional[List[Dict[str, Any]]] = None,
+                 records_buffer=None, offsets: Optional[np.ndarray] = None,
+                 scales: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+        self.meta = meta
+        self.path = path
+        self._records = records
+        self._records_buffer = records_buffer
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def dtype(self) -> str:
+        return self.meta.get('dtype', 'float32')
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All vectors as float32, the memory-mapped file itself for float32 stores."""
+        if self.codes.dtype == np.float32:
+            return self.codes
+        return dequantize(self.codes, self.scales)
+
+    def vectors_at(self, indices) -> np.ndarray:
+        """float32 vectors of some mechanics, without decoding the others."""
+        return dequantize(self.codes[indices], self.scales)
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.meta.get('model')
+
+    @property
+    def content_hash(self) -> str:
+        """sha256 of the vectors, recorded when the store was written."""
+        if 'vectors_sha256' not in self.meta:
+            # Converted in memory from a legacy JSON file
+            self.meta['vectors_sha256'] = hashlib.sha256(np.ascontiguousarray(self.codes).tobytes()).hexdigest()
+        return self.meta['vectors_sha256']
+
+    @property
+    def directory(self) -> Optional[str]:
+        """The store directory, None for stores loaded from a legacy JSON file."""
+        return self.path if self._records is None else None
+
+    @property
+    def entry_hashes(self) -> Optional[np.ndarray]:
+        """Content hash of every mechanic, None if the store was written without them."""
+        if self.directory is None:
+            return None
+        try:
+            return np.load(os.path.join(self.directory, HASHES_FILE), mmap_mode='r')
+        except OSError:
+            return None
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Return a new dict with the mechanic at index, without its embedding."""
+        if self._records is not None:
+            return dict(self._records[index])
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return json.loads(self._records_buffer[start:end])
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self)):
+            yield self.record(index)
+
+
+def write_store(path: str, records: Iterable[Dict[str, Any]], vectors: np.ndarray,
+                hashes: Optional[Iterable[str]] = None, dtype: Optional[str] = None,
+                scales: Optional[np.ndarray] = None, **meta) -> str:
+    """
+    Write records and their vectors as a store at path, replacing any previous store.
+    hashes, one hex digest per record, are saved to reuse vectors of unchanged records.
+    Vectors are stored as dtype, TECHIES_MECHANICS_DTYPE or float32. int8 scales
+    of the previous store are kept when they fit the vectors, see quantize.
+    Extra keyword arguments (e.g. model='all-MiniLM-L6-v2') are saved in meta.json.
+
+    Returns:
+        str: The path of the store
+    """
+    dtype = vector_dtype(dtype)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2:
+        raise ValueError(f"Expected a 2-dimensional vector matrix, got shape {vectors.shape}")
+    codes, scales = quantize(vectors, dtype, scales)
+
+    os.makedirs(path, exist_ok=True)
+
+    # Readers check meta.json first, remove it so a half written store is never opened
+    if os.path.exists(os.path.join(path, META_FILE)):
+        os.remove(os.path.join(path, META_FILE))
+
+    offsets = [0]
+    documents = []
+    with atomic_file(path, RECORDS_FILE) as f:
+        for record in records:
+            record = {key: value for key, value in record.items() if key != 'embedding'}
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+            documents.append(record_terms(record))
+
+    if len(offsets) - 1 != vectors.shape[0]:
+        raise ValueError(f"Got {len(offsets) - 1} records for {vectors.shape[0]} vectors")
+
+    with atomic_file(path, OFFSETS_FILE) as f:
+        np.save(f, np.asarray(offsets, dtype=np.int64))
+    with atomic_file(path, VECTORS_FILE) as f:
+        np.save(f, codes)
+    if scales is not None:
+        with atomic_file(path, SCALES_FILE) as f:
+            np.save(f, scales)
+    elif os.path.exists(os.path.join(path, SCALES_FILE)):
+        os.remove(os.path.join(path, SCALES_FILE))
+    with atomic_file(path, LEXICAL_FILE) as f:
+        LexicalIndex.build(documents).save(f)
+
+    if hashes is not None:
+        hashes = np.asarray(list(hashes), dtype='S64')
+        if hashes.shape != (vectors.shape[0],):
+            raise ValueError(f"Got {hashes.shape[0]} hashes for {vectors.shape[0]} vectors")
+        with atomic_file(path, HASHES_FILE) as f:
+            np.save(f, hashes)
+    elif os.path.exists(os.path.join(path, HASHES_FILE)):
+        # Left over from the previous store, it would not match these records
+        os.remove(os.path.join(path, HASHES_FILE))
+
+    meta = {
+        **meta,
+        'version': STORE_VERSION,
+        'count': int(vectors.shape[0]),
+        'dimension': int(vectors.shape[1]),
+        'dtype': dtype,
+        'vectors_sha256': hashlib.sha256(codes.tobytes()).hexdigest(),
+    }
+    with atomic_file(path, META_FILE) as f:
+        f.write(json.dumps(meta, indent=2).encode('utf-8'))
+
+    return path
+
+
+class atomic_file:
+    """Write a file of a store through a temporary file renamed into place on success."""
+
+    def __init__(self, directory, name):
+        self.path = os.path.join(directory, name)
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix='.tmp')
+        os.chmod(self.temp_path, 0o644)
+        self.file = os.fdopen(fd, 'wb')
+
+    def __enter__(self):
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.temp_path, self.path)
+        else:
+            os.remove(self.temp_path)
+
+
+def is_store(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def open_store(path: str) -> MechanicsStore:
+    """
+    Open a store directory, or a legacy '_embedded.json' file.
+
+    Raises:
+        ValueError: If path is neither, or the store was written by another format version
+    """
+    if os.path.isdir(path):
+        if not is_store(path):
+            raise ValueError(f"'{path}' is not a mechanics store (missing {META_FILE})")
+        return _open_store_dir(path)
+    if os.path.isfile(path):
+        return store_from_json(path)
+    raise ValueError(f"Mechanics database '{path}' not found")
+
+
+def _open_store_dir(path: str) -> MechanicsStore:
+    with open(os.path.join(path, META_FILE), 'r') as f:
+        meta = json.load(f)
+    if meta.get('version') != STORE_VERSION:
+        raise ValueError(f"Mechanics store '{path}' has version {meta.get('version')}, expected {STORE_VERSION}")
+
+    codes = np.load(os.path.join(path, VECTORS_FILE), mmap_mode='r')
+    offsets = np.load(os.path.join(path, OFFSETS_FILE))
+    scales = np.load(os.path.join(path, SCALES_FILE)) if meta.get('dtype') == 'int8' else None
+
+    with open(os.path.join(path, RECORDS_FILE), 'rb') as f:
+        # mmap cannot map empty files
+        records_buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b''
+
+    return MechanicsStore(codes, meta, path=path, records_buffer=records_buffer, offsets=offsets, scales=scales)
+
+
+def store_from_json(filename: str) -> MechanicsStore:
+    """Load a legacy '_embedded.json' file, each mechanic holding its 'embedding'."""
+    with open(filename, 'r') as infile:
+        mechanics = json.load(infile)
+
+    vectors = np.array([m['embedding'] for m in mechanics], dtype=np.float32)
+    if not mechanics:
+        vectors = vectors.reshape(0, 0)
+    records = [{key: value for key, value in m.items() if key != 'embedding'} for m in mechanics]
+    meta = {'version': STORE_VERSION, 'count': len(records), 'dimension': int(vectors.shape[1])}
+    return MechanicsStore(vectors, meta, path=filename, records=records)
+
+
+def export_json(store: MechanicsStore, filename: str) -> str:
+    """Write store in the legacy '_embedded.json' layout, for tools that read the JSON directly."""
+    mechanics = []
+    # Decoded once, vectors decodes the whole matrix of quantized stores
+    vectors = store.vectors
+    for index, record in enumerate(store.iter_records()):
+        record['embedding'] = vectors[index].tolist()
+        mechanics.append(record)
+
+    with open(filename, 'w') as outfile:
+        json.dump(mechanics, outfile, indent=2)
+    return filename
+
+
+def store_path_for(filename: str) -> str:
+    """
+    Store path next to a mechanics file,
+    e.g. 'platformer_mechanics.json' -> 'platformer_mechanics.mechdb'.
+    """
+    base_name, _ = os.path.splitext(filename)
+    if base_name.endswith('_embedded'):
+        base_name = base_name[:-len('_embedded')]
+    return base_name + STORE_SUFFIX
+
+
+def convert_json(filename: str, path: Optional[str] = None, model: str = DEFAULT_MODEL,
+                 dtype: Optional[str] = None) -> str:
+    """Convert a legacy '_embedded.json' file to a store, next to it by default."""
+    store = store_from_json(filename)
+    return write_store(path or store_path_for(filename), store.iter_records(), store.vectors, dtype=dtype, model=model)
@@ -1,10 +1,14 @@
-from .base_tool import BaseTool, BaseModel, Field, Type, List, os
+from .base_tool import BaseTool, BaseModel, Field, Type, List, Optional, os
+from .file_cache import get_file_cache
+from .file_ranges import parse_path_range, read_part
 
 
 class BatchReadFilesToolSchema(BaseModel):
     paths: List[str] = Field(
-        type=List[str], description="An array of filenames to read."
+        type=List[str], description="An array of filenames to read, each optionally with a line range such as 'game.html:120-180'."
     )
+    max_tokens: Optional[int] = Field(default=None, description="Read at most about this many tokens of each file, cut at a line end.")
+    outline: bool = Field(default=False, description="Only list the sections of each file with their line spans.")
 
 
 class BatchReadFilesTool(BaseTool):
@@ -20,12 +24,21 @@ class BatchReadFilesTool(BaseTool):
     def _run(self, **kwargs) -> str:
         try:
             paths = kwargs['paths']
+            cache = get_file_cache()
             content = ""
             for path in paths:
-                with open(f"{self.base_dir}/{path}", "r") as f:
-                    content += f.read()
-                    content += "\n"
+                # A file named like a range is read whole
+                if not os.path.exists(f"{self.base_dir}/{path}"):
+                    path, start_line, end_line = parse_path_range(path)
+                else:
+                    start_line = end_line = None
+                text = cache.text(f"{self.base_dir}/{path}")
+                content += read_part(
+                    path, text, start_line=start_line, end_line=end_line,
+                    max_tokens=kwargs.get('max_tokens'), show_outline=kwargs.get('outline', False),
+                )
+                content += "\n"
 
             return content
         except Exception as e:
-            return f"Failed to read files: {e}" 
\ No newline at end of file
+            return f"Failed to read files: {e}"
@@ -0,0 +1,183 @@
+"""
+Process-wide cache of the files read by the file tools.
+
+Contents are kept by real path, with the (mtime_ns, size, inode) of the file
+when it was read. Every read stats the file and only reads it again when one
+of them changed, so files edited by anything else are never served stale.
+WriteFileTool also invalidates the files it writes.
+
+Each file is held as a FileText, whose line offsets are indexed on the first
+ranged read, so any line range is then sliced without scanning the file.
+
+The cache holds at most TECHIES_FILE_CACHE_BYTES of files (64 MiB by
+default), the least recently read are evicted first. Set it to 0 to disable it.
+"""
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+FILE_CACHE_BYTES_ENV = 'TECHIES_FILE_CACHE_BYTES'
+DEFAULT_FILE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _file_key(stat: os.stat_result) -> Tuple[int, int, int]:
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class FileText:
+    """Content of a text file, with the index of its line offsets built on first use."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self._line_starts: Optional[array] = None
+        self._data: Optional[bytes] = None
+
+    @property
+    def line_starts(self) -> array:
+        """Offset of the first character of every line."""
+        if self._line_starts is None:
+            starts = array('q', [0])
+            position = self.content.find('\n')
+            while position != -1:
+                starts.append(position + 1)
+                position = self.content.find('\n', position + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    @property
+    def line_count(self) -> int:
+        starts = self.line_starts
+        # No line starts after a final newline
+        return len(starts) - 1 if starts[-1] == len(self.content) else len(starts)
+
+    def lines(self, start: int, end: int) -> str:
+        """Lines start to end, numbered from 1 and both included."""
+        starts = self.line_starts
+        start = max(start, 1)
+        end = min(end, self.line_count)
+        if start > end:
+            return ""
+        stop = starts[end] if end < len(starts) else len(self.content)
+        return self.content[starts[start - 1]:stop]
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.content) if self.content.isascii() else len(self.data)
+
+    @property
+    def data(self) -> bytes:
+        """The content as utf-8, kept once needed for byte ranges of non-ASCII files."""
+        if self._data is None:
+            self._data = self.content.encode('utf-8')
+        return self._data
+
+    def byte_offset(self, index: int) -> int:
+        """Offset in bytes of the character at index."""
+        if self.content.isascii():
+            return index
+        return len(self.content[:index].encode('utf-8'))
+
+    def byte_range(self, offset: int, length: Optional[int] = None) -> str:
+        """length bytes from offset, characters cut by the range are dropped."""
+        stop = None if length is None else offset + length
+        if self.content.isascii():
+            return self.content[offset:stop]
+        return self.data[offset:stop].decode('utf-8', errors='ignore')
+
+
+class FileCache:
+    """LRU cache of text files, bounded by the total size of the files held."""
+
+    def __init__(self, max_bytes: int = DEFAULT_FILE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[Tuple[int, int, int], FileText]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def read(self, path: str) -> str:
+        """
+        Content of the text file at path.
+
+        Raises:
+            OSError: As open and read would
+        """
+        return self.text(path).content
+
+    def text(self, path: str) -> FileText:
+        """
+        The text file at path, with its line index.
+
+        Raises:
+            OSError: As open and read would
+        """
+        real_path = os.path.realpath(path)
+        key = _file_key(os.stat(real_path))
+        with self._lock:
+            entry = self._entries.get(real_path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(real_path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(real_path, 'r') as f:
+            text = FileText(f.read())
+
+        # A file written while being read is returned but not kept
+        if _file_key(os.stat(real_path)) == key:
+            self._put(real_path, key, text)
+        return text
+
+    def _put(self, real_path: str, key: Tuple[int, int, int], text: FileText):
+        size = key[1]
+        with self._lock:
+            self._discard(real_path)
+            if size > self.max_bytes:
+                return
+            self._entries[real_path] = (key, text)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted_key, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_key[1]
+
+    def _discard(self, real_path: str):
+        entry = self._entries.pop(real_path, None)
+        if entry is not None:
+            self._bytes -= entry[0][1]
+
+    def invalidate(self, path: str):
+        """Forget the file at path, e.g. after writing it."""
+        with self._lock:
+            self._discard(os.path.realpath(path))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+
+_file_cache: Optional[FileCache] = None
+_file_cache_lock = threading.Lock()
+
+
+def get_file_cache() -> FileCache:
+    """The cache shared by every file tool of the process, sized by TECHIES_FILE_CACHE_BYTES."""
+    global _file_cache
+    if _file_cache is None:
+        with _file_cache_lock:
+            if _file_cache is None:
+                value = os.environ.get(FILE_CACHE_BYTES_ENV)
+                _file_cache = FileCache(int(value) if value else DEFAULT_FILE_CACHE_BYTES)
+    return _file_cache
@@ -0,0 +1,174 @@
+"""
+Partial reads for the file tools.
+
+Generated files such as game.html grow to thousands of lines, agents read
+only what they need instead of the whole file on every step:
+
+- a line range, numbered from 1 with both ends included
+- a byte range, from an offset
+- a budget of tokens, the content is cut at the last whole line that fits
+- an outline: the line spans of the <script> and <style> blocks of HTML
+  files, and of the top-level elements of XML files
+
+Partial reads start with a header telling which part of the file follows.
+"""
+import os
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from xml.parsers import expat
+
+from .file_cache import FileText
+
+# Rough size of a token, to turn a token budget into characters
+CHARS_PER_TOKEN = 4
+
+HTML_OUTLINE_TAGS = ('script', 'style')
+
+_PATH_RANGE_RE = re.compile(r"^(?P<path>.+?):(?P<start>\d+)?-(?P<end>\d+)?$")
+
+
+def parse_path_range(path: str) -> Tuple[str, Optional[int], Optional[int]]:
+    """Split 'game.html:120-180' into the path and its line range, either end may be left out."""
+    match = _PATH_RANGE_RE.match(path)
+    if not match:
+        return path, None, None
+    start, end = match.group('start'), match.group('end')
+    return match.group('path'), int(start) if start else None, int(end) if end else None
+
+
+def _label(tag: str, attrs) -> str:
+    attrs = dict(attrs)
+    details = [f'{name}="{attrs[name]}"' for name in ('id', 'src', 'type', 'name') if attrs.get(name)]
+    return f"<{tag}{' ' + ' '.join(details) if details else ''}>"
+
+
+class _HtmlOutline(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections: List[Tuple[int, int, str]] = []
+        self._open: List[Tuple[str, int, str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HTML_OUTLINE_TAGS:
+            self._open.append((tag, self.getpos()[0], _label(tag, attrs)))
+
+    def handle_endtag(self, tag):
+        if self._open and self._open[-1][0] == tag:
+            _, start, label = self._open.pop()
+            self.sections.append((start, self.getpos()[0], label))
+
+
+def _html_sections(content: str) -> List[Tuple[int, int, str]]:
+    parser = _HtmlOutline()
+    parser.feed(content)
+    parser.close()
+    return sorted(parser.sections)
+
+
+def _xml_sections(content: str) -> List[Tuple[int, int, str]]:
+    parser = expat.ParserCreate()
+    sections, open_elements = [], []
+
+    def start(tag, attrs):
+        open_elements.append((tag, parser.CurrentLineNumber, _label(tag, attrs)))
+
+    def end(tag):
+        _, start_line, label = open_elements.pop()
+        # The root element and its children
+        if len(open_elements) <= 1:
+            sections.append((start_line, parser.CurrentLineNumber, label))
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.Parse(content, True)
+    return sorted(sections, key=lambda section: (section[0], -section[1]))
+
+
+def outline(path: str, text: FileText) -> str:
+    """Line spans of the sections of the file, as 'start-end label' lines."""
+    header = f"[Outline of {path}, {text.line_count} lines]"
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension in ('.html', '.htm'):
+            sections = _html_sections(text.content)
+        elif extension == '.xml':
+            sections = _xml_sections(text.content)
+        else:
+            return f"{header}\nNo outline for {extension or 'extensionless'} files, read line ranges instead."
+    except expat.ExpatError as e:
+        return f"{header}\nThe file is not well-formed XML, no outline: {e}"
+
+    if not sections:
+        return f"{header}\nNo sections found."
+    return "\n".join([header] + [f"{start}-{end} {label}" for start, end, label in sections])
+
+
+def _fit(text: FileText, start: int, end: int, max_chars: int) -> Tuple[str, int]:
+    """The lines from start that fit in max_chars, and the last one included."""
+    starts = text.line_starts
+    limit = starts[start - 1] + max_chars
+    # Last line ending within the budget, at least the first line, cut if it has to be
+    last = start
+    while last < end and (starts[last + 1] if last + 1 < len(starts) else len(text.content)) <= limit:
+        last += 1
+    content = text.lines(start, last)
+    return content[:max_chars], last
+
+
+def read_part(path: str, text: FileText, start_line: Optional[int] = None, end_line: Optional[int] = None,
+              offset: Optional[int] = None, length: Optional[int] = None,
+              max_tokens: Optional[int] = None, show_outline: bool = False) -> str:
+    """
+    The part of the file asked for, with a header when it is not the whole file.
+
+    Raises:
+        ValueError: If both a line range and a byte range are given
+    """
+    if show_outline:
+        return outline(path, text)
+
+    has_lines = start_line is not None or end_line is not None
+    has_bytes = offset is not None or length is not None
+    if has_lines and has_bytes:
+        raise ValueError("Give either a line range (start_line, end_line) or a byte range (offset, length), not both")
+    max_chars = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+
+    if has_bytes:
+        offset = offset or 0
+        content = text.byte_range(offset, length)
+        truncated = max_chars is not None and len(content) > max_chars
+        if truncated:
+            content = content[:max_chars]
+        size = text.size_bytes
+        shown = f"from byte {offset}" if truncated else f"bytes {offset}-{min(offset + (length or size), size)}"
+        note = ""
+        if truncated:
+            next_offset = offset + len(content.encode('utf-8'))
+            note = f", truncated to {max_tokens} tokens, read on with offset={next_offset}"
+        return f"[{path} {shown} of {size}{note}]\n{content}"
+
+    line_count = text.line_count
+    start = max(start_line or 1, 1)
+    end = min(end_line or line_count, line_count)
+    if not has_lines and (max_chars is None or len(text.content) <= max_chars):
+        return text.content
+    if start > end:
+        return f"[{path} has {line_count} lines, none in the range asked for]"
+
+    if max_chars is None:
+        return f"[{path} lines {start}-{end} of {line_count}]\n{text.lines(start, end)}"
+    content, last = _fit(text, start, end, max_chars)
+    if len(content) < len(text.lines(start, last)):
+        # A single line over the budget, the rest of it is only reachable by bytes
+        next_offset = text.byte_offset(text.line_starts[start - 1] + len(content))
+        return (
+            f"[{path} line {start} of {line_count}, truncated to {max_tokens} tokens, "
+            f"read on with offset={next_offset}]\n{content}"
+        )
+    if last < end:
+        return (
+            f"[{path} lines {start}-{last} of {line_count}, truncated to {max_tokens} tokens, "
+            f"read on with start_line={last + 1}]\n{content}"
+        )
+    return f"[{path} lines {start}-{end} of {line_count}]\n{content}"
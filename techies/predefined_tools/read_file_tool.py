@@ -1,14 +1,28 @@
-from .base_tool import BaseTool, BaseModel, Field, Type, os
+from .base_tool import BaseTool, BaseModel, Field, Type, Optional, os
+from .file_cache import get_file_cache
+from .file_ranges import read_part
+
+# Entries listed when a file is not found, directories can hold thousands of files
+FILES_AVAILABLE_LIMIT = 50
 
 
 class ReadFileToolSchema(BaseModel):
     path: str = Field(type=str, description="The path to the file to read.")
+    start_line: Optional[int] = Field(default=None, description="First line to read, numbered from 1.")
+    end_line: Optional[int] = Field(default=None, description="Last line to read, included.")
+    offset: Optional[int] = Field(default=None, description="Byte offset to read from, instead of a line range.")
+    length: Optional[int] = Field(default=None, description="Number of bytes to read from offset.")
+    max_tokens: Optional[int] = Field(default=None, description="Read at most about this many tokens, cut at a line end.")
+    outline: bool = Field(default=False, description="Only list the sections of the file (HTML script and style blocks, XML top-level elements) with their line spans.")
 
 
 class ReadFileTool(BaseTool):
     name: str = "Read a File"
     id: str = "read_file"
-    description: str = "Read the contents of a file from the bucket."
+    description: str = (
+        "Read the contents of a file from the bucket. For large files, read the outline first, "
+        "then only the lines needed with start_line and end_line."
+    )
     args_schema: Type[BaseModel] = ReadFileToolSchema
     base_dir: str
 
@@ -18,10 +32,27 @@ class ReadFileTool(BaseTool):
     def _run(self, **kwargs) -> str:
         try:
             path = kwargs['path']
-            with open(f"{self.base_dir}/{path}", "r") as f:
-                content = f.read()
-
-            return content
+            # Unchanged files are served from the cache shared with the other file tools
+            text = get_file_cache().text(f"{self.base_dir}/{path}")
+            return read_part(
+                path, text,
+                start_line=kwargs.get('start_line'), end_line=kwargs.get('end_line'),
+                offset=kwargs.get('offset'), length=kwargs.get('length'),
+                max_tokens=kwargs.get('max_tokens'), show_outline=kwargs.get('outline', False),
+            )
+        except FileNotFoundError as e:
+            return f"Failed to read file: {e}.\nFiles available: {self._files_available()}"
         except Exception as e:
-            files_available = "\t".join(os.listdir(self.base_dir))
-            return f"Failed to read file: {e}.\nFiles available: {files_available}" 
\ No newline at end of file
+            return f"Failed to read file: {e}."
+
+    def _files_available(self) -> str:
+        names = []
+        try:
+            with os.scandir(self.base_dir) as entries:
+                for entry in entries:
+                    if len(names) == FILES_AVAILABLE_LIMIT:
+                        return "\t".join(sorted(names)) + f"\t(more than {FILES_AVAILABLE_LIMIT} entries, not all listed)"
+                    names.append(entry.name)
+        except OSError:
+            pass
+        return "\t".join(sorted(names))
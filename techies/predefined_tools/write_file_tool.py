@@ -1,4 +1,5 @@
 from .base_tool import BaseTool, BaseModel, Field, Type, os, json
+from .file_cache import get_file_cache
 
 
 class WriteFileToolSchema(BaseModel):
@@ -22,6 +23,7 @@ class WriteFileTool(BaseTool):
         super().__init__(**kwargs)
 
     def _run(self, **kwargs) -> str:
+        path = None
         try:
             import difflib
 
@@ -41,8 +43,7 @@ class WriteFileTool(BaseTool):
                     f.write(content)
                 return f"File {path} created successfully."
             else:
-                with open(f"{self.base_dir}/{path}", "r") as f:
-                    old_content = f.read()
+                old_content = get_file_cache().read(f"{self.base_dir}/{path}")
 
                 if path.endswith(".html") and (len(old_content.splitlines()) * 0.8 > len(content.splitlines())):
                     return f"""
@@ -59,4 +60,8 @@ Please Try Again.
                 return f"File {path} updated successfully.Summary of Changes:\n\n{diff}"
 
         except Exception as e:
-            return f"Failed to write file: {e}" 
\ No newline at end of file
+            return f"Failed to write file: {e}"
+        finally:
+            # Readers sharing the file cache see the new content, even if written within the same mtime tick
+            if path is not None:
+                get_file_cache().invalidate(f"{self.base_dir}/{path}") 
\ No newline at end of file
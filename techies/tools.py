@@ -1,9 +1,10 @@
 import copy
 import inspect
 import re
-from typing import Type, Optional, Union
+from typing import Any, Callable, Dict, NamedTuple, Type, Optional, Union
 
 from crewai.tools import BaseTool
+from pydantic import BaseModel
 
 from .predefined_tools.read_file_tool import ReadFileTool
 from .predefined_tools.batch_read_files_tool import BatchReadFilesTool
@@ -11,9 +12,26 @@ from .predefined_tools.write_file_tool import WriteFileTool
 from .predefined_tools.list_files_tool import ListFilesTool
 from .predefined_tools.sound_tools import SearchSoundTool, SaveSoundTool
 from .predefined_tools.html_examples_tool import ReadHtmlExamplesTool
+from .utils import LazyPool
 
-# Global registry for tools
-_registered_tools = {}
+
+class ToolSpec(NamedTuple):
+    """Registry entry of a tool: its metadata and a factory building a fresh instance."""
+    id: str
+    name: str
+    description: str
+    args_schema: Optional[Type[BaseModel]]
+    factory: Callable[[], BaseTool]
+
+
+# Global registry for tools, tool id -> ToolSpec
+_registered_tools: Dict[str, ToolSpec] = {}
+
+_builtin_tool_classes = [
+    ReadFileTool, BatchReadFilesTool, WriteFileTool, ListFilesTool,
+    SaveSoundTool, SearchSoundTool, ReadHtmlExamplesTool,
+]
+_builtin_tool_specs = []
 
 def to_snake_case(name: str) -> str:
     """Convert a string to snake_case format.
@@ -21,59 +39,95 @@ def to_snake_case(name: str) -> str:
     pattern = re.compile(r'(?<!^)(?=[A-Z])')
     return pattern.sub('_', name).lower()
 
-def register_tool(tool_class_or_instance: Union[Type[BaseTool], BaseTool], tool_id: Optional[str] = None, set_no_cache: bool = False) -> str:
-    """Register a tool class or tool instance with an optional custom ID.
-    If no ID is provided, it will try to use the tool's id attribute,
-    or convert the class name to snake_case.
-    Returns the tool_id used for registration."""
-    
+def _field_default(tool_class: Type[BaseTool], field_name: str) -> Any:
+    """Read a field default from a pydantic tool class without instantiating it."""
+    field = tool_class.model_fields.get(field_name)
+    if field is None or field.is_required():
+        return None
+    return field.get_default(call_default_factory=True)
+
+def _disable_cache(tool: BaseTool) -> BaseTool:
+    # Override cache function for the tool
+    tool.cache_function = lambda args, result: False
+    return tool
+
+def make_tool_spec(tool_class_or_instance: Union[Type[BaseTool], BaseTool], tool_id: Optional[str] = None, set_no_cache: bool = False) -> ToolSpec:
+    """Build the registry entry for a tool class or tool instance.
+    Classes are only inspected, they are instantiated by the factory on demand.
+    Instances (e.g. from the @tool decorator) are deep copied by the factory."""
+
     # Check if tool_class_or_instance is a class (to be instantiated) or an instance
     if inspect.isclass(tool_class_or_instance) and issubclass(tool_class_or_instance, BaseTool):
-        # It's a class that inherits from BaseTool, instantiate it
-        tool = tool_class_or_instance(base_dir=".")
         tool_class = tool_class_or_instance
+        metadata = {field: _field_default(tool_class, field) for field in ('id', 'name', 'description', 'args_schema')}
+
+        def factory():
+            tool = tool_class(base_dir=".")
+            return _disable_cache(tool) if set_no_cache else tool
+
+        if metadata['name'] is None:
+            # No class level default to read, fall back to a throwaway instance
+            tool = tool_class(base_dir=".")
+            metadata = {field: getattr(tool, field, None) for field in metadata}
     else:
         # It's already an instance (e.g., from the @tool decorator)
         tool = tool_class_or_instance
-        tool_class = tool.__class__
+        metadata = {field: getattr(tool, field, None) for field in ('id', 'name', 'description', 'args_schema')}
 
-    if set_no_cache:
-    # Override cache function for the tool
-        tool.cache_function = lambda args, result: False
-
-    if tool_id is None:        
-        if hasattr(tool_class_or_instance, 'id'):
-            tool_id = tool_class_or_instance.id
-        elif hasattr(tool, 'id'):
-            tool_id = tool.id
-        else:
-            tool_id = to_snake_case(tool.name)
-    
-    _registered_tools[tool_id] = tool
-    return tool_id
+        def factory():
+            tool_copy = copy.deepcopy(tool)
+            return _disable_cache(tool_copy) if set_no_cache else tool_copy
 
-def get_all_tools():
-    """Get all tools including both built-in and user-registered tools."""
-    base_dir = "."
+    if tool_id is None:
+        tool_id = metadata['id'] or to_snake_case(metadata['name'])
 
-    # Register all built-in tools
-    tool_classes = [
-        ReadFileTool, BatchReadFilesTool, WriteFileTool, ListFilesTool,
-        SaveSoundTool, SearchSoundTool, ReadHtmlExamplesTool, 
-    ]
-    
-    for tool_class in tool_classes:
-        register_tool(tool_class, set_no_cache=True)
+    return ToolSpec(
+        id=tool_id,
+        name=metadata['name'],
+        description=metadata['description'],
+        args_schema=metadata['args_schema'],
+        factory=factory,
+    )
 
-    # Return a deep copy of the registered tools dictionary
-    return copy.deepcopy(_registered_tools)
+def register_tool(tool_class_or_instance: Union[Type[BaseTool], BaseTool], tool_id: Optional[str] = None, set_no_cache: bool = False) -> str:
+    """Register a tool class or tool instance with an optional custom ID.
+    If no ID is provided, it will try to use the tool's id attribute,
+    or convert the class name to snake_case.
+    Returns the tool_id used for registration."""
+    spec = make_tool_spec(tool_class_or_instance, tool_id, set_no_cache=set_no_cache)
+    _registered_tools[spec.id] = spec
+    return spec.id
+
+def _register_builtin_tools():
+    """(Re-)register the built-in tools, their specs are only built once per process."""
+    if not _builtin_tool_specs:
+        _builtin_tool_specs.extend(
+            make_tool_spec(tool_class, set_no_cache=True) for tool_class in _builtin_tool_classes
+        )
+    for spec in _builtin_tool_specs:
+        _registered_tools[spec.id] = spec
+
+def get_tool_specs() -> Dict[str, ToolSpec]:
+    """Get the metadata of all tools, including both built-in and user-registered tools."""
+    _register_builtin_tools()
+    return dict(_registered_tools)
+
+def create_tool(tool_id: str) -> BaseTool:
+    """Create a new instance of the tool registered as tool_id."""
+    _register_builtin_tools()
+    return _registered_tools[tool_id].factory()
+
+def get_all_tools():
+    """Get all tools including both built-in and user-registered tools.
+    Each call returns a new pool; a tool is only instantiated when it is first looked up."""
+    return LazyPool(get_tool_specs().keys(), create_tool)
 
 def validate_tool(tool_id, recursive=True):
     """
     Validate the tool with the given tool_id.
     Returns (True, None) on success, (False, 'failure-reason') on failure.
     """
-    tools = get_all_tools()
-    if tool_id in tools:
+    _register_builtin_tools()
+    if tool_id in _registered_tools:
         return True, None
     return False, f"Tool '{tool_id}' not found"
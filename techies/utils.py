@@ -1,4 +1,5 @@
-from typing import List, Tuple, Dict, Set
+from collections.abc import MutableMapping
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Dict, Set
 
 def topology_sort_partial(vertices: List[str], edges: List[Tuple[str, str]], start: str):
     """
@@ -15,48 +16,8 @@ def topology_sort_partial(vertices: List[str], edges: List[Tuple[str, str]], sta
     Raises:
         ValueError: If start vertex is not in the graph or if a cycle is detected
     """
-    # Check if start vertex exists
-    if start not in vertices:
-        raise ValueError(f"Start vertex '{start}' not found in graph")
-    
-    # Build adjacency list
-    graph: Dict[str, List[str]] = {v: [] for v in vertices}
-    for from_v, to_v in edges:
-        if from_v in graph:
-            graph[from_v].append(to_v)
-    
-    result = []  # Sorted result
-    visited: Set[str] = set()  # Vertices that have been fully processed
-    temp_visited: Set[str] = set()  # Vertices being processed in current DFS
-    
-    def dfs(vertex: str):
-        """
-        Depth-first search with cycle detection.
-        """
-        if vertex in temp_visited:
-            # We've found a cycle
-            cycle_path = " -> ".join(list(temp_visited) + [vertex])
-            raise ValueError(f"Cycle detected in graph: {cycle_path}")
-        
-        if vertex in visited:
-            return
-        
-        temp_visited.add(vertex)
-        
-        # Visit all neighbors
-        for neighbor in graph.get(vertex, []):
-            dfs(neighbor)
-        
-        # Mark as fully visited and add to result
-        temp_visited.remove(vertex)
-        visited.add(vertex)
-        result.append(vertex)
-    
-    # Start DFS from the start vertex
-    dfs(start)
-    
-    # Reverse to get topological order
-    return result[::-1]
+    return TaskGraph(vertices, edges).partial_order(start)
+
 
 def is_topology_ordered(edges: List[Tuple[str, str]], array: List[str]) -> bool:
     """
@@ -85,4 +46,282 @@ def is_topology_ordered(edges: List[Tuple[str, str]], array: List[str]) -> bool:
         if position[from_v] >= position[to_v]:
             return False
             
-    return True 
\ No newline at end of file
+    return True
+
+
+class TaskGraph:
+    """
+    Dependency graph indexed once for repeated queries.
+
+    Vertices are numbered in a topological order (dependents before their
+    dependencies), and the transitive dependencies of every vertex are kept
+    as a bitset over those numbers, answering depends_on in O(1). Each
+    bitset is decoded into names once, on first use, so querying the
+    dependencies of a vertex is O(reach). Cycles are found with an
+    iterative Tarjan SCC pass, so neither building nor querying is limited
+    by the recursion limit.
+
+    Edges are (from, to) pairs where from depends on to. Targets that are not
+    listed in vertices are kept as leaves so they show up as dependencies.
+    """
+
+    def __init__(self, vertices: Iterable[str], edges: Iterable[Tuple[str, str]]):
+        names = list(dict.fromkeys(vertices))
+        self.vertices = set(names)
+
+        # Integer indexed adjacency, edges from unknown vertices are ignored
+        index = {name: i for i, name in enumerate(names)}
+        adjacency: List[List[int]] = [[] for _ in names]
+        for from_v, to_v in edges:
+            if from_v not in self.vertices:
+                continue
+            if to_v not in index:
+                index[to_v] = len(names)
+                names.append(to_v)
+                adjacency.append([])
+            if index[to_v] not in adjacency[index[from_v]]:
+                adjacency[index[from_v]].append(index[to_v])
+
+        # Tarjan emits components with their dependencies first, so reversing
+        # it numbers vertices in a topological order of the condensation.
+        # Members are listed in discovery order, so a cycle starts where the
+        # traversal entered it.
+        components = [component[::-1] for component in _strongly_connected_components(adjacency)]
+        order = [v for component in reversed(components) for v in component]
+        rank = [0] * len(names)
+        for position, v in enumerate(order):
+            rank[v] = position
+
+        self.names = [names[v] for v in order]
+        self.rank = {name: position for position, name in enumerate(self.names)}
+        self.adjacency = [sorted(rank[w] for w in adjacency[v]) for v in order]
+
+        # Reachability and cycle membership per component, dependencies first
+        component_of = [0] * len(names)
+        for c, component in enumerate(components):
+            for v in component:
+                component_of[rank[v]] = c
+        self._component_of = component_of
+        reach = [0] * len(components)
+        cycles: List[Any] = [None] * len(components)
+        for c, component in enumerate(components):
+            members = [rank[v] for v in component]
+            bits = 0
+            cycle = None
+            for v in members:
+                for w in self.adjacency[v]:
+                    bits |= 1 << w
+                    if component_of[w] != c:
+                        bits |= reach[component_of[w]]
+                        cycle = cycle or cycles[component_of[w]]
+            if len(members) > 1 or (members[0] in self.adjacency[members[0]]):
+                cycle = self._cycle_path(members)
+            reach[c] = bits
+            cycles[c] = cycle
+        self._reach = reach
+        # Names of every component's dependencies in topological order, decoded on first use
+        self._dependency_names: List[Optional[Tuple[str, ...]]] = [None] * len(components)
+        self._cycles = cycles
+
+    def __contains__(self, name) -> bool:
+        return name in self.vertices
+
+    def _cycle_path(self, members: List[int]) -> List[str]:
+        """Find a cycle through the first member, staying inside its component."""
+        start = min(members)
+        inside = set(members)
+        parent = {start: None}
+        queue = [start]
+        for v in queue:
+            for w in self.adjacency[v]:
+                if w == start:
+                    path = [start]
+                    while v is not None:
+                        path.append(v)
+                        v = parent[v]
+                    return [self.names[u] for u in reversed(path)]
+                if w in inside and w not in parent:
+                    parent[w] = v
+                    queue.append(w)
+        return []
+
+    def cycle(self, name: str):
+        """
+        Return the cycle path (first vertex repeated at the end) that name
+        is part of or depends on, None if its dependencies are acyclic.
+        """
+        return self._cycles[self._component_of[self.rank[name]]]
+
+    def dependencies(self, name: str) -> List[str]:
+        """Transitive dependencies of name in topological order, excluding name itself."""
+        c = self._component_of[self.rank[name]]
+        names = self._dependency_names[c]
+        if names is None:
+            names = self._dependency_names[c] = self._decode(self._reach[c])
+        # Members of a cycle reach themselves
+        return [dependency for dependency in names if dependency != name]
+
+    def _decode(self, bits: int) -> Tuple[str, ...]:
+        names = []
+        # Lowest set bit first, x & -x isolates it
+        while bits:
+            low = bits & -bits
+            names.append(self.names[low.bit_length() - 1])
+            bits ^= low
+        return tuple(names)
+
+    def depends_on(self, name: str, dependency: str) -> bool:
+        """Whether name transitively depends on dependency."""
+        return bool(self._reach[self._component_of[self.rank[name]]] >> self.rank[dependency] & 1)
+
+    def partial_order(self, start: str) -> List[str]:
+        """
+        Start followed by its transitive dependencies, in topological order.
+
+        Raises:
+            ValueError: If start is not a vertex or if a cycle is reachable from it
+        """
+        if start not in self.vertices:
+            raise ValueError(f"Start vertex '{start}' not found in graph")
+
+        cycle = self.cycle(start)
+        if cycle:
+            raise ValueError(f"Cycle detected in graph: {' -> '.join(cycle)}")
+
+        return [start] + self.dependencies(start)
+
+    def topological_order(self) -> List[str]:
+        """All vertices, dependents before dependencies (cycles are kept together)."""
+        return list(self.names)
+
+    def is_ordered(self, array: List[str]) -> bool:
+        """Same check as is_topology_ordered, using the indexed edges."""
+        position = {vertex: index for index, vertex in enumerate(array)}
+        for from_v, i in position.items():
+            if from_v not in self.vertices:
+                continue
+            for w in self.adjacency[self.rank[from_v]]:
+                to_v = self.names[w]
+                if to_v in position and i >= position[to_v]:
+                    return False
+        return True
+
+
+def _strongly_connected_components(adjacency: List[List[int]]) -> List[List[int]]:
+    """
+    Iterative Tarjan algorithm.
+    Components are returned after every component they have edges to.
+    """
+    count = len(adjacency)
+    index: List[Any] = [None] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack: List[int] = []
+    components = []
+    counter = 0
+
+    for root in range(count):
+        if index[root] is not None:
+            continue
+
+        work = [(root, 0)]
+        while work:
+            v, i = work.pop()
+            if i == 0:
+                index[v] = low[v] = counter
+                counter += 1
+                stack.append(v)
+                on_stack[v] = True
+            else:
+                # Returning from the neighbor visited last
+                low[v] = min(low[v], low[adjacency[v][i - 1]])
+
+            neighbors = adjacency[v]
+            descended = False
+            while i < len(neighbors):
+                w = neighbors[i]
+                i += 1
+                if index[w] is None:
+                    work.append((v, i))
+                    work.append((w, 0))
+                    descended = True
+                    break
+                if on_stack[w]:
+                    low[v] = min(low[v], index[w])
+            if descended:
+                continue
+
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+
+    return components
+
+
+class LazyPool(MutableMapping):
+    """
+    A pool of named instances that are built on first access.
+
+    The pool knows every available name up front, but only calls factory(name)
+    when that name is looked up. Factories may store the instance into the pool
+    themselves (as Agent and Task do) before returning it.
+
+    Args:
+        names: Names that can be materialized from this pool
+        factory: Callable building the instance for a given name
+    """
+
+    def __init__(self, names: Iterable[str], factory: Callable[[str], Any]):
+        self._names: Dict[str, None] = dict.fromkeys(names)
+        self._factory = factory
+        self._instances: Dict[str, Any] = {}
+        self._building: Set[str] = set()
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._names:
+            raise KeyError(name)
+        if name in self._building:
+            raise ValueError(f"Cycle detected while building '{name}'")
+
+        self._building.add(name)
+        try:
+            instance = self._factory(name)
+        finally:
+            self._building.discard(name)
+
+        return self._instances.setdefault(name, instance)
+
+    def __setitem__(self, name: str, instance: Any):
+        self._names[name] = None
+        self._instances[name] = instance
+
+    def __delitem__(self, name: str):
+        del self._names[name]
+        self._instances.pop(name, None)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        # Mapping.get would turn a KeyError raised inside the factory into default
+        if name not in self._names:
+            return default
+        return self[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def materialized(self) -> Dict[str, Any]:
+        """Return the instances built so far, without building any new ones."""
+        return dict(self._instances)
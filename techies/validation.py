@@ -0,0 +1,320 @@
+"""
+Validation of agent, task and crew configurations.
+
+This module only depends on the fixtures and the JSON schemas, so checking
+configurations does not import crewai. Tools are looked up on demand when an
+agent is validated recursively.
+"""
+import jsonschema
+from functools import lru_cache
+from techies.fixture_loader import load_fixture
+from techies.callbacks import validate_callback
+from techies.config_schema import AGENT_SCHEMA, TASK_SCHEMA, CREW_SCHEMA
+from techies.utils import TaskGraph
+
+_SCHEMAS = {
+    'agent': AGENT_SCHEMA,
+    'task': TASK_SCHEMA,
+    'crew': CREW_SCHEMA,
+}
+
+
+def load_task_graph():
+    """
+    Load all tasks and build a dependency graph.
+
+    Returns:
+        Tuple[List[str], List[Tuple[str, str]]]: A tuple containing:
+            - List of task names (vertices)
+            - List of dependency edges as (dependent_task, dependency) tuples
+    """
+    task_configs = load_fixture('tasks')
+
+    # Get all task names (excluding those starting with '_')
+    vertices = [task_name for task_name in task_configs.keys()
+               if not task_name.startswith('_')]
+
+    # Build the dependency edges
+    edges = []
+    for task_name in vertices:
+        config = task_configs[task_name]
+        depends_on = config.get('depends_on', [])
+
+        # Convert to list if it's a string
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+
+        # Add edges from dependencies to the current task
+        # Note: In a dependency graph, edges point from dependent task to its dependency
+        for dependency in depends_on:
+            edges.append((task_name, dependency))  # This task depends on dependency
+
+    return vertices, edges
+
+
+def build_task_graph():
+    """Index the dependency graph of all tasks, see techies.utils.TaskGraph."""
+    return TaskGraph(*load_task_graph())
+
+
+@lru_cache(maxsize=None)
+def compiled_schema(kind):
+    """
+    Return a validator for the 'agent', 'task' or 'crew' schema.
+    The schema is checked and compiled once per process.
+    """
+    schema = _SCHEMAS[kind]
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def schema_error(kind, config):
+    """
+    Validate config against a compiled schema.
+
+    Returns:
+        Optional[str]: The message of the best matching error, None if config is valid
+    """
+    error = jsonschema.exceptions.best_match(compiled_schema(kind).iter_errors(config))
+    return None if error is None else error.message
+
+
+class ConfigValidator:
+    """
+    Validates agents, tasks and crews against one snapshot of the fixtures.
+
+    Every agent and task is validated at most once per validator, the schemas
+    are compiled once, and the task graph is indexed once for all dependency
+    queries.
+    """
+
+    def __init__(self):
+        self.agent_configs = load_fixture('agents')
+        self.task_configs = load_fixture('tasks')
+        self.crew_configs = load_fixture('crews')
+        self._results = {}
+        self._task_graph = None
+
+    def _memoized(self, key, validate):
+        if key not in self._results:
+            self._results[key] = validate()
+        return self._results[key]
+
+    @property
+    def task_graph(self):
+        """TaskGraph of all tasks, built on first use."""
+        if self._task_graph is None:
+            self._task_graph = build_task_graph()
+        return self._task_graph
+
+    def agent(self, name, recursive=True):
+        """
+        Validate the agent with the given name.
+        Returns (True, None) on success, (False, 'failure-reason') on failure.
+        """
+        return self._memoized(('agent', name, recursive), lambda: self._validate_agent(name, recursive))
+
+    def task(self, name, recursive=True):
+        """
+        Validate the task with the given name.
+        If recursive=True, also validates all dependencies.
+
+        Returns (True, None) on success, (False, 'failure-reason') on failure.
+        """
+        return self._memoized(('task', name, recursive), lambda: self._validate_task(name, recursive))
+
+    def crew(self, name, recursive=True):
+        """
+        Validate the crew with the given name.
+        If recursive=True, also validates all agents and tasks in the crew.
+
+        Returns (True, None) on success, (False, 'failure-reason') on failure.
+        """
+        return self._memoized(('crew', name, recursive), lambda: self._validate_crew(name, recursive))
+
+    def all(self):
+        """
+        Recursively validate every crew, task and agent.
+
+        Returns:
+            Dict[str, Dict[str, Tuple[bool, Optional[str]]]]: results keyed by
+            'crews', 'tasks' and 'agents', then by name
+        """
+        return {
+            'crews': {name: self.crew(name) for name in self.crew_configs},
+            'tasks': {name: self.task(name) for name in self.task_configs},
+            'agents': {name: self.agent(name) for name in self.agent_configs},
+        }
+
+    def _validate_agent(self, name, recursive):
+        # Check if agent exists
+        if name not in self.agent_configs:
+            return False, f"Agent '{name}' not found"
+
+        # Validate schema
+        agent_config = self.agent_configs[name]
+        message = schema_error('agent', agent_config)
+        if message is not None:
+            return False, f"Agent '{name}' schema validation failed: {message}"
+
+        # If recursive, validate tools
+        if recursive and 'tools' in agent_config:
+            # Imported here as the tool registry pulls in crewai
+            from techies.tools import validate_tool
+
+            errors = []
+            for tool_name in agent_config['tools']:
+                ok, reason = validate_tool(tool_name, recursive=False)
+                if not ok:
+                    errors.append(f"Tool '{tool_name}': {reason}")
+
+            if errors:
+                return False, f"Agent '{name}' uses invalid tools:\n" + "\n".join(errors)
+
+        return True, None
+
+    def _validate_task_schema(self, name):
+        # Check if task exists
+        if name not in self.task_configs:
+            return False, f"Task '{name}' not found"
+
+        # Validate schema
+        message = schema_error('task', self.task_configs[name])
+        if message is not None:
+            return False, f"Task '{name}' schema validation failed: {message}"
+        return True, None
+
+    def _validate_task_as_dependent(self, name):
+        """Validate the task schema and the agent and callback it references."""
+        ok, reason = self._validate_task_schema(name)
+        if not ok:
+            return ok, reason
+
+        task_config = self.task_configs[name]
+
+        # Validate agent
+        agent_name = task_config.get('agent')
+        if agent_name:
+            ok, reason = self.agent(agent_name, recursive=False)
+            if not ok:
+                return False, f"Task '{name}' references invalid agent: {reason}"
+
+        # Validate callback if present
+        callback_id = task_config.get('callback')
+        if callback_id:
+            ok, reason = validate_callback(callback_id, recursive=False)
+            if not ok:
+                return False, f"Task '{name}' references invalid callback: {reason}"
+
+        return True, None
+
+    def _validate_task(self, name, recursive):
+        # For non-recursive validation, just check the schema
+        if not recursive:
+            return self._validate_task_schema(name)
+
+        # For recursive validation, first validate this task as a dependent
+        ok, reason = self._memoized(('dependent', name), lambda: self._validate_task_as_dependent(name))
+        if not ok:
+            return False, reason
+
+        # Get all tasks in dependency tree
+        cycle = self.task_graph.cycle(name)
+        if cycle:
+            return False, f"Dependency validation failed: Cycle detected in graph: {' -> '.join(cycle)}"
+
+        # Validate all dependencies (excluding the task itself which we've already validated)
+        errors = []
+        for dependent_task in self.task_graph.dependencies(name):
+            ok, reason = self._memoized(
+                ('dependent', dependent_task),
+                lambda: self._validate_task_as_dependent(dependent_task)
+            )
+            if not ok:
+                errors.append(f"Dependent task '{dependent_task}': {reason}")
+
+        if errors:
+            return False, f"Task '{name}' has invalid dependencies:\n" + "\n".join(errors)
+
+        return True, None
+
+    def _validate_crew(self, name, recursive):
+        # Check if crew exists
+        if name not in self.crew_configs:
+            return False, f"Crew '{name}' not found"
+
+        # Always validate the schema first
+        crew_config = self.crew_configs[name]
+        message = schema_error('crew', crew_config)
+        if message is not None:
+            return False, f"Crew '{name}' schema validation failed: {message}"
+
+        # If not recursive, just return schema validation result
+        if not recursive:
+            return True, None
+
+        # Collect agent and task errors so a single run reports all of them
+        failures = []
+
+        errors = []
+        for agent_name in crew_config.get('agents', []):
+            ok, reason = self.agent(agent_name, recursive=True)
+            if not ok:
+                errors.append(f"Agent '{agent_name}': {reason}")
+        if errors:
+            failures.append(f"Crew '{name}' has invalid agents:\n" + "\n".join(errors))
+
+        # Check if tasks are in topological order
+        task_names = crew_config.get('tasks', [])
+        if not self.task_graph.is_ordered(list(reversed(task_names))):
+            failures.append(f"Crew '{name}' tasks are not in valid topological order")
+
+        errors = []
+        for task_name in task_names:
+            ok, reason = self.task(task_name, recursive=True)
+            if not ok:
+                errors.append(f"Task '{task_name}': {reason}")
+        if errors:
+            failures.append(f"Crew '{name}' has invalid tasks:\n" + "\n".join(errors))
+
+        if failures:
+            return False, "\n".join(failures)
+
+        return True, None
+
+
+def validate_agent(name, recursive=True):
+    """
+    Validate the agent with the given name.
+    Returns (True, None) on success, (False, 'failure-reason') on failure.
+    """
+    return ConfigValidator().agent(name, recursive=recursive)
+
+
+def validate_task(name, recursive=True):
+    """
+    Validate the task with the given name.
+    If recursive=True, also validates all dependencies.
+
+    Returns (True, None) on success, (False, 'failure-reason') on failure.
+    """
+    return ConfigValidator().task(name, recursive=recursive)
+
+
+def validate_crew(name, recursive=True):
+    """
+    Validate the crew with the given name.
+    If recursive=True, also validates all agents and tasks in the crew.
+
+    Returns (True, None) on success, (False, 'failure-reason') on failure.
+    """
+    return ConfigValidator().crew(name, recursive=recursive)
+
+
+def validate_all():
+    """
+    Validate every crew, task and agent from a single load of the fixtures.
+    See ConfigValidator.all for the result layout.
+    """
+    return ConfigValidator().all()
@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from techies.cli.commands.mechanics import mechanics
+from techies.mechanics.bench import StubEncoder, format_benchmark, parse_mode, run_benchmark, synthetic_corpus
+
+def test_stub_encoder_is_deterministic():
+    encoder = StubEncoder(dimension=16)
+    vectors = encoder.encode(["Double jump in the air", "wall slide"])
+    assert vectors.shape == (2, 16) and vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(StubEncoder(dimension=16).encode("wall slide")[0], vectors[1])
+
+def test_synthetic_corpus():
+    records, vectors = synthetic_corpus(300, dimension=8)
+    assert vectors.shape == (300, 8)
+    assert len(list(records())) == 300
+    assert list(records())[5]['Name'] == "Mechanic 5"
+
+def test_parse_mode():
+    assert parse_mode('int8:sq8') == ('int8', 'sq8')
+    with pytest.raises(ValueError):
+        parse_mode('int4:sq8')
+    with pytest.raises(ValueError):
+        parse_mode('float32:annoy')
+
+def test_run_benchmark(tmp_path):
+    results = run_benchmark(sizes=(400,), modes=[('float32', 'flat'), ('int8', 'sq8')], num_queries=20, k=5, directory=str(tmp_path))
+    json.dumps(results)
+
+    assert results['encoder']['model'] == 'stub'
+    assert set(results['encoder']['encode_ms']) == {'p50', 'p95', 'p99'}
+    assert [corpus['name'] for corpus in results['corpora']] == ['platformer', 'synthetic-400']
+
+    synthetic = results['corpora'][1]
+    assert synthetic['count'] == 400
+    assert synthetic['stores']['int8']['vectors_bytes'] * 4 == synthetic['stores']['float32']['vectors_bytes']
+    flat, sq8 = synthetic['modes']
+    assert flat['recall'] == 1.0
+    assert 0.8 <= sq8['recall'] <= 1.0
+    assert flat['search_ms']['p50'] <= flat['search_ms']['p99']
+    assert sq8['index_bytes'] < flat['index_bytes']
+    assert 'synthetic-400' in format_benchmark(results)
+
+def test_bench_command(tmp_path):
+    output = tmp_path / 'bench.json'
+    result = CliRunner().invoke(mechanics, ['bench', '-n', '200', '--mode', 'float32:hnsw', '--no-bundled', '-q', '10', '-o', str(output)])
+    assert result.exit_code == 0, result.output
+    assert json.loads(output.read_text())['corpora'][0]['modes'][0]['index'] == 'hnsw'
+
+    result = CliRunner().invoke(mechanics, ['bench', '--mode', 'float32'])
+    assert result.exit_code != 0
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from techies.mechanics import embed
+from techies.mechanics.embed import embed_mechanics, entry_hash
+from techies.mechanics.store import open_store, write_store
+
+@pytest.fixture
+def encoded(monkeypatch):
+    """Record the texts and batch sizes encoded, vectors are derived from the text length."""
+    calls = []
+
+    def encode(texts, model_name, batch_size=32):
+        calls.append((list(texts), batch_size))
+        return np.array([[len(text), i, 1.0] for i, text in enumerate(texts)], dtype=np.float32).reshape(len(texts), 3)
+
+    monkeypatch.setattr(embed, 'encode', encode)
+    return calls
+
+def mechanic(name, description="Jump again in mid air", details="Reset the jump counter on landing"):
+    return {'Name': name, 'Description': description, 'Implementation Details': details}
+
+def test_only_new_or_edited_mechanics_are_encoded(tmp_path, encoded):
+    path = str(tmp_path / 'genre.mechdb')
+    mechanics = [mechanic("Double Jump"), mechanic("Coyote Time"), mechanic("Wall Jump")]
+
+    result = embed_mechanics(mechanics, path, model_name='test-model', batch_size=2)
+    assert (result.encoded, result.reused) == (3, 0)
+    assert encoded == [(["Double Jump. Jump again in mid air", "Coyote Time. Jump again in mid air", "Wall Jump. Jump again in mid air"], 2)]
+    first = np.array(open_store(path).vectors)
+
+    # Edit one description and one detail, add one mechanic, reorder the rest
+    edited = [mechanic("Wall Jump"), mechanic("Dash"), mechanic("Double Jump", details="Allow two jumps"), mechanic("Coyote Time", "Jump after leaving a ledge")]
+    result = embed_mechanics(edited, path, model_name='test-model')
+    assert (result.encoded, result.reused) == (2, 2)
+    assert encoded[1][0] == ["Dash. Jump again in mid air", "Coyote Time. Jump after leaving a ledge"]
+
+    store = open_store(path)
+    assert list(store.iter_records()) == edited
+    np.testing.assert_array_equal(store.vectors[0], first[2])
+    np.testing.assert_array_equal(store.vectors[2], first[0])
+    assert [h.decode() for h in store.entry_hashes] == [entry_hash(m, 'test-model') for m in edited]
+
+    # Nothing changed, nothing is encoded and the vectors keep their hash
+    result = embed_mechanics(edited, path, model_name='test-model')
+    assert (result.encoded, result.reused) == (0, 4)
+    assert len(encoded) == 2
+    assert open_store(path).content_hash == store.content_hash
+
+def test_other_model_or_store_without_hashes(tmp_path, encoded):
+    path = str(tmp_path / 'genre.mechdb')
+    mechanics = [mechanic("Double Jump"), mechanic("Coyote Time")]
+
+    # Stores written before hashes existed are matched on their records
+    write_store(path, mechanics, np.ones((2, 3), dtype=np.float32), model='test-model')
+    assert open_store(path).entry_hashes is None
+    result = embed_mechanics(mechanics + [mechanic("Dash")], path, model_name='test-model')
+    assert (result.encoded, result.reused) == (1, 2)
+
+    # Vectors of another model are never reused
+    result = embed_mechanics(mechanics, path, model_name='other-model')
+    assert (result.encoded, result.reused) == (2, 0)
+    assert open_store(path).model == 'other-model'
+
+def test_duplicate_mechanics_are_encoded_once(tmp_path, encoded):
+    result = embed_mechanics([mechanic("Dash"), mechanic("Dash")], str(tmp_path / 'genre.mechdb'), model_name='test-model')
+    assert result.encoded == 1
+    assert encoded[0][0] == ["Dash. Jump again in mid air"]
+    assert len(open_store(result.path)) == 2
+
+def test_int8_codes_are_kept(tmp_path, encoded):
+    path = str(tmp_path / 'genre.mechdb')
+    mechanics = [mechanic("Double Jump"), mechanic("Coyote Time"), mechanic("Wall Jump")]
+    embed_mechanics(mechanics, path, model_name='test-model', dtype='int8')
+    first = open_store(path)
+    codes = np.array(first.codes)
+
+    # The dtype of the store is kept, and the codes of reused vectors while the new one fits the grid
+    embed_mechanics(mechanics + [mechanic("Wall Jumps")], path, model_name='test-model')
+    store = open_store(path)
+    assert store.dtype == 'int8'
+    np.testing.assert_array_equal(store.codes[:3], codes)
+    np.testing.assert_array_equal(store.scales, first.scales)
+
+    # Out of the grid, it grows
+    embed_mechanics(mechanics + [mechanic("Dash")], path, model_name='test-model')
+    store = open_store(path)
+    assert store.scales[0][0] < first.scales[0][0]
+    np.testing.assert_allclose(store.vectors[:3], first.vectors, atol=store.scales[1].max())
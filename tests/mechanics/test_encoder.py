@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from techies.mechanics import encoder
+from techies.mechanics.encoder import get_encoder, encode, is_encoder_loaded, clear_encoders
+
+class FakeEncoder:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        return np.array([[len(text), 1, 2, 3] for text in texts], dtype=np.float64)
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Record model loads, a load takes a while so concurrent callers overlap."""
+    calls = []
+
+    def load(model_name):
+        calls.append(model_name)
+        time.sleep(0.05)
+        return FakeEncoder(model_name)
+
+    monkeypatch.setattr(encoder, '_load_encoder', load)
+    clear_encoders()
+    yield calls
+    clear_encoders()
+
+def test_model_is_loaded_once_per_process(loads):
+    assert not is_encoder_loaded('model-a')
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_encoder('model-a'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ['model-a']
+    assert all(result is results[0] for result in results)
+    assert is_encoder_loaded('model-a')
+
+    get_encoder('model-b')
+    assert loads == ['model-a', 'model-b']
+
+def test_encode_returns_float32_rows(loads):
+    vectors = encode(["ab", "abcd"], model_name='model-a')
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (2, 4)
+    assert vectors[1][0] == 4
+
+    assert encode("abc", model_name='model-a').shape == (1, 4)
+    assert encode([], model_name='model-a').shape == (0, 4)
+    assert loads == ['model-a']
+
+def test_encoder_threads(monkeypatch):
+    monkeypatch.delenv(encoder.ENCODER_THREADS_ENV, raising=False)
+    assert encoder.encoder_threads() is None
+    monkeypatch.setenv(encoder.ENCODER_THREADS_ENV, '2')
+    assert encoder.encoder_threads() == 2
+
+def test_query_cache_is_lru_and_batches_misses(loads, monkeypatch):
+    batches = []
+    real_encode = encoder.encode
+    monkeypatch.setattr(encoder, 'encode', lambda texts, model_name: batches.append(list(texts)) or real_encode(texts, model_name))
+
+    cache = encoder.QueryCache('model-a', maxsize=2)
+    vectors = cache.encode(["double  jump", "dash", "double jump "])
+    assert vectors.shape == (3, 4)
+    assert batches == [["double jump", "dash"]]
+    np.testing.assert_array_equal(vectors[0], vectors[2])
+
+    cache.encode("double jump")
+    cache.encode("wall jump")
+    assert batches[-1] == ["wall jump"]
+    assert len(cache) == 2
+
+    # "dash" was least recently used
+    cache.encode(["double jump", "dash"])
+    assert batches[-1] == ["dash"]
+
+def test_query_cache_persists(loads, tmp_path, monkeypatch):
+    path = str(tmp_path / 'queries.npz')
+    cache = encoder.QueryCache('model-a', path=path)
+    vectors = cache.encode(["dash", "wall jump"])
+
+    # Saved when the process exits, not on every miss
+    assert not os.path.exists(path) and cache.unsaved == 2
+    encoder._save_query_caches()
+    assert cache.unsaved == 0
+
+    monkeypatch.setattr(encoder, 'encode', lambda texts, model_name: pytest.fail("cached queries were encoded"))
+    np.testing.assert_array_equal(encoder.QueryCache('model-a', path=path).encode(["wall jump", "dash"]), vectors[::-1])
+    assert len(encoder.QueryCache('model-b', path=path)) == 0
+
+def test_get_query_cache(loads, tmp_path, monkeypatch):
+    monkeypatch.setenv(encoder.QUERY_CACHE_SIZE_ENV, '3')
+    monkeypatch.setenv(encoder.QUERY_CACHE_DIR_ENV, str(tmp_path))
+    cache = encoder.get_query_cache('org/model-a')
+    assert cache is encoder.get_query_cache('org/model-a')
+    assert cache.maxsize == 3
+    assert cache.path == str(tmp_path / 'org_model-a.npz')
+
+def test_preload_encoder(loads):
+    thread = encoder.preload_encoder('model-a')
+    assert encoder.preload_encoder('model-a') is thread
+    thread.join()
+    assert loads == ['model-a']
+    assert is_encoder_loaded('model-a')
+
+def test_query_cache_is_saved_every_few_misses(loads, tmp_path, monkeypatch):
+    path = str(tmp_path / 'queries.npz')
+    saves = []
+    monkeypatch.setattr(encoder.QueryCache, 'save', lambda self: saves.append(len(self)) or setattr(self, '_unsaved', 0))
+
+    cache = encoder.QueryCache('model-a', path=path, save_every=3)
+    for query in ["dash", "wall jump", "dash", "glide", "roll", "slide"]:
+        cache.encode(query)
+    assert saves == [3]
+    assert cache.unsaved == 2
@@ -0,0 +1,223 @@
+import os
+
+import faiss
+import numpy as np
+import pytest
+
+from techies.mechanics import index as mechanics_index
+from techies.mechanics.index import (
+    load_index,
+    save_index,
+    build_index,
+    index_config,
+    index_meta,
+    read_index_meta,
+    requested_config,
+    compare_indexes,
+    format_report,
+    threshold_search,
+    default_config,
+    IndexConfig,
+    INDEX_FILE,
+    INDEX_TYPES,
+    INDEX_TYPE_ENV,
+    BUILD_PARAMS,
+    SEARCH_PARAMS,
+)
+from techies.mechanics.store import open_store, write_store, export_json
+
+from tests.mechanics.test_store import BUNDLED_DB
+
+def make_store(path, count=20, dimension=8, seed=0):
+    rng = np.random.default_rng(seed)
+    records = [{'Name': f"Mechanic {i}", 'Description': f"Does thing {i}"} for i in range(count)]
+    return open_store(write_store(str(path), records, rng.standard_normal((count, dimension)).astype(np.float32)))
+
+@pytest.fixture
+def count_builds(monkeypatch):
+    builds = []
+    original = mechanics_index.build_index
+
+    def counting_build(store, config=None):
+        builds.append(store.path)
+        return original(store, config)
+
+    monkeypatch.setattr(mechanics_index, 'build_index', counting_build)
+    return builds
+
+def test_index_is_saved_and_reused(tmp_path, count_builds):
+    store = make_store(tmp_path / 'genre.mechdb')
+
+    first = load_index(store)
+    assert count_builds == [store.path]
+    assert os.path.exists(os.path.join(store.path, INDEX_FILE))
+
+    second = load_index(open_store(store.path))
+    assert count_builds == [store.path]
+    assert second.ntotal == 20
+
+    query = np.asarray(store.vectors[3:4])
+    np.testing.assert_array_equal(first.search(query, 5)[1], second.search(query, 5)[1])
+    assert second.search(query, 1)[1][0][0] == 3
+
+def test_index_is_rebuilt_when_vectors_change(tmp_path, count_builds):
+    path = tmp_path / 'genre.mechdb'
+    load_index(make_store(path))
+
+    store = make_store(path, count=30, seed=1)
+    index = load_index(store)
+    assert len(count_builds) == 2
+    assert index.ntotal == 30
+
+    # The rebuilt index was saved, so the next load reads it
+    load_index(open_store(str(path)))
+    assert len(count_builds) == 2
+
+def test_legacy_json_builds_in_memory(tmp_path, count_builds):
+    store = make_store(tmp_path / 'genre.mechdb')
+    legacy = open_store(export_json(store, str(tmp_path / 'genre_embedded.json')))
+
+    assert load_index(legacy).ntotal == 20
+    with pytest.raises(ValueError, match="not a mechanics store directory"):
+        save_index(legacy, build_index(legacy))
+
+def test_corrupt_index_is_rebuilt(tmp_path, count_builds):
+    store = make_store(tmp_path / 'genre.mechdb')
+    load_index(store)
+    with open(os.path.join(store.path, INDEX_FILE), 'wb') as f:
+        f.write(b'not an index')
+
+    assert load_index(store).ntotal == 20
+    assert len(count_builds) == 2
+
+@pytest.mark.parametrize('index_type', INDEX_TYPES)
+def test_index_types_are_saved_with_their_params(tmp_path, count_builds, index_type):
+    store = make_store(tmp_path / 'genre.mechdb', count=400, dimension=16)
+    config = index_config(index_type)
+
+    index = load_index(store, config)
+    assert index.ntotal == 400
+    assert read_index_meta(store)['type'] == index_type
+    assert set(read_index_meta(store)['params']) == set(BUILD_PARAMS[index_type] + SEARCH_PARAMS[index_type])
+
+    # Reused as is, whether asked for explicitly or not
+    load_index(open_store(store.path), config)
+    load_index(open_store(store.path))
+    assert len(count_builds) == 1
+
+    if index_type != 'ivf_pq':
+        assert load_index(store).search(np.asarray(store.vectors[7:8]), 1)[1][0][0] == 7
+
+def test_search_params_do_not_rebuild(tmp_path, count_builds):
+    store = make_store(tmp_path / 'genre.mechdb', count=400, dimension=16)
+    load_index(store, index_config('ivf_flat', nlist=8, nprobe=2))
+
+    index = load_index(store, index_config('ivf_flat', nlist=8, nprobe=5))
+    assert len(count_builds) == 1
+    assert faiss.extract_index_ivf(index).nprobe == 5
+
+    load_index(store, index_config('ivf_flat', nlist=4))
+    assert len(count_builds) == 2
+
+def test_saved_type_is_kept_when_vectors_change(tmp_path, count_builds):
+    path = tmp_path / 'genre.mechdb'
+    load_index(make_store(path, count=100), index_config('hnsw', 'cosine'))
+
+    load_index(make_store(path, count=120, seed=1))
+    assert len(count_builds) == 2
+    assert (read_index_meta(open_store(str(path)))['type'], read_index_meta(open_store(str(path)))['metric']) == ('hnsw', 'cosine')
+
+def test_cosine_metric_ignores_vector_length(tmp_path):
+    store = make_store(tmp_path / 'genre.mechdb')
+    index = load_index(store, index_config('flat', 'cosine'))
+
+    distances, indices = index.search(np.asarray(store.vectors[4:5]) * 10, 1)
+    assert indices[0][0] == 4
+    assert distances[0][0] == pytest.approx(0, abs=1e-5)
+
+def test_small_stores_clamp_params(tmp_path):
+    store = make_store(tmp_path / 'genre.mechdb', count=20, dimension=12)
+    params = index_meta(store, index_config('ivf_pq', nlist=100, nprobe=50, m=16))['params']
+    assert params == {'nlist': 1, 'nprobe': 1, 'm': 12, 'nbits': 4}
+    assert load_index(store, index_config('ivf_pq')).ntotal == 20
+
+    empty = open_store(write_store(str(tmp_path / 'empty.mechdb'), [], np.zeros((0, 12), dtype=np.float32)))
+    assert load_index(empty, index_config('hnsw')).ntotal == 0
+
+def test_index_config_errors(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown index type"):
+        index_config('annoy')
+    with pytest.raises(ValueError, match="Unknown metric"):
+        index_config('flat', 'dot')
+    with pytest.raises(ValueError, match="nprobe"):
+        index_config('hnsw', nprobe=4)
+
+    assert requested_config() is None
+    monkeypatch.setenv(INDEX_TYPE_ENV, 'hnsw')
+    assert requested_config() == IndexConfig('hnsw', 'l2', {})
+
+def test_compare_indexes(tmp_path):
+    store = make_store(tmp_path / 'genre.mechdb', count=300, dimension=16)
+    reports = compare_indexes(store, [index_config('flat'), index_config('hnsw', 'cosine')], k=5, num_queries=20)
+
+    assert [report.config.type for report in reports] == ['flat', 'hnsw']
+    assert reports[0].recall == 1.0
+    assert 0 < reports[1].recall <= 1.0
+    assert 'recall@5' in format_report(reports, k=5)
+
+def test_quantized_indexes_on_bundled_db():
+    store = open_store(os.path.join(BUNDLED_DB, 'platformer_mechanics.mechdb'))
+    flat, fp16, sq8 = compare_indexes(store, [index_config(t) for t in ('flat', 'sq_fp16', 'sq8')], k=10)
+
+    assert fp16.recall >= 0.99
+    assert sq8.recall >= 0.95
+    assert fp16.size_bytes < flat.size_bytes / 1.9
+    assert sq8.size_bytes < flat.size_bytes / 3
+
+def test_quantized_store_gets_matching_index(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    records = [{'Name': f"Mechanic {i}"} for i in range(50)]
+    vectors = rng.standard_normal((50, 8)).astype(np.float32)
+    store = open_store(write_store(str(tmp_path / 'genre.mechdb'), records, vectors, dtype='int8'))
+
+    assert default_config(store).type == 'sq8'
+    assert isinstance(load_index(store), faiss.IndexScalarQuantizer)
+    assert read_index_meta(store)['type'] == 'sq8'
+    # The quantized vectors find themselves
+    assert threshold_search(load_index(store), store.vectors_at([5]), 0.5, 1)[0][0][0] == 5
+
+    monkeypatch.setenv(INDEX_TYPE_ENV, 'hnsw')
+    assert default_config(store).type == 'hnsw'
+
+def test_threshold_search_modes_agree(tmp_path):
+    store = make_store(tmp_path / 'genre.mechdb', count=200, dimension=4)
+    index = load_index(store)
+    queries = np.asarray(store.vectors[:5])
+    distances, _ = index.search(queries, 200)
+    threshold = float(np.median(distances[:, 10]))
+
+    by_range = threshold_search(index, queries, threshold)
+    by_top_k = threshold_search(index, queries, threshold, mode='top_k')
+    assert by_range == by_top_k
+    for row, expected in zip(by_range, distances):
+        assert len(row) == int((expected < threshold).sum())
+        assert all(distance < threshold for _, distance in row)
+        assert [distance for _, distance in row] == sorted(distance for _, distance in row)
+
+    # The cap keeps the closest, the range mode is not truncated to an arbitrary k
+    capped = threshold_search(index, queries, threshold, max_results=3)
+    assert capped == [row[:3] for row in by_range]
+    assert max(len(row) for row in by_range) > 15
+
+def test_threshold_search_ties_and_empty(tmp_path):
+    vectors = np.array([[1, 0], [0, 1], [1, 0], [5, 5]], dtype=np.float32)
+    store = open_store(write_store(str(tmp_path / 'ties.mechdb'), [{'Name': str(i)} for i in range(4)], vectors))
+    index = load_index(store)
+    assert threshold_search(index, np.array([1, 0]), 1.5) == [[(0, 0.0), (2, 0.0)]]
+    assert threshold_search(index, np.array([[1, 0]]), 1.5, max_results=1, mode='top_k') == [[(0, 0.0)]]
+    assert threshold_search(index, np.array([[1, 0]]), 0.0) == [[]]
+
+    empty = open_store(write_store(str(tmp_path / 'empty.mechdb'), [], np.zeros((0, 2), dtype=np.float32)))
+    assert threshold_search(load_index(empty), np.array([[1, 0]]), 1.5) == [[]]
+    with pytest.raises(ValueError, match="search mode"):
+        threshold_search(index, np.array([[1, 0]]), 1.5, mode='knn')
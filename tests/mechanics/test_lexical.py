@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pytest
+
+from techies.mechanics.index import load_index
+from techies.mechanics.lexical import (
+    LexicalIndex,
+    load_lexical_index,
+    reciprocal_rank_fusion,
+    tokenize,
+    LEXICAL_FILE,
+)
+from techies.mechanics.search import search_mechanics
+from techies.mechanics.store import open_store, write_store, export_json
+
+RECORDS = [
+    {'Name': "Double Jump", 'Description': "Jump once more while in the air.", 'Implementation Details': "Count jumps, reset on landing."},
+    {'Name': "Coyote Time", 'Description': "A short grace period to jump after leaving a ledge.", 'Implementation Details': "Keep a timer since the player was grounded."},
+    {'Name': "Wall Slide", 'Description': "Slide slowly down walls.", 'Implementation Details': "Cap the fall speed when touching a wall."},
+    {'Name': "Parallax Background", 'Description': "Background layers scroll at different speeds.", 'Implementation Details': "Scale the scroll factor per layer."},
+]
+
+def make_store(path):
+    # The vectors put Parallax Background closest to every query used below
+    vectors = np.array([[5, 0], [0, 5], [-5, 0], [0.1, 0.1]], dtype=np.float32)
+    return open_store(write_store(str(path), RECORDS, vectors))
+
+def test_bm25_ranks_exact_terms():
+    index = LexicalIndex.from_records(RECORDS)
+    assert tokenize("How to add the Coyote-Time?") == ['add', 'coyote', 'time']
+
+    assert [i for i, _ in index.search("coyote time")] == [1]
+    assert [i for i, _ in index.search("jump")] == [0, 1]
+    assert index.search("jump", limit=1)[0][0] == 0
+    assert index.search("the") == []
+    assert index.search("teleport") == []
+    assert LexicalIndex.from_records([]).search("jump") == []
+
+def test_index_is_saved_with_the_store(tmp_path):
+    store = make_store(tmp_path / 'genre.mechdb')
+    assert os.path.exists(os.path.join(store.path, LEXICAL_FILE))
+
+    saved = load_lexical_index(store)
+    assert saved.terms == LexicalIndex.from_records(RECORDS).terms
+    assert saved.search("wall") == LexicalIndex.from_records(RECORDS).search("wall")
+
+    # Legacy JSON stores build theirs in memory
+    legacy = open_store(export_json(store, str(tmp_path / 'genre_embedded.json')))
+    assert load_lexical_index(legacy).search("wall") == saved.search("wall")
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([[3, 1, 2], [1, 4]])
+    assert [i for i, _ in fused] == [1, 3, 4, 2]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+    assert [i for i, _ in reciprocal_rank_fusion([[3, 1], [1]], weights=[2, 0])] == [3, 1]
+
+def test_hybrid_search(tmp_path):
+    store = make_store(tmp_path / 'genre.mechdb')
+    index, lexical = load_index(store), load_lexical_index(store)
+    query = np.array([[0, 0]], dtype=np.float32)
+
+    vector = search_mechanics(store, index, lexical, ["coyote time"], query, 1.0, 5, retrieval='vector')
+    assert [i for i, _ in vector[0]] == [3]
+
+    hybrid = search_mechanics(store, index, lexical, ["coyote time"], query, 1.0, 5)
+    assert [i for i, _ in hybrid[0]] == [3, 1]
+    # Lexical only matches get their distance to the query too
+    assert hybrid[0][1][1] == pytest.approx(25.0)
+
+    # No query embeddings, e.g. while the model loads
+    lexical_only = search_mechanics(store, index, lexical, ["coyote time", "wall"], None, 1.0, 5)
+    assert lexical_only == [[(1, None)], [(2, None)]]
+
+    with pytest.raises(ValueError, match="retrieval mode"):
+        search_mechanics(store, index, lexical, ["wall"], query, 1.0, 5, retrieval='fuzzy')
@@ -0,0 +1,98 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from techies.mechanics.manifest import (
+    resolve_mechanics_db,
+    update_manifest,
+    find_mechanics_json,
+    read_manifest,
+    MANIFEST_FILE,
+    MECHANICS_DB_ENV,
+)
+from techies.mechanics.store import open_store, write_store, export_json
+
+def make_store(path, count=3):
+    records = [{'Name': f"Mechanic {i}", 'Description': f"Does thing {i}"} for i in range(count)]
+    return open_store(write_store(str(path), records, np.ones((count, 4), dtype=np.float32), model='test-model'))
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    work = tmp_path / 'work'
+    work.mkdir()
+    monkeypatch.chdir(work)
+    monkeypatch.delenv(MECHANICS_DB_ENV, raising=False)
+    monkeypatch.setenv('TECHIES_RUNTIME', str(tmp_path / 'runtime'))
+    return work
+
+def test_manifest_records_stores(workdir):
+    platformer = make_store(workdir / 'platformer_mechanics.mechdb')
+    update_manifest(platformer, source=str(workdir / 'platformer_mechanics.json'))
+    shooter = make_store(workdir / 'shooter_mechanics.mechdb', count=5)
+    path = update_manifest(shooter)
+
+    manifest = read_manifest(path)
+    assert manifest['default'] == 'shooter_mechanics'
+    assert manifest['databases']['platformer_mechanics'] == {
+        'path': 'platformer_mechanics.mechdb',
+        'model': 'test-model',
+        'dimension': 4,
+        'count': 3,
+        'vectors_sha256': platformer.content_hash,
+        'source': 'platformer_mechanics.json',
+    }
+
+    assert resolve_mechanics_db() == str(workdir / 'shooter_mechanics.mechdb')
+    assert resolve_mechanics_db('platformer_mechanics') == str(workdir / 'platformer_mechanics.mechdb')
+    with pytest.raises(ValueError, match="Available: platformer_mechanics, shooter_mechanics"):
+        resolve_mechanics_db('racing_mechanics')
+
+def test_resolution_order(workdir, tmp_path, monkeypatch):
+    runtime = tmp_path / 'runtime'
+    runtime.mkdir()
+    in_runtime = make_store(runtime / 'runtime_mechanics.mechdb')
+    update_manifest(in_runtime)
+
+    # Stores directly in the working directory are only used without any manifest
+    make_store(workdir / 'local_mechanics.mechdb')
+    assert resolve_mechanics_db() == str(runtime / 'runtime_mechanics.mechdb')
+
+    update_manifest(open_store(str(workdir / 'local_mechanics.mechdb')))
+    assert resolve_mechanics_db() == str(workdir / 'local_mechanics.mechdb')
+
+    # Explicit paths and the environment variable win
+    legacy = export_json(in_runtime, str(tmp_path / 'legacy_embedded.json'))
+    assert resolve_mechanics_db(legacy) == legacy
+    assert resolve_mechanics_db(str(runtime)) == str(runtime / 'runtime_mechanics.mechdb')
+    monkeypatch.setenv(MECHANICS_DB_ENV, str(runtime / MANIFEST_FILE))
+    assert resolve_mechanics_db() == str(runtime / 'runtime_mechanics.mechdb')
+
+def test_without_manifest(workdir):
+    assert resolve_mechanics_db() is None
+    with pytest.raises(ValueError, match="no mechanics_index.json"):
+        resolve_mechanics_db('platformer_mechanics')
+
+    # Only the top level of the working directory is looked at
+    nested = workdir / 'node_modules'
+    nested.mkdir()
+    make_store(nested / 'nested.mechdb')
+    assert resolve_mechanics_db() is None
+
+    make_store(workdir / 'b.mechdb')
+    make_store(workdir / 'a.mechdb')
+    assert resolve_mechanics_db() == str(workdir / 'a.mechdb')
+
+def test_stale_manifest_warns(workdir):
+    update_manifest(make_store(workdir / 'genre.mechdb'))
+    make_store(workdir / 'genre.mechdb', count=4)
+    with pytest.warns(UserWarning, match="changed since"):
+        assert resolve_mechanics_db() == str(workdir / 'genre.mechdb')
+
+def test_find_mechanics_json(workdir):
+    assert find_mechanics_json() is None
+    for name, mtime in [('shooter_mechanics.json', 2), ('platformer_mechanics.json', 1), ('notes.json', 3)]:
+        (workdir / name).write_text('[]')
+        os.utime(workdir / name, (mtime, mtime))
+    assert find_mechanics_json() == str(workdir / 'shooter_mechanics.json')
@@ -0,0 +1,51 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from techies.mechanics.search import MechanicResult, mechanic_results, similarity
+
+from tests.mechanics.test_lexical import make_store
+
+TOOL_FILE = os.path.normpath(os.path.join(
+    os.path.dirname(__file__), '../../techies/fixtures/mechanicsgencrew/tools/query_mechanics_tool.py'
+))
+
+@pytest.fixture
+def tool(tmp_path):
+    # Executed like load_custom_tools does
+    exposed_globals = {'__name__': '__tooldefs__', 'BaseTool': BaseTool, 'BaseModel': BaseModel, 'Field': Field, '__file__': TOOL_FILE}
+    with open(TOOL_FILE, 'r') as f:
+        exec(f.read(), exposed_globals)
+    store = make_store(tmp_path / 'genre.mechdb')
+    return exposed_globals['QueryMechanicsTool'](mechanics_db=store.path, retrieval='lexical', use_daemon=False)
+
+def test_mechanic_results():
+    assert similarity(0.5, 2.0) == 0.75
+    assert similarity(3.0, 2.0) == 0.0
+    assert similarity(None, 2.0) is None
+    assert mechanic_results([(3, 1.0), (1, None)], 2.0) == [MechanicResult(3, 1.0, 0.5), MechanicResult(1, None, None)]
+
+def test_concurrent_runs_do_not_share_results(tool):
+    queries = ["coyote time", "wall", "jump", "parallax", "teleport"] * 8
+    expected = {query: tool._run(query=query) for query in set(queries)}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outputs = list(executor.map(lambda query: tool._run(query=query), queries))
+    assert outputs == [expected[query] for query in queries]
+    assert "Name: Wall Slide" in expected["wall"]
+    assert expected["teleport"] == "No relevant game mechanics found for your query."
+
+    # Records are rendered, never annotated
+    assert 'similarity_score' not in tool._mechanics.record(2)
+
+def test_arun_runs_in_executor(tool):
+    async def run_all():
+        return await asyncio.gather(tool._arun(query="wall"), tool._arun(queries=["jump", "coyote time"]))
+
+    single, grouped = asyncio.run(run_all())
+    assert single == tool._run(query="wall")
+    assert grouped.startswith("=== Query 1: jump ===")
@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from techies.mechanics import encoder
+from techies.mechanics.encoder import clear_encoders
+from techies.mechanics.index import load_index
+from techies.mechanics.lexical import load_lexical_index
+from techies.mechanics.search import search_mechanics
+from techies.mechanics.server import MechanicsServer, MechanicsService, connect, default_socket_path
+from techies.mechanics.store import open_store, write_store
+
+from tests.mechanics.test_lexical import RECORDS, make_store
+
+class FakeEncoder:
+    def __init__(self):
+        self.batches = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.batches.append(list(texts))
+        return np.array([[len(text), 0] for text in texts], dtype=np.float32)
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    fake = FakeEncoder()
+    monkeypatch.setattr(encoder, '_load_encoder', lambda model_name: fake)
+    clear_encoders()
+    yield fake
+    clear_encoders()
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to about a hundred characters
+    directory = tempfile.mkdtemp(prefix='techies-')
+    yield os.path.join(directory, 'mechanics.sock')
+    shutil.rmtree(directory)
+
+@pytest.fixture
+def server(socket_path, fake_encoder):
+    server = MechanicsServer(socket_path, MechanicsService(batch_window=0.05))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_search_matches_in_process(tmp_path, server, socket_path, fake_encoder):
+    store = make_store(tmp_path / 'genre.mechdb')
+    client = connect(socket_path)
+    assert client.ping()['pid'] == os.getpid()
+
+    queries = ["coyote time", "wall"]
+    expected = search_mechanics(
+        store, load_index(store), load_lexical_index(store), queries,
+        fake_encoder.encode(queries), 30.0, 3,
+    )
+    assert client.search(store, queries, 30.0, 3) == expected
+    assert client.search(store, ["wall"], 30.0, 3, retrieval='lexical') == [[(2, None)]]
+    client.close()
+
+def test_concurrent_queries_are_encoded_together(tmp_path, server, socket_path, fake_encoder):
+    store = make_store(tmp_path / 'genre.mechdb')
+    fake_encoder.batches.clear()
+
+    results = {}
+    def search(query):
+        client = connect(socket_path)
+        results[query] = client.search(store, [query], 30.0, 3, retrieval='vector')
+        client.close()
+
+    threads = [threading.Thread(target=search, args=(q,)) for q in ("jump", "wall slide", "ledge")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 3
+    assert len(fake_encoder.batches) < 3
+    assert sorted(q for batch in fake_encoder.batches for q in batch) == ["jump", "ledge", "wall slide"]
+
+def test_changed_store_is_reloaded(tmp_path, server, socket_path):
+    path = str(tmp_path / 'genre.mechdb')
+    stale = make_store(path)
+    client = connect(socket_path)
+    assert client.search(stale, ["parallax"], 30.0, 3, retrieval='lexical') == [[(3, None)]]
+
+    # Rewritten by another process, the daemon reloads it
+    vectors = np.array([[5, 0], [0, 5], [-5, 0]], dtype=np.float32)
+    store = open_store(write_store(path, RECORDS[:3], vectors))
+    assert client.search(store, ["parallax"], 30.0, 3, retrieval='lexical') == [[]]
+
+    # A client still holding the previous version must not decode the results
+    with pytest.raises(RuntimeError, match="another version"):
+        client.search(stale, ["wall"], 30.0, 3)
+    client.close()
+
+def test_no_daemon(socket_path):
+    assert connect(socket_path) is None
+
+    # A socket left behind is replaced
+    with open(socket_path, 'w'):
+        pass
+    assert connect(socket_path) is None
+    server = MechanicsServer(socket_path)
+    server.server_close()
+    assert not os.path.exists(socket_path)
+
+def test_one_daemon_per_socket(server, socket_path):
+    with pytest.raises(RuntimeError, match="already listening"):
+        MechanicsServer(socket_path)
+
+def test_sockets_others_can_reach_are_ignored(server, socket_path, monkeypatch):
+    assert oct(os.stat(socket_path).st_mode & 0o777) == '0o600'
+    assert connect(socket_path) is not None
+
+    # Readable by the group, anyone in it could be serving it
+    os.chmod(socket_path, 0o660)
+    assert connect(socket_path) is None
+    os.chmod(socket_path, 0o600)
+
+    # Created by another user
+    uid = os.getuid()
+    monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+    assert connect(socket_path) is None
+
+def test_default_socket_path(monkeypatch):
+    monkeypatch.delenv('TECHIES_MECHANICS_SOCKET', raising=False)
+    monkeypatch.setenv('XDG_RUNTIME_DIR', '/run/user/1000')
+    assert default_socket_path() == '/run/user/1000/techies-mechanics.sock'
+
+    monkeypatch.delenv('XDG_RUNTIME_DIR')
+    assert default_socket_path() == os.path.join(tempfile.gettempdir(), f"techies-{os.getuid()}", 'mechanics.sock')
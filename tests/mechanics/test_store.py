@@ -0,0 +1,130 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from techies.mechanics.store import (
+    open_store,
+    write_store,
+    export_json,
+    convert_json,
+    store_path_for,
+    META_FILE,
+    SCALES_FILE,
+    VECTORS_FILE,
+    VECTOR_DTYPE_ENV,
+)
+
+BUNDLED_DB = os.path.normpath(os.path.join(
+    os.path.dirname(__file__), '../../techies/fixtures/mechanicsgencrew/refs/mechanics_db'
+))
+
+def make_mechanics(count, dimension=8):
+    rng = np.random.default_rng(0)
+    records = [
+        {'Name': f"Mechanic {i}", 'Description': f"Does thing {i} ünïcode", 'Related Mechanics': [f"Mechanic {i - 1}"]}
+        for i in range(count)
+    ]
+    return records, rng.standard_normal((count, dimension)).astype(np.float32)
+
+def test_write_and_open_store(tmp_path):
+    records, vectors = make_mechanics(5)
+    path = write_store(str(tmp_path / 'genre.mechdb'), records, vectors, model='test-model')
+
+    store = open_store(path)
+    assert len(store) == 5
+    assert store.dimension == 8
+    assert store.model == 'test-model'
+    assert isinstance(store.vectors, np.memmap)
+    assert not store.vectors.flags.writeable
+    np.testing.assert_array_equal(store.vectors, vectors)
+    assert store.record(3) == records[3]
+    assert list(store.iter_records()) == records
+
+    # Records are decoded into new dicts, callers may modify them freely
+    store.record(0)['similarity_score'] = 1.0
+    assert 'similarity_score' not in store.record(0)
+
+@pytest.mark.parametrize('dtype,ratio,tolerance', [('float16', 2, 1e-2), ('int8', 4, 5e-2)])
+def test_quantized_vectors(tmp_path, dtype, ratio, tolerance):
+    records, vectors = make_mechanics(200, dimension=32)
+    full = open_store(write_store(str(tmp_path / 'full.mechdb'), records, vectors))
+    store = open_store(write_store(str(tmp_path / 'small.mechdb'), records, vectors, dtype=dtype))
+
+    assert store.dtype == dtype
+    size = os.path.getsize(os.path.join(store.path, VECTORS_FILE))
+    assert size < os.path.getsize(os.path.join(full.path, VECTORS_FILE)) / ratio + 200
+
+    decoded = store.vectors
+    assert decoded.dtype == np.float32
+    assert np.abs(decoded - vectors).max() < tolerance * np.abs(vectors).max()
+    np.testing.assert_array_equal(store.vectors_at([7, 3]), decoded[[7, 3]])
+    assert store.content_hash != full.content_hash
+
+    # Rewritten as float32, the int8 scales go away
+    write_store(store.path, records, vectors)
+    assert open_store(store.path).dtype == 'float32'
+    assert not os.path.exists(os.path.join(store.path, SCALES_FILE))
+
+def test_vector_dtype_from_environment(tmp_path, monkeypatch):
+    records, vectors = make_mechanics(3)
+    monkeypatch.setenv(VECTOR_DTYPE_ENV, 'float16')
+    assert open_store(write_store(str(tmp_path / 'genre.mechdb'), records, vectors)).dtype == 'float16'
+
+    with pytest.raises(ValueError, match="vector dtype"):
+        write_store(str(tmp_path / 'genre.mechdb'), records, vectors, dtype='int4')
+
+def test_empty_store(tmp_path):
+    path = write_store(str(tmp_path / 'empty.mechdb'), [], np.zeros((0, 4), dtype=np.float32))
+    store = open_store(path)
+    assert len(store) == 0
+    assert list(store.iter_records()) == []
+
+def test_rewriting_replaces_store(tmp_path):
+    path = str(tmp_path / 'genre.mechdb')
+    write_store(path, *make_mechanics(5))
+    records, vectors = make_mechanics(2)
+    write_store(path, records, vectors)
+
+    store = open_store(path)
+    assert len(store) == 2
+    assert sorted(os.listdir(path)) == ['lexical.npz', 'meta.json', 'offsets.npy', 'records.jsonl', 'vectors.npy']
+
+def test_mismatched_records_and_vectors(tmp_path):
+    records, vectors = make_mechanics(3)
+    path = str(tmp_path / 'genre.mechdb')
+    with pytest.raises(ValueError, match="Got 3 records for 2 vectors"):
+        write_store(path, records, vectors[:2])
+    # No meta.json, so the broken store is never opened
+    assert not os.path.exists(os.path.join(path, META_FILE))
+    with pytest.raises(ValueError, match="not a mechanics store"):
+        open_store(path)
+
+def test_json_round_trip(tmp_path):
+    records, vectors = make_mechanics(4)
+    store = open_store(write_store(str(tmp_path / 'genre.mechdb'), records, vectors))
+
+    exported = export_json(store, str(tmp_path / 'genre_mechanics_embedded.json'))
+    with open(exported) as f:
+        assert json.load(f)[1]['embedding'] == vectors[1].tolist()
+
+    converted = open_store(convert_json(exported))
+    assert converted.path == str(tmp_path / 'genre_mechanics.mechdb')
+    np.testing.assert_array_equal(converted.vectors, vectors)
+    assert converted.record(2) == records[2]
+
+    # Legacy files can be opened directly
+    legacy = open_store(exported)
+    assert legacy.record(2) == records[2]
+
+def test_store_path_for():
+    assert store_path_for('db/platformer_mechanics.json') == 'db/platformer_mechanics.mechdb'
+    assert store_path_for('db/platformer_mechanics_embedded.json') == 'db/platformer_mechanics.mechdb'
+
+def test_bundled_store_matches_embedded_json():
+    store = open_store(os.path.join(BUNDLED_DB, 'platformer_mechanics.mechdb'))
+    legacy = open_store(os.path.join(BUNDLED_DB, 'platformer_mechanics_embedded.json'))
+    assert len(store) == len(legacy) == 48
+    np.testing.assert_array_equal(store.vectors, legacy.vectors)
+    assert list(store.iter_records()) == list(legacy.iter_records())
@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Wall-clock budget (seconds) for importing the CLI and running a listing command.
+# Timing is noisy on shared machines, so the budget is only checked when set.
+IMPORT_BUDGET = os.environ.get("TECHIES_CLI_IMPORT_BUDGET")
+
+PROBE = """\
+import json, sys, time
+start = time.perf_counter()
+from techies.cli.main import cli
+try:
+    cli(sys.argv[1:], obj={}, standalone_mode=False)
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in ("crewai", "pydantic", "litellm") if m in sys.modules)
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+def run_probe(*args):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("args", [
+    ("list", "crews"),
+    ("list", "agents"),
+    ("list", "tasks"),
+    ("list", "game_specs"),
+    ("get-runtime-path",),
+    ("check", "crew", "hierarchy_crew", "--no-recursive"),
+])
+def test_fixture_only_commands_do_not_import_crewai(args):
+    probe = run_probe(*args)
+    assert probe["heavy"] == [], f"'techies {' '.join(args)}' imported {probe['heavy']}"
+
+@pytest.mark.skipif(not IMPORT_BUDGET, reason="set TECHIES_CLI_IMPORT_BUDGET (seconds) to check the startup time")
+def test_listing_command_within_import_budget():
+    # Best of three, so a cold disk cache on the first run does not fail the budget
+    elapsed = min(run_probe("list", "crews")["elapsed"] for _ in range(3))
+    budget = float(IMPORT_BUDGET)
+    assert elapsed < budget, f"'techies list crews' took {elapsed:.3f}s (budget {budget}s)"
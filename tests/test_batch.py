@@ -0,0 +1,71 @@
+import os
+import threading
+import pytest
+
+from techies import batch
+from techies.batch import resolve_game_specs, run_batch, format_summary
+
+@pytest.fixture
+def fake_kickoff(monkeypatch):
+    """Replace the crew run with one writing its inputs to the working directory."""
+    def kickoff(crewname, game=None, gamefiles=None):
+        print(f"running {crewname}")
+        if game == 'wordle':
+            raise RuntimeError("model unavailable")
+        with open('output.txt', 'w') as f:
+            f.write(f"{crewname} {game} {gamefiles} {os.getpid()}")
+
+    monkeypatch.setattr(batch, '_kickoff', kickoff)
+    monkeypatch.setattr(batch, 'warm_up', lambda: None)
+    monkeypatch.setattr(batch, '_init_worker', lambda: None)
+    # Workers only see these fakes when forked
+    monkeypatch.setattr(batch, '_start_method', lambda: 'fork')
+
+def test_resolve_game_specs(tmp_path):
+    spec_file = tmp_path / 'mygame.txt'
+    spec_file.write_text("A game")
+
+    resolved = resolve_game_specs(['numseq', str(spec_file), 'numseq'])
+    assert resolved == [
+        ('numseq', {'game': 'numseq'}),
+        ('mygame', {'gamefiles': str(spec_file)}),
+        ('numseq-2', {'game': 'numseq'}),
+    ]
+
+    with pytest.raises(ValueError, match="neither a file nor a predefined game spec"):
+        resolve_game_specs(['no_such_game'])
+
+@pytest.mark.parametrize("parallelism", [1, 2])
+def test_run_batch_gives_each_run_its_own_directory(tmp_path, fake_kickoff, parallelism):
+    cwd = os.getcwd()
+    results = run_batch('hierarchy_crew', ['numseq', 'boggle', 'wordle'], output_root=str(tmp_path), parallelism=parallelism)
+
+    assert os.getcwd() == cwd
+    assert [result.label for result in results] == ['numseq', 'boggle', 'wordle']
+    assert [result.ok for result in results] == [True, True, False]
+    assert results[2].error == "RuntimeError: model unavailable"
+
+    for label in ('numseq', 'boggle'):
+        output = (tmp_path / label / 'output.txt').read_text()
+        assert output.startswith(f"hierarchy_crew {label} None")
+        assert (tmp_path / label / 'run.log').read_text() == "running hierarchy_crew\n"
+
+    summary = format_summary(results)
+    assert "3 run(s), 1 failed" in summary
+
+def test_run_batch_rejects_unknown_crew(tmp_path, fake_kickoff):
+    with pytest.raises(ValueError, match="Crew 'no_such_crew' not found"):
+        run_batch('no_such_crew', ['numseq'], output_root=str(tmp_path))
+
+def test_no_fork_with_live_threads():
+    if threading.active_count() == 1 and 'fork' in batch.multiprocessing.get_all_start_methods():
+        assert batch._start_method() == 'fork'
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        assert batch._start_method() in ('forkserver', 'spawn')
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,124 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from techies.crew import Crew
+
+def make_task(name, agent, context=()):
+    return SimpleNamespace(name=name, agent=agent, context=list(context), output=None)
+
+@pytest.fixture
+def dag_crew(monkeypatch):
+    """A dag crew whose tasks sleep instead of calling an LLM, recording what ran concurrently."""
+    log = {'started': [], 'contexts': {}, 'peak': 0}
+    running = []
+    lock = threading.Lock()
+
+    def execute(self, task, dependency_outputs, agent_lock):
+        with agent_lock:
+            with lock:
+                log['started'].append(task.name)
+                log['contexts'][task.name] = list(dependency_outputs)
+                running.append(task.name)
+                log['peak'] = max(log['peak'], len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(task.name)
+            task.output = f"{task.name}-output"
+            return task.output
+
+    monkeypatch.setattr(Crew, '_execute_dag_task', execute)
+    monkeypatch.setattr(Crew, '_process_task_result', lambda self, task, output: None)
+    monkeypatch.setattr(Crew, '_store_execution_log', lambda self, task, output, index: None)
+    monkeypatch.setattr(Crew, '_create_crew_output', lambda self, outputs: outputs)
+
+    def build(tasks, max_concurrency=4):
+        crew = Crew.model_construct(tasks=tasks, dag_process=True, max_concurrency=max_concurrency)
+        return crew, log
+
+    return build
+
+def test_independent_branches_run_concurrently(dag_crew):
+    agents = [object() for _ in range(3)]
+    root = make_task('root', agents[0])
+    left = make_task('left', agents[1], [root])
+    right = make_task('right', agents[2], [root])
+    join = make_task('join', agents[0], [left, right])
+    crew, log = dag_crew([root, left, right, join])
+
+    start = time.perf_counter()
+    outputs = crew._run_sequential_process()
+    elapsed = time.perf_counter() - start
+
+    # Outputs follow the declared task order
+    assert outputs == ['root-output', 'left-output', 'right-output', 'join-output']
+    assert log['started'][0] == 'root' and log['started'][-1] == 'join'
+    assert log['contexts']['join'] == ['left-output', 'right-output']
+    assert log['peak'] == 2
+    # Critical path of three tasks rather than four
+    assert elapsed < 0.18
+
+def test_max_concurrency_and_shared_agents(dag_crew):
+    shared = object()
+    tasks = [make_task(f't{i}', object()) for i in range(4)] + [make_task('s1', shared), make_task('s2', shared)]
+    crew, log = dag_crew(tasks[:4], max_concurrency=2)
+    crew._run_sequential_process()
+    assert log['peak'] == 2
+
+    crew, log = dag_crew(tasks[4:])
+    log['peak'] = 0
+    crew._run_sequential_process()
+    assert log['peak'] == 1
+
+def test_cycle_is_rejected_before_running(dag_crew):
+    agent = object()
+    first = make_task('first', agent)
+    second = make_task('second', agent, [first])
+    first.context.append(second)
+    crew, log = dag_crew([first, second])
+
+    with pytest.raises(ValueError, match="Cycle detected"):
+        crew._run_sequential_process()
+    assert log['started'] == []
+
+def test_async_and_conditional_tasks_are_rejected(dag_crew):
+    from crewai import Task
+    from crewai.tasks.conditional_task import ConditionalTask
+
+    conditional = ConditionalTask(description="Polish", expected_output="Text", condition=lambda output: True)
+    crew, log = dag_crew([make_task('first', object()), conditional])
+    with pytest.raises(ValueError, match="ConditionalTask"):
+        crew._run_sequential_process()
+
+    crew, log = dag_crew([Task(description="Draft", expected_output="Text", async_execution=True)])
+    with pytest.raises(ValueError, match="async_execution"):
+        crew._run_sequential_process()
+    assert log['started'] == []
+
+def test_runs_crewai_tasks(monkeypatch):
+    """Only the LLM call is replaced, context and outputs go through crewai."""
+    from crewai import Agent, Task
+    from crewai.tasks.task_output import TaskOutput
+
+    contexts = {}
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        contexts[self.description] = context
+        self.output = TaskOutput(description=self.description, raw=f"{self.description} done", agent=agent.role)
+        return self.output
+
+    monkeypatch.setattr(Task, 'execute_sync', execute_sync)
+    writer = Agent(role='writer', goal='Write', backstory='A writer', llm='gpt-4o-mini')
+    editor = Agent(role='editor', goal='Edit', backstory='An editor', llm='gpt-4o-mini')
+    draft = Task(description="Draft", expected_output="Text", agent=writer)
+    outline = Task(description="Outline", expected_output="Text", agent=editor)
+    final = Task(description="Final", expected_output="Text", agent=writer, context=[draft, outline])
+    crew = Crew.model_construct(agents=[writer, editor], tasks=[draft, outline, final], dag_process=True, max_concurrency=2)
+
+    output = crew._run_sequential_process()
+    assert [task_output.raw for task_output in output.tasks_output] == ["Draft done", "Outline done", "Final done"]
+    assert output.raw == "Final done"
+    assert contexts["Draft"] == "" and contexts["Outline"] == ""
+    assert "Draft done" in contexts["Final"] and "Outline done" in contexts["Final"]
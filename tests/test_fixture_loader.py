@@ -0,0 +1,205 @@
+import os
+import pytest
+import yaml
+
+from techies import fixture_loader
+from techies.fixture_loader import (
+    load_fixture,
+    clear_fixture_cache,
+    rebuild_fixture_snapshots,
+    clear_fixture_snapshots
+)
+
+AGENTS_YML = """\
+_common: &common
+  verbose: true
+
+writer:
+  <<: *common
+  goal: Write things
+  backstory: A writer
+"""
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """Point TECHIES_RUNTIME and the snapshot cache at isolated directories with a fresh registry."""
+    runtime_dir = tmp_path / 'runtime'
+    runtime_dir.mkdir()
+    monkeypatch.setenv('TECHIES_RUNTIME', str(runtime_dir))
+    monkeypatch.setenv('TECHIES_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.delenv('TECHIES_FIXTURE_CACHE', raising=False)
+    clear_fixture_cache()
+    yield runtime_dir
+    clear_fixture_cache()
+
+@pytest.fixture
+def count_yaml_loads(monkeypatch):
+    calls = []
+    original_load = yaml.load
+
+    def counting_load(stream, Loader):
+        calls.append(getattr(stream, 'name', None))
+        return original_load(stream, Loader=Loader)
+
+    monkeypatch.setattr(fixture_loader.yaml, 'load', counting_load)
+    return calls
+
+def test_load_fixture_merges_and_skips_private_keys(runtime):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+
+    agents = load_fixture('agents')
+    assert list(agents.keys()) == ['writer']
+    assert agents['writer']['verbose'] is True
+
+    locations = load_fixture('agents', result="locations")
+    assert locations['writer'] == os.path.join(os.path.realpath(runtime), 'agents.yml')
+
+def test_load_fixture_parses_each_file_once(runtime, count_yaml_loads):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+
+    for _ in range(10):
+        load_fixture('agents')
+        load_fixture('agents', result="locations")
+
+    assert len(count_yaml_loads) == 1
+
+def test_load_fixture_rereads_changed_files(runtime, count_yaml_loads):
+    agents_file = runtime / 'agents.yml'
+    agents_file.write_text(AGENTS_YML)
+    assert 'editor' not in load_fixture('agents')
+
+    agents_file.write_text(AGENTS_YML + "\neditor:\n  goal: Edit\n  backstory: An editor\n")
+    stat = agents_file.stat()
+    os.utime(agents_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert 'editor' in load_fixture('agents')
+    assert len(count_yaml_loads) == 2
+
+def test_fixture_files_are_found_once(runtime, monkeypatch):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+    listed = []
+    runtimedirs = fixture_loader.runtimedirs
+    monkeypatch.setattr(fixture_loader, 'runtimedirs', lambda: listed.append(1) or runtimedirs())
+
+    for _ in range(10):
+        load_fixture('agents')
+    assert len(listed) == 1
+
+    # New directories and files are found right away
+    (runtime / 'crew').mkdir()
+    assert 'editor' not in load_fixture('agents')
+    (runtime / 'crew' / 'agents.yml').write_text("editor:\n  goal: Edit\n")
+    assert 'editor' in load_fixture('agents')
+    assert len(listed) == 3
+
+    os.remove(runtime / 'crew' / 'agents.yml')
+    assert 'editor' not in load_fixture('agents')
+
+def test_load_fixture_returns_read_only_view(runtime):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+
+    agents = load_fixture('agents')
+    with pytest.raises(TypeError):
+        agents['intruder'] = {}
+
+    # Copies of an entry can be mutated freely without touching the registry
+    writer = dict(agents['writer'])
+    writer['goal'] = 'Something else'
+    assert load_fixture('agents')['writer']['goal'] == 'Write things'
+
+def test_snapshot_is_reused_across_processes(runtime, count_yaml_loads):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+    load_fixture('agents')
+    assert len(count_yaml_loads) == 1
+
+    # A new process starts with an empty registry but an existing snapshot
+    clear_fixture_cache()
+    agents = load_fixture('agents')
+    assert agents['writer']['goal'] == 'Write things'
+    assert len(count_yaml_loads) == 1
+
+def test_snapshot_is_rebuilt_when_content_changes(runtime, count_yaml_loads):
+    agents_file = runtime / 'agents.yml'
+    agents_file.write_text(AGENTS_YML)
+    load_fixture('agents')
+
+    clear_fixture_cache()
+    agents_file.write_text(AGENTS_YML.replace('Write things', 'Write more things'))
+    assert load_fixture('agents')['writer']['goal'] == 'Write more things'
+    assert len(count_yaml_loads) == 2
+
+def test_snapshot_replays_conflict_warnings(runtime):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+    (runtime / 'crew').mkdir()
+    (runtime / 'crew' / 'agents.yml').write_text(AGENTS_YML)
+
+    with pytest.warns(UserWarning, match="writer is defined multiple times"):
+        load_fixture('agents')
+
+    clear_fixture_cache()
+    with pytest.warns(UserWarning, match="writer is defined multiple times"):
+        load_fixture('agents')
+
+def test_snapshot_key_is_hashed_once_per_miss(runtime, monkeypatch):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+    calls = []
+    snapshot_path = fixture_loader._snapshot_path
+
+    def counting_snapshot_path(fixture_name, filenames):
+        calls.append(fixture_name)
+        return snapshot_path(fixture_name, filenames)
+
+    monkeypatch.setattr(fixture_loader, '_snapshot_path', counting_snapshot_path)
+    load_fixture('agents')
+    assert calls == ['agents']
+
+def test_snapshot_is_ignored_in_a_shared_directory(runtime, count_yaml_loads):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+    load_fixture('agents')
+    cache_dir = os.environ['TECHIES_CACHE_DIR']
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+    # Anyone in the group could have replaced the pickle
+    os.chmod(cache_dir, 0o770)
+    clear_fixture_cache()
+    assert load_fixture('agents')['writer']['goal'] == 'Write things'
+    assert len(count_yaml_loads) == 2
+
+    # Rewriting the snapshot made the directory private again
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+    clear_fixture_cache()
+    load_fixture('agents')
+    assert len(count_yaml_loads) == 2
+
+def test_rebuild_and_clear_snapshots(runtime, monkeypatch):
+    (runtime / 'agents.yml').write_text(AGENTS_YML)
+
+    rebuilt = rebuild_fixture_snapshots(['agents'])
+    assert os.path.isfile(rebuilt['agents'])
+    assert clear_fixture_snapshots() == 1
+    assert not os.path.exists(rebuilt['agents'])
+
+    monkeypatch.setenv('TECHIES_FIXTURE_CACHE', '0')
+    assert rebuild_fixture_snapshots(['agents']) == {'agents': None}
+    assert clear_fixture_snapshots() == 0
+
+def test_later_runtime_directories_take_precedence(runtime):
+    for crew_dir, goal in [('b_crew', 'From b'), ('a_crew', 'From a')]:
+        (runtime / crew_dir).mkdir()
+        (runtime / crew_dir / 'agents.yml').write_text(AGENTS_YML.replace('Write things', goal))
+
+    with pytest.warns(UserWarning, match="writer is defined multiple times"):
+        agents = load_fixture('agents')
+
+    assert agents['writer']['goal'] == 'From b'
+    assert load_fixture('agents', result="locations")['writer'].endswith(os.path.join('b_crew', 'agents.yml'))
+
+def test_parses_many_files_concurrently_in_order(runtime, count_yaml_loads):
+    for i in range(20):
+        crew_dir = runtime / f"crew_{i:02d}"
+        crew_dir.mkdir()
+        (crew_dir / 'tasks.yml').write_text(f"task_{i:02d}:\n  agent: writer\n  description: Task {i}\n")
+
+    tasks = load_fixture('tasks')
+    assert list(tasks.keys()) == [f"task_{i:02d}" for i in range(20)]
+    assert len(count_yaml_loads) == 20
@@ -1,5 +1,6 @@
 import pytest
-from techies.utils import topology_sort_partial, is_topology_ordered
+import sys
+from techies.utils import topology_sort_partial, is_topology_ordered, LazyPool, TaskGraph
 
 def test_topology_sort_basic():
     """Test basic functionality with a simple directed acyclic graph."""
@@ -99,6 +100,49 @@ def test_topology_sort_complex():
     assert result.index("E") < result.index("G")
     assert result.index("F") < result.index("H")
 
+def test_topology_sort_deep_chain():
+    """A dependency chain deeper than the recursion limit."""
+    depth = sys.getrecursionlimit() * 2
+    vertices = [f"T{i}" for i in range(depth)]
+    edges = [(f"T{i}", f"T{i + 1}") for i in range(depth - 1)]
+
+    result = topology_sort_partial(vertices, edges, "T0")
+    assert result == vertices
+
+def test_topology_sort_cycle_reports_cycle_path():
+    vertices = ["A", "B", "C", "D"]
+    edges = [("A", "B"), ("B", "C"), ("C", "D"), ("D", "B")]
+
+    with pytest.raises(ValueError) as excinfo:
+        topology_sort_partial(vertices, edges, "A")
+    assert str(excinfo.value) == "Cycle detected in graph: B -> C -> D -> B"
+
+def test_task_graph_queries():
+    vertices = ["A", "B", "C", "D", "E", "X", "Y"]
+    edges = [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D"), ("D", "E"), ("X", "Y"), ("Y", "X"), ("E", "missing")]
+    graph = TaskGraph(vertices, edges)
+
+    assert "A" in graph and "missing" not in graph
+    dependencies = graph.dependencies("A")
+    assert set(dependencies) == {"B", "C", "D", "E", "missing"}
+    assert dependencies.index("B") < dependencies.index("D") < dependencies.index("E")
+    assert graph.dependencies("E") == ["missing"]
+    assert graph.depends_on("A", "E") and not graph.depends_on("E", "A")
+
+    # Decoded once, the result is a fresh list for every query
+    dependencies.append("Z")
+    assert graph.dependencies("A") == dependencies[:-1]
+    assert graph.dependencies("X") == ["Y"] and graph.dependencies("Y") == ["X"]
+
+    assert graph.cycle("A") is None
+    assert graph.cycle("X") in (["X", "Y", "X"], ["Y", "X", "Y"])
+
+    order = graph.topological_order()
+    assert all(order.index(f) < order.index(t) for f, t in edges if f not in ("X", "Y"))
+
+    for array in (["A", "B", "D"], ["D", "B", "A"], ["C", "A"], []):
+        assert graph.is_ordered(array) == is_topology_ordered(edges, array)
+
 def test_is_topology_ordered_valid():
     """Test is_topology_ordered with valid topological orderings."""
     # Simple linear case
@@ -152,4 +196,54 @@ def test_is_topology_ordered_edge_cases():
     # Extra vertices in array
     edges = [("A", "B")]
     array = ["X", "A", "B", "Y"]  # Contains vertices not in the edges
-    assert is_topology_ordered(edges, array) is True 
\ No newline at end of file
+    assert is_topology_ordered(edges, array) is True
+
+def test_lazy_pool_builds_on_first_access():
+    """Test that LazyPool only builds the instances that are looked up."""
+    built = []
+
+    def build(name):
+        built.append(name)
+        return name.upper()
+
+    pool = LazyPool(["a", "b", "c"], build)
+    assert len(pool) == 3
+    assert "b" in pool
+    assert built == []
+
+    assert pool["b"] == "B"
+    assert pool.get("b") == "B"
+    assert pool.get("x") is None
+    assert built == ["b"]
+    assert pool.materialized() == {"b": "B"}
+
+def test_lazy_pool_resolves_dependencies_recursively():
+    """Test that factories can pull dependencies from the same pool and register themselves."""
+    depends_on = {"a": ["b"], "b": ["c"], "c": [], "unused": []}
+
+    def build(name):
+        instance = (name, [pool[dep] for dep in depends_on[name]])
+        pool[name] = instance
+        return instance
+
+    pool = LazyPool(depends_on.keys(), build)
+    a = pool["a"]
+    assert a[1][0] is pool["b"]
+    assert set(pool.materialized()) == {"a", "b", "c"}
+
+def test_lazy_pool_cycle():
+    """Test that a dependency cycle raises instead of recursing forever."""
+    depends_on = {"a": ["b"], "b": ["a"]}
+    pool = LazyPool(depends_on.keys(), lambda name: [pool[dep] for dep in depends_on[name]])
+
+    with pytest.raises(ValueError) as excinfo:
+        pool["a"]
+    assert "Cycle detected" in str(excinfo.value)
+
+
+def test_lazy_pool_get_does_not_hide_factory_errors():
+    """Test that a KeyError raised while building is not turned into the default value."""
+    pool = LazyPool(["a"], lambda name: {}["missing"])
+
+    with pytest.raises(KeyError):
+        pool.get("a")
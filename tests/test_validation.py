@@ -0,0 +1,122 @@
+import pytest
+
+from techies.fixture_loader import clear_fixture_cache
+from techies.validation import ConfigValidator, validate_all, validate_crew, validate_task
+
+AGENTS_YML = """\
+writer:
+  goal: Write things
+  backstory: A writer
+  tools: []
+"""
+
+TASKS_YML = """\
+outline:
+  agent: writer
+  description: Outline the story
+
+draft:
+  agent: writer
+  description: Draft the story
+  depends_on: outline
+
+review:
+  agent: ghost
+  description: Review the draft
+  depends_on: [draft]
+
+loop_a:
+  agent: writer
+  description: First half of a cycle
+  depends_on: loop_b
+
+loop_b:
+  agent: writer
+  description: Second half of a cycle
+  depends_on: loop_a
+
+after_loop:
+  agent: writer
+  description: Depends on a cycle
+  depends_on: loop_a
+"""
+
+CREWS_YML = """\
+story_crew:
+  agents: [writer]
+  tasks: [outline, draft]
+
+broken_crew:
+  agents: [writer, ghost]
+  tasks: [draft, review, outline]
+"""
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """Isolated runtime with a small set of agents, tasks and crews."""
+    runtime_dir = tmp_path / 'runtime'
+    runtime_dir.mkdir()
+    (runtime_dir / 'agents.yml').write_text(AGENTS_YML)
+    (runtime_dir / 'tasks.yml').write_text(TASKS_YML)
+    (runtime_dir / 'crews.yml').write_text(CREWS_YML)
+    monkeypatch.setenv('TECHIES_RUNTIME', str(runtime_dir))
+    monkeypatch.setenv('TECHIES_FIXTURE_CACHE', '0')
+    clear_fixture_cache()
+    yield runtime_dir
+    clear_fixture_cache()
+
+def test_validate_all_reports_every_configuration(runtime):
+    results = validate_all()
+
+    assert set(results) == {'crews', 'tasks', 'agents'}
+    assert results['crews']['story_crew'] == (True, None)
+    assert results['tasks']['draft'] == (True, None)
+    assert results['agents']['writer'] == (True, None)
+
+    ok, reason = results['crews']['broken_crew']
+    assert not ok
+    # Agent, ordering and task errors are reported together
+    assert "Agent 'ghost' not found" in reason
+    assert "not in valid topological order" in reason
+    assert "Task 'review' references invalid agent" in reason
+
+def test_dependency_errors_list_the_failing_dependency(runtime):
+    (runtime / 'tasks.yml').write_text(TASKS_YML + """
+final:
+  agent: writer
+  description: Publish
+  depends_on: review
+""")
+    ok, reason = validate_task('final')
+    assert not ok
+    assert reason.startswith("Task 'final' has invalid dependencies:")
+    assert "Dependent task 'review'" in reason
+    assert "Dependent task 'outline'" not in reason
+
+def test_cycles_report_the_cycle_path(runtime):
+    for name in ('loop_a', 'loop_b', 'after_loop'):
+        ok, reason = validate_task(name)
+        assert not ok
+        assert reason.startswith("Dependency validation failed: Cycle detected in graph:")
+        assert "loop_a" in reason and "loop_b" in reason
+
+def test_missing_and_invalid_entries(runtime):
+    assert validate_crew('nope') == (False, "Crew 'nope' not found")
+
+    (runtime / 'crews.yml').write_text(CREWS_YML + "bad_crew:\n  agents: writer\n  tasks: []\n")
+    ok, reason = validate_crew('bad_crew')
+    assert not ok
+    assert reason.startswith("Crew 'bad_crew' schema validation failed:")
+
+def test_validator_checks_each_dependency_once(runtime, monkeypatch):
+    validator = ConfigValidator()
+    calls = []
+    original = validator._validate_task_as_dependent
+
+    def counting(name):
+        calls.append(name)
+        return original(name)
+
+    monkeypatch.setattr(validator, '_validate_task_as_dependent', counting)
+    validator.all()
+    assert sorted(calls) == sorted(set(calls))
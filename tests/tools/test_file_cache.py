@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from techies.predefined_tools import file_cache, read_file_tool
+from techies.predefined_tools.file_cache import FileCache, get_file_cache
+from techies.predefined_tools.read_file_tool import ReadFileTool
+from techies.predefined_tools.batch_read_files_tool import BatchReadFilesTool
+from techies.predefined_tools.write_file_tool import WriteFileTool
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FileCache()
+    monkeypatch.setattr(file_cache, '_file_cache', cache)
+    return cache
+
+def test_unchanged_files_are_read_once(tmp_path):
+    cache = FileCache()
+    path = tmp_path / 'game.html'
+    path.write_text("<html></html>")
+
+    assert cache.read(str(path)) == "<html></html>"
+    assert cache.read(str(tmp_path / '.' / 'game.html')) == "<html></html>"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Rewritten by someone else
+    path.write_text("<html>new</html>")
+    os.utime(path, ns=(0, 10**9))
+    assert cache.read(str(path)) == "<html>new</html>"
+    assert cache.misses == 2
+
+    with pytest.raises(FileNotFoundError):
+        cache.read(str(tmp_path / 'missing.html'))
+
+def test_byte_budget(tmp_path):
+    cache = FileCache(max_bytes=10)
+    for name in 'abc':
+        (tmp_path / name).write_text(name * 4)
+
+    cache.read(str(tmp_path / 'a'))
+    cache.read(str(tmp_path / 'b'))
+    cache.read(str(tmp_path / 'a'))
+    cache.read(str(tmp_path / 'c'))
+    # b was the least recently read
+    assert len(cache) == 2 and cache.size_bytes == 8
+    cache.read(str(tmp_path / 'a'))
+    assert cache.hits == 2
+
+    (tmp_path / 'big').write_text("x" * 11)
+    assert cache.read(str(tmp_path / 'big')) == "x" * 11
+    assert cache.size_bytes <= 10
+
+def test_file_tools_share_the_cache(tmp_path, cache):
+    (tmp_path / 'game.html').write_text("<html></html>")
+    (tmp_path / 'hierarchy.xml').write_text("<root/>")
+    read, batch, write = (tool(base_dir=str(tmp_path)) for tool in (ReadFileTool, BatchReadFilesTool, WriteFileTool))
+
+    assert get_file_cache() is cache
+    assert read._run(path='game.html') == "<html></html>"
+    assert batch._run(paths=['game.html', 'hierarchy.xml']) == "<html></html>\n<root/>\n"
+    assert cache.hits == 1
+
+    assert "updated successfully" in write._run(path='hierarchy.xml', content="<tree/>")
+    assert read._run(path='hierarchy.xml') == "<tree/>"
+
+    message = read._run(path='missing.html')
+    assert message.startswith("Failed to read file") and message.endswith("Files available: game.html\thierarchy.xml")
+    assert batch._run(paths=['missing.html']).startswith("Failed to read files")
+
+def test_missing_file_lists_a_few_entries(tmp_path):
+    for i in range(read_file_tool.FILES_AVAILABLE_LIMIT + 5):
+        (tmp_path / f"level{i:03d}.json").write_text("{}")
+    message = ReadFileTool(base_dir=str(tmp_path))._run(path='missing.html')
+    listed = message.splitlines()[-1].split("\t")
+    assert len(listed) == read_file_tool.FILES_AVAILABLE_LIMIT + 1
+    assert message.endswith(f"(more than {read_file_tool.FILES_AVAILABLE_LIMIT} entries, not all listed)")
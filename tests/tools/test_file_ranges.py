@@ -0,0 +1,111 @@
+import pytest
+
+from techies.predefined_tools import file_cache
+from techies.predefined_tools.file_cache import FileCache, FileText
+from techies.predefined_tools.file_ranges import outline, parse_path_range, read_part
+from techies.predefined_tools.read_file_tool import ReadFileTool
+from techies.predefined_tools.batch_read_files_tool import BatchReadFilesTool
+
+HTML = """<html>
+<head>
+<style>
+body { margin: 0; }
+</style>
+</head>
+<body>
+<script src="phaser.js"></script>
+<script id="game">
+const tag = '<b>';
+if (tag.length < 3) {}
+</script>
+</body>
+</html>
+"""
+
+XML = """<?xml version="1.0"?>
+<game>
+  <scene name="menu">
+    <button/>
+  </scene>
+  <scene name="level"/>
+</game>
+"""
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(file_cache, '_file_cache', FileCache())
+
+def test_line_index():
+    text = FileText("one\ntwo\nthree")
+    assert text.line_count == 3
+    assert text.lines(2, 3) == "two\nthree"
+    assert text.lines(3, 10) == "three"
+    assert text.lines(4, 5) == ""
+    assert FileText("one\ntwo\n").line_count == 2
+    assert FileText("").line_count == 0
+
+    unicode = FileText("héllo\nwörld\n")
+    assert unicode.size_bytes == 14
+    assert unicode.byte_range(7, 6) == "wörld"
+    # Characters cut by the range are dropped
+    assert unicode.byte_range(0, 2) == "h"
+
+def test_outlines():
+    assert outline('game.html', FileText(HTML)).splitlines() == [
+        "[Outline of game.html, 14 lines]",
+        "3-5 <style>",
+        '8-8 <script src="phaser.js">',
+        '9-12 <script id="game">',
+    ]
+    assert outline('hierarchy.xml', FileText(XML)).splitlines()[1:] == [
+        "2-7 <game>",
+        '3-5 <scene name="menu">',
+        '6-6 <scene name="level">',
+    ]
+    assert "not well-formed" in outline('broken.xml', FileText("<game>"))
+    assert "No outline" in outline('notes.txt', FileText("notes"))
+
+def test_read_part():
+    text = FileText(HTML)
+    assert read_part('game.html', text) == HTML
+    assert read_part('game.html', text, max_tokens=1000) == HTML
+    assert read_part('game.html', text, start_line=9, end_line=12) == (
+        "[game.html lines 9-12 of 14]\n" + text.lines(9, 12)
+    )
+
+    # Cut at the last whole line within the budget
+    budgeted = read_part('game.html', text, max_tokens=5)
+    assert budgeted.splitlines()[0] == "[game.html lines 1-2 of 14, truncated to 5 tokens, read on with start_line=3]"
+    assert budgeted.splitlines()[1:] == ["<html>", "<head>"]
+
+    # A line alone over the budget is read on by bytes, never from the same line
+    long_line = FileText("short\n" + "é" * 30 + "\nend\n")
+    first = read_part('bundle.js', long_line, start_line=2, max_tokens=2)
+    assert first.splitlines() == ["[bundle.js line 2 of 3, truncated to 2 tokens, read on with offset=22]", "é" * 8]
+    rest = read_part('bundle.js', long_line, offset=22, max_tokens=2)
+    assert rest.splitlines() == ["[bundle.js from byte 22 of 71, truncated to 2 tokens, read on with offset=38]", "é" * 8]
+
+    assert read_part('game.html', text, offset=7, length=6) == f"[game.html bytes 7-13 of {len(HTML)}]\n<head>"
+    assert "none in the range" in read_part('game.html', text, start_line=40)
+    with pytest.raises(ValueError):
+        read_part('game.html', text, start_line=1, offset=0)
+
+def test_parse_path_range():
+    assert parse_path_range('game.html:120-180') == ('game.html', 120, 180)
+    assert parse_path_range('game.html:-20') == ('game.html', None, 20)
+    assert parse_path_range('game.html') == ('game.html', None, None)
+
+def test_tools(tmp_path):
+    (tmp_path / 'game.html').write_text(HTML)
+    (tmp_path / 'hierarchy.xml').write_text(XML)
+    read, batch = ReadFileTool(base_dir=str(tmp_path)), BatchReadFilesTool(base_dir=str(tmp_path))
+
+    assert read._run(path='game.html') == HTML
+    assert read._run(path='game.html', outline=True).startswith("[Outline of game.html")
+    assert read._run(path='game.html', start_line=2, end_line=2) == "[game.html lines 2-2 of 14]\n<head>\n"
+    assert read._run(path='game.html', start_line=2, offset=0).startswith("Failed to read file")
+
+    assert batch._run(paths=['game.html:2-2', 'hierarchy.xml:6-6']) == (
+        "[game.html lines 2-2 of 14]\n<head>\n\n[hierarchy.xml lines 6-6 of 7]\n  <scene name=\"level\"/>\n\n"
+    )
+    assert batch._run(paths=['game.html', 'hierarchy.xml'], outline=True).count("[Outline of") == 2
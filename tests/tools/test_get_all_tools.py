@@ -3,7 +3,7 @@ import copy
 from crewai.tools import BaseTool, tool
 from pydantic import BaseModel, Field
 from typing import Type
-from techies.tools import get_all_tools, _registered_tools, register_tool, to_snake_case
+from techies.tools import get_all_tools, _registered_tools, register_tool, to_snake_case, create_tool, get_tool_specs, validate_tool
 
 class CustomToolSchema(BaseModel):
     param: str = Field(type=str, description="A test parameter")
@@ -20,6 +20,15 @@ class CustomTool(BaseTool):
     def _run(self, **kwargs) -> str:
         return f"Custom tool ran with param: {kwargs.get('param', 'none')}"
 
+counting_tool_instances = []
+
+class CountingTool(CustomTool):
+    id: str = "counting_tool"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        counting_tool_instances.append(self)
+
 def test_register_tool_function():
     """Test that register_tool correctly registers a custom tool."""
     # Clear any registered tools from previous tests
@@ -31,7 +40,7 @@ def test_register_tool_function():
     # Verify the tool was registered with the correct ID
     assert tool_id == "custom_test_tool"
     assert tool_id in _registered_tools
-    assert isinstance(_registered_tools[tool_id], CustomTool)
+    assert isinstance(create_tool(tool_id), CustomTool)
 
 def test_register_tool_with_custom_id():
     """Test that register_tool works with a custom tool ID."""
@@ -45,7 +54,7 @@ def test_register_tool_with_custom_id():
     # Verify the tool was registered with the custom ID
     assert tool_id == custom_id
     assert tool_id in _registered_tools
-    assert isinstance(_registered_tools[tool_id], CustomTool)
+    assert isinstance(create_tool(tool_id), CustomTool)
 
 def test_register_tool_with_crewai_decorator():
     """Test that register_tool works with tools created using crewai's tool decorator."""
@@ -144,4 +153,34 @@ def test_get_all_tools_returns_deep_copy():
     
     # Get tools again and verify the custom tool is still there in the new copy
     tools_again = get_all_tools()
-    assert custom_tool_id in tools_again, "get_all_tools should return a deep copy, not a reference"
\ No newline at end of file
+    assert custom_tool_id in tools_again, "get_all_tools should return a deep copy, not a reference"
+
+def test_register_tool_does_not_instantiate():
+    """Test that registering and validating a tool class only reads its metadata."""
+    _registered_tools.clear()
+    counting_tool_instances.clear()
+
+    tool_id = register_tool(CountingTool)
+    spec = get_tool_specs()[tool_id]
+    assert spec.name == "Custom Test Tool"
+    assert spec.description == "A test tool for unit testing"
+    assert spec.args_schema is CustomToolSchema
+    assert validate_tool(tool_id) == (True, None)
+    assert validate_tool("missing_tool") == (False, "Tool 'missing_tool' not found")
+    assert counting_tool_instances == []
+
+    tools = get_all_tools()
+    assert counting_tool_instances == []
+    assert isinstance(tools[tool_id], CountingTool)
+    assert tools[tool_id] is tools[tool_id]
+    assert len(counting_tool_instances) == 1
+
+def test_create_tool_returns_new_instances():
+    """Test that each factory call builds an independent tool instance."""
+    _registered_tools.clear()
+
+    first = create_tool("read_file")
+    second = create_tool("read_file")
+    assert first is not second
+    assert first.cache_function(None, None) is False
+